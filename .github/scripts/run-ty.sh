@@ -11,5 +11,6 @@ uv run ty check \
   --exclude "organizer-misc-signals.py" \
   --exclude "single-bit-png.py" \
   --exclude "perfetto_pb2.py" \
+  --exclude "perfetto_pb2.pyi" \
   --exclude "z80bus/server.py" \
   .
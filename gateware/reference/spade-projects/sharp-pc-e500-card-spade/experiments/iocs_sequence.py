@@ -8,6 +8,8 @@ import sys
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 EXPERIMENT_BASE = 0x10100
 IOCS_ENTRY = 0xFFFE8
@@ -422,6 +424,24 @@ def parse_result(raw_result_path: Path) -> dict[str, object]:
     }
 
 
+def _ensure_scripts_path() -> None:
+    scripts_dir = PROJECT_DIR / "scripts"
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+
+
+def _load_lcd_vram():
+    # shared with the PC-G850 tools, py/shared/lcd_vram.py at the repository root
+    _ensure_scripts_path()
+    from pce500_host.repo import find_repo_root, load_module_from_path
+
+    repo_root = find_repo_root(SCRIPT_DIR, "py/shared/lcd_vram.py")
+    return load_module_from_path("lcd_vram", repo_root / "py" / "shared" / "lcd_vram.py")
+
+
+lcd_vram = _load_lcd_vram()
+
+
 def _find_public_src() -> Path | None:
     env_candidates = [
         Path(value)
@@ -496,77 +516,28 @@ class _TraceDisplayController:
     def write(self, address: int, value: int, source_index: int | None = None) -> None:
         self.pipeline.apply_raw(address, value, source_index)
 
-    def get_display_buffer(self):
-        def pixel_on(byte: int, bit: int) -> int:
-            return 1 if not ((byte >> bit) & 1) else 0
-
-        class _SimpleBuffer:
-            def __init__(self, height: int, width: int) -> None:
-                self.shape = (height, width)
-                self._rows = [[0 for _ in range(width)] for _ in range(height)]
-
-            def __getitem__(self, key):
-                row, col = key
-                return self._rows[row][col]
-
-            def __setitem__(self, key, value) -> None:
-                row, col = key
-                self._rows[row][col] = value
+    def _compose_display(self, left, right):
+        # left/right are (64 lines, columns) per-chip arrays: the top half of each
+        # chip fills the upper half of the screen, the bottom half is mirrored
+        buffer = np.empty((32, 240), dtype=left.dtype)
+        lcd_vram.copy_region(buffer, right[0:32, 0:64], 0, 0)
+        lcd_vram.copy_region(buffer, left[0:32, 0:56], 0, 64)
+        lcd_vram.copy_region(buffer, left[32:64, 0:56], 0, 120, mirror=True)
+        lcd_vram.copy_region(buffer, right[32:64, 0:64], 0, 176, mirror=True)
+        return buffer
 
-        buffer = _SimpleBuffer(32, 240)
+    def get_display_buffer(self):
         left_chip, right_chip = self.chips[0], self.chips[1]
-
-        def copy_region(chip, start_page: int, column_range: range, dest_start_col: int, *, mirror: bool) -> None:
-            for row in range(32):
-                page = start_page + row // 8
-                bit = row % 8
-                if mirror:
-                    for dest_offset, src_col in enumerate(reversed(column_range)):
-                        byte = chip.vram[page][src_col]
-                        buffer[row, dest_start_col + dest_offset] = pixel_on(byte, bit)
-                else:
-                    for dest_offset, src_col in enumerate(column_range):
-                        byte = chip.vram[page][src_col]
-                        buffer[row, dest_start_col + dest_offset] = pixel_on(byte, bit)
-
-        copy_region(right_chip, 0, range(64), 0, mirror=False)
-        copy_region(left_chip, 0, range(56), 64, mirror=False)
-        copy_region(left_chip, 4, range(56), 120, mirror=True)
-        copy_region(right_chip, 4, range(64), 176, mirror=True)
-        return buffer
+        left = lcd_vram.PageVRAM.from_rows(left_chip.vram).to_bitmap(slice(0, 8))
+        right = lcd_vram.PageVRAM.from_rows(right_chip.vram).to_bitmap(slice(0, 8))
+        # a pixel is on when its VRAM bit is clear
+        return 1 - self._compose_display(left, right)
 
     def get_display_source_buffer(self):
-        class _SimpleSourceBuffer:
-            def __init__(self, height: int, width: int) -> None:
-                self.shape = (height, width)
-                self._rows = [[None for _ in range(width)] for _ in range(height)]
-
-            def __getitem__(self, key):
-                row, col = key
-                return self._rows[row][col]
-
-            def __setitem__(self, key, value) -> None:
-                row, col = key
-                self._rows[row][col] = value
-
-        buffer = _SimpleSourceBuffer(32, 240)
         left_chip, right_chip = self.chips[0], self.chips[1]
-
-        def copy_region(chip, start_page: int, column_range: range, dest_start_col: int, *, mirror: bool) -> None:
-            for row in range(32):
-                page = start_page + row // 8
-                if mirror:
-                    for dest_offset, src_col in enumerate(reversed(column_range)):
-                        buffer[row, dest_start_col + dest_offset] = chip.vram_pc_source[page][src_col]
-                else:
-                    for dest_offset, src_col in enumerate(column_range):
-                        buffer[row, dest_start_col + dest_offset] = chip.vram_pc_source[page][src_col]
-
-        copy_region(right_chip, 0, range(64), 0, mirror=False)
-        copy_region(left_chip, 0, range(56), 64, mirror=False)
-        copy_region(left_chip, 4, range(56), 120, mirror=True)
-        copy_region(right_chip, 4, range(64), 176, mirror=True)
-        return buffer
+        left = lcd_vram.expand_pages(np.array(left_chip.vram_pc_source, dtype=object)[0:8])
+        right = lcd_vram.expand_pages(np.array(right_chip.vram_pc_source, dtype=object)[0:8])
+        return self._compose_display(left, right)
 
 
 def _extract_helper_text_request(raw: dict[str, Any]) -> tuple[int, int, str] | None:
@@ -653,21 +624,21 @@ def _filter_helper_lines_by_last_write(
 
 def summarize_display_writes(raw: dict[str, Any]) -> dict[str, Any] | None:
     ft_capture = raw.get("ft_capture") or {}
-    words = ft_capture.get("words") or []
-    if not isinstance(words, list) or not words:
+    if not ft_capture.get("artifact") and not isinstance(ft_capture.get("words"), list):
         return None
 
-    scripts_dir = PROJECT_DIR / "scripts"
-    if str(scripts_dir) not in sys.path:
-        sys.path.insert(0, str(scripts_dir))
+    _ensure_scripts_path()
+    from pce500_host.ft_artifact import capture_words
+    from pce500_host.ft_decode import decode_word_columns
 
-    from pc_e500_ft600 import decode_word_stream
+    words = capture_words(ft_capture)
+    if len(words) == 0:
+        return None
 
-    lcd_writes = [
-        event
-        for event in decode_word_stream(words)
-        if (not event.rw) and LCD_WRITE_ADDR_MIN <= event.addr < LCD_WRITE_ADDR_MAX
-    ]
+    columns = decode_word_columns(words)
+    lcd_writes = columns[
+        (~columns.rw) & (columns.addr >= LCD_WRITE_ADDR_MIN) & (columns.addr < LCD_WRITE_ADDR_MAX)
+    ].to_events()
     if not lcd_writes:
         return None
 
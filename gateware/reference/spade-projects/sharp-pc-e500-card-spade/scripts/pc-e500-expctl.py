@@ -44,8 +44,28 @@ def build_parser() -> argparse.ArgumentParser:
 
     run = subparsers.add_parser("run", help="run an experiment script")
     run.add_argument("script", type=Path, help="path to the experiment script")
+    run.add_argument("--progress", action="store_true", help="print run progress to stderr while waiting")
     run.add_argument("script_args", nargs=argparse.REMAINDER, help="extra args forwarded to the experiment script after --")
 
+    ft_subscribe = subparsers.add_parser("ft-subscribe", help="print live FT words or events as JSON lines")
+    ft_subscribe.add_argument(
+        "--output",
+        choices=["words", "events", "compact_events"],
+        default="words",
+        help="raw words or decoded events per batch (default: words)",
+    )
+    ft_subscribe.add_argument("--duration", type=float, help="seconds to stream (default: until interrupted)")
+    ft_subscribe.add_argument(
+        "--max-words",
+        type=int,
+        default=65_536,
+        help="daemon-side buffer; older words are dropped when this client falls behind (default: 65536)",
+    )
+
+    subparsers.add_parser("last-result", help="fetch the last run result without touching the device")
+    capture = subparsers.add_parser("capture", help="list FT capture artifacts, or show one run's manifest")
+    capture.add_argument("run_id", nargs="?", help="run id of the capture")
+
     subparsers.add_parser("shutdown", help="stop the daemon")
     return parser
 
@@ -78,6 +98,18 @@ def build_request(args: argparse.Namespace) -> dict[str, object]:
             "script": str(args.script.resolve()),
             "script_args": script_args,
         }
+    if args.command == "ft-subscribe":
+        payload = {"action": "ft_subscribe", "output": args.output, "max_words": args.max_words}
+        if args.duration is not None:
+            payload["duration_s"] = args.duration
+        return payload
+    if args.command == "last-result":
+        return {"action": "last_result"}
+    if args.command == "capture":
+        payload = {"action": "capture"}
+        if args.run_id is not None:
+            payload["run_id"] = args.run_id
+        return payload
     if args.command == "shutdown":
         return {"action": "shutdown"}
     raise RuntimeError(f"unknown command {args.command!r}")
@@ -85,7 +117,18 @@ def build_request(args: argparse.Namespace) -> dict[str, object]:
 
 def main() -> int:
     args = build_parser().parse_args()
-    response = send_request(args.socket, build_request(args))
+    on_progress = None
+    if getattr(args, "progress", False):
+
+        def on_progress(message: dict[str, object]) -> None:
+            print(json.dumps(message, sort_keys=True), file=sys.stderr)
+
+    elif args.command == "ft-subscribe":
+
+        def on_progress(message: dict[str, object]) -> None:
+            print(json.dumps(message, sort_keys=True), flush=True)
+
+    response = send_request(args.socket, build_request(args), on_progress=on_progress)
     if args.pretty:
         print(json.dumps(response, indent=2, sort_keys=True))
     else:
@@ -1,21 +1,32 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["pyserial>=3.5"]
+# dependencies = ["numpy>=1.24.0", "pyserial>=3.5"]
 # ///
 from __future__ import annotations
 
 import argparse
 import json
-import socket
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
 from pce500_host.contract import SUPERVISOR_RPC_ACTIONS
+from pce500_host.ft_artifact import (
+    COMPRESSIONS,
+    check_compression,
+    list_capture_artifacts,
+    load_capture_manifest,
+    prune_capture_artifacts,
+    write_capture_artifact,
+)
+from pce500_host.ft_stream import DEFAULT_SUBSCRIBER_MAX_WORDS
+from pce500_host.rpc_server import RpcServer
 from pc_e500_experiment_common import (
     BEGIN_PREFIX,
     DEFAULT_ASSEMBLER_DIR,
@@ -33,7 +44,7 @@ from pc_e500_experiment_common import (
     resolve_existing_dir,
     resolve_existing_file,
 )
-from pc_e500_ft600 import Ft600Capture, preview_event_stream
+from pc_e500_ft600 import DecodedCapture, Ft600Capture, FtEventColumns, compact_event_columns, preview_rows
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -43,6 +54,11 @@ DEFAULT_DEBUG_ECHO_ASM = PROJECT_ROOT / "asm" / "card_rom_echo_short_retf.asm"
 DEFAULT_SAFE_TIMING = 5
 DEFAULT_SAFE_CONTROL_TIMING = 10
 DEFAULT_FT_MAX_RETAINED_WORDS = 262_144
+DEFAULT_CAPTURE_DIR = Path.home() / ".cache" / "pc-e500-expd" / "captures"
+DEFAULT_CAPTURE_KEEP = 200
+DEFAULT_FT_STREAM_BATCH_WORDS = 16_384
+FT_STREAM_HEARTBEAT_S = 1.0
+FT_STREAM_OUTPUTS = ("words", "events", "compact_events")
 
 CMD_BASE = 0x107E0
 CMD_MAGIC0 = CMD_BASE + 0x00
@@ -60,9 +76,10 @@ CMD_FLAG_ENABLE_FT_CAPTURE = 0x01
 EXPERIMENT_MIN = 0x10100
 EXPERIMENT_MAX = 0x106FF
 
-
-def json_dumps(payload: dict[str, Any]) -> bytes:
-    return (json.dumps(payload, sort_keys=True) + "\n").encode("utf-8")
+# answered while the device worker is busy; last_result, capture and
+# ft_subscribe are Python daemon only, not part of the shared supervisor contract
+READ_ONLY_ACTIONS = ("status", "last_result", "capture", "ft_subscribe")
+DEVICE_ACTIONS = tuple(action for action in SUPERVISOR_RPC_ACTIONS if action not in READ_ONLY_ACTIONS)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -84,6 +101,24 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="program the safe supervisor image immediately at daemon startup",
     )
+    parser.add_argument(
+        "--capture-dir",
+        type=Path,
+        default=DEFAULT_CAPTURE_DIR,
+        help=f"directory for per-run FT word files and manifests (default: {DEFAULT_CAPTURE_DIR})",
+    )
+    parser.add_argument(
+        "--capture-compression",
+        choices=COMPRESSIONS,
+        default="none",
+        help="compress FT word files; uncompressed files can be memory-mapped (default: none)",
+    )
+    parser.add_argument(
+        "--capture-keep",
+        type=int,
+        default=DEFAULT_CAPTURE_KEEP,
+        help=f"number of FT capture artifacts to keep, 0 keeps all (default: {DEFAULT_CAPTURE_KEEP})",
+    )
     parser.add_argument(
         "--monitor-uart",
         action="store_true",
@@ -103,6 +138,9 @@ class ExperimentDaemon:
         assembler_dir: Path,
         safe_asm: Path,
         monitor_uart: bool,
+        capture_dir: Path = DEFAULT_CAPTURE_DIR,
+        capture_compression: str = "none",
+        capture_keep: int = DEFAULT_CAPTURE_KEEP,
     ) -> None:
         self.assembler_dir = resolve_existing_dir(assembler_dir, "assembler checkout")
         self.safe_asm = resolve_existing_file(safe_asm, "safe supervisor assembly")
@@ -125,6 +163,12 @@ class ExperimentDaemon:
         self._next_seq = 1
         self._scan_index = 0
         self._run_counter = 0
+        # status queries poll the UART lines while the device worker runs
+        self._poll_lock = threading.Lock()
+        check_compression(capture_compression)
+        self.capture_dir = capture_dir.expanduser()
+        self.capture_compression = capture_compression
+        self.capture_keep = capture_keep
         self.ft_capture = Ft600Capture(max_retained_words=DEFAULT_FT_MAX_RETAINED_WORDS)
         self.ft_capture.ensure_running()
 
@@ -153,18 +197,19 @@ class ExperimentDaemon:
         return f"{time.strftime('%Y%m%d-%H%M%S')}-{self._run_counter:04d}"
 
     def _poll_unsolicited_lines(self) -> None:
-        current_line_count = self.uart.line_count()
-        if self._scan_index > current_line_count:
-            self._scan_index = current_line_count
-        lines = self.uart.lines_since(self._scan_index)
-        self._scan_index += len(lines)
-        for line in lines:
-            if line.text.startswith(READY_PREFIX):
-                self.status = "idle"
-                self.needs_reset = False
-                self.last_error = None
-                self.last_ready_line = line.text
-            self._observe_sequence_from_line(line.text)
+        with self._poll_lock:
+            current_line_count = self.uart.line_count()
+            if self._scan_index > current_line_count:
+                self._scan_index = current_line_count
+            lines = self.uart.lines_since(self._scan_index)
+            self._scan_index += len(lines)
+            for line in lines:
+                if line.text.startswith(READY_PREFIX):
+                    self.status = "idle"
+                    self.needs_reset = False
+                    self.last_error = None
+                    self.last_ready_line = line.text
+                self._observe_sequence_from_line(line.text)
 
     def _next_sequence(self) -> int:
         value = self._next_seq & 0xFF
@@ -326,29 +371,26 @@ class ExperimentDaemon:
     def _build_ft_capture_payload(
         self,
         *,
+        run_id: str,
         plan: dict[str, Any],
         ft_capture_result: Any,
         measurements: list[Any],
     ) -> dict[str, Any]:
         start_tag = int(plan.get("start_tag", 0x11)) & 0xFF
         stop_tag = int(plan.get("stop_tag", 0x12)) & 0xFF
-        preview_words = preview_event_stream(ft_capture_result.words, limit=32, compact=False)
-        compact_preview_words = preview_event_stream(ft_capture_result.words, limit=64, compact=True)
-        execution_preview_words = preview_event_stream(
-            ft_capture_result.words,
-            limit=64,
-            compact=True,
-            window="execution",
-        )
-        measurement_preview_words = preview_event_stream(
-            ft_capture_result.words,
+        # decoded once, the previews are views of the same columns
+        capture = DecodedCapture(ft_capture_result.words)
+        preview_words = capture.preview(limit=32, compact=False)
+        compact_preview_words = capture.preview(limit=64, compact=True)
+        execution_preview_words = capture.preview(limit=64, compact=True, window="execution")
+        measurement_preview_words = capture.preview(
             limit=64,
             compact=True,
             window="measurement",
             start_tag=start_tag,
             stop_tag=stop_tag,
         )
-        return {
+        payload: dict[str, Any] = {
             "enabled": True,
             "word_count": len(ft_capture_result.words),
             "raw_bytes": ft_capture_result.raw_bytes,
@@ -362,12 +404,37 @@ class ExperimentDaemon:
             "max_retained_words": ft_capture_result.max_retained_words,
             "truncated_head": ft_capture_result.truncated_head,
             "health": "ok" if all(m.ft_overflow == 0 for m in measurements) else "overflow",
-            "words": ft_capture_result.words,
             "preview": preview_words,
             "compact_preview": compact_preview_words,
             "execution_preview": execution_preview_words,
             "measurement_preview": measurement_preview_words,
         }
+        try:
+            artifact = write_capture_artifact(
+                self.capture_dir,
+                run_id,
+                ft_capture_result.words,
+                compression=str(plan.get("ft_capture_compression", self.capture_compression)),
+                metadata={
+                    "experiment": plan.get("name"),
+                    "decode_swap_u16": ft_capture_result.decode_swap_u16,
+                    "truncated_head": ft_capture_result.truncated_head,
+                },
+            )
+        except (OSError, RuntimeError, ValueError) as exc:
+            # keep the run result, and the words inline, rather than losing both
+            payload["artifact_error"] = str(exc)
+            payload["words"] = ft_capture_result.words.tolist()
+        else:
+            payload["artifact"] = {
+                key: artifact[key]
+                for key in ("manifest_path", "words_path", "dtype", "compression", "byte_count")
+            }
+            try:
+                prune_capture_artifacts(self.capture_dir, self.capture_keep)
+            except OSError:
+                pass
+        return payload
 
     def _handle_timeout(
         self,
@@ -420,6 +487,7 @@ class ExperimentDaemon:
             }
         if plan is not None and ft_capture_result is not None:
             payload["ft_capture"] = self._build_ft_capture_payload(
+                run_id=run_id,
                 plan=plan,
                 ft_capture_result=ft_capture_result,
                 measurements=measurements or [],
@@ -427,12 +495,19 @@ class ExperimentDaemon:
         self.last_result = payload
         return payload
 
-    def run_experiment(self, script_path: Path, script_args: list[str]) -> dict[str, Any]:
+    def run_experiment(
+        self,
+        script_path: Path,
+        script_args: list[str],
+        progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
         self._poll_unsolicited_lines()
         if self.status != "idle" or self.needs_reset:
             raise RuntimeError("device is not idle; wait for XR,READY or reset + CALL &10000")
 
         plan = self._load_plan(script_path, script_args)
+        if bool(plan.get("ft_capture", True)):
+            check_compression(str(plan.get("ft_capture_compression", self.capture_compression)))
         run_id = self._make_run_id()
         timing = int(plan.get("timing", 5))
         control_timing = int(plan.get("control_timing", 10))
@@ -464,77 +539,109 @@ class ExperimentDaemon:
         self.uart.synchronize_rx_boundary()
         line_index = self.uart.line_count()
         ft_capture = self.ft_capture if ft_capture_enabled else None
-        if ft_capture is not None:
-            ft_capture.read_size = ft_read_size
-            ft_capture.read_timeout_ms = ft_read_timeout_ms
-            ft_capture.post_stop_idle_s = ft_post_stop_idle_s
-            ft_capture.post_stop_hard_s = ft_post_stop_hard_s
-            ft_capture.set_max_retained_words(ft_max_retained_words)
-            ft_capture.start()
-        self._commit_command_block(command_block)
-        self.status = "running"
-
-        begin_text = f"{BEGIN_PREFIX},{sequence:02X}"
-        end_prefix = f"{END_PREFIX},{sequence:02X},"
-
+        # the FT session must be closed and the status settled however the run
+        # ends, or every later run fails with "session already started"
+        capture_active = False
+        end_seen = False
         try:
-            begin_line = self.uart.wait_for_line(lambda text: text == begin_text, timeout_s, start_index=line_index)
-            end_line = self.uart.wait_for_line(lambda text: text.startswith(end_prefix), timeout_s, start_index=line_index)
-        except TimeoutError as exc:
-            ft_capture_result = None
             if ft_capture is not None:
-                try:
-                    ft_capture_result = ft_capture.stop()
-                except Exception:
-                    pass
+                ft_capture.read_size = ft_read_size
+                ft_capture.read_timeout_ms = ft_read_timeout_ms
+                ft_capture.post_stop_idle_s = ft_post_stop_idle_s
+                ft_capture.post_stop_hard_s = ft_post_stop_hard_s
+                ft_capture.set_max_retained_words(ft_max_retained_words)
+                ft_capture.start()
+                capture_active = True
+            self._commit_command_block(command_block)
+            self.status = "running"
+            if progress is not None:
+                progress({"phase": "running", "run_id": run_id, "sequence": sequence})
+
+            begin_text = f"{BEGIN_PREFIX},{sequence:02X}"
+            end_prefix = f"{END_PREFIX},{sequence:02X},"
+
+            try:
+                begin_line = self.uart.wait_for_line(lambda text: text == begin_text, timeout_s, start_index=line_index)
+                if progress is not None:
+                    progress({"phase": "begin", "run_id": run_id, "line": begin_line.text})
+                end_line = self.uart.wait_for_line(lambda text: text.startswith(end_prefix), timeout_s, start_index=line_index)
+            except TimeoutError as exc:
+                ft_capture_result = None
+                if ft_capture is not None:
+                    capture_active = False
+                    try:
+                        ft_capture_result = ft_capture.stop()
+                    except Exception:
+                        pass
+                measurements = self.uart.dump_measurements()
+                xr_lines = [line.text for line in self.uart.lines_since(line_index) if line.text.startswith("XR,")]
+                return self._handle_timeout(
+                    run_id=run_id,
+                    reason=str(exc),
+                    plan=plan,
+                    script_path=Path(plan["_script_path"]),
+                    script_args=list(plan["_script_args"]),
+                    timing=timing,
+                    control_timing=control_timing,
+                    measurements=measurements,
+                    uart_lines=xr_lines,
+                    ft_capture_result=ft_capture_result,
+                )
+
+            end_seen = True
+            if progress is not None:
+                progress({"phase": "end", "run_id": run_id, "line": end_line.text})
+            capture_active = False
+            ft_capture_result = ft_capture.stop() if ft_capture is not None else None
             measurements = self.uart.dump_measurements()
             xr_lines = [line.text for line in self.uart.lines_since(line_index) if line.text.startswith("XR,")]
-            return self._handle_timeout(
-                run_id=run_id,
-                reason=str(exc),
-                plan=plan,
-                script_path=Path(plan["_script_path"]),
-                script_args=list(plan["_script_args"]),
-                timing=timing,
-                control_timing=control_timing,
-                measurements=measurements,
-                uart_lines=xr_lines,
-                ft_capture_result=ft_capture_result,
-            )
 
-        ft_capture_result = ft_capture.stop() if ft_capture is not None else None
-        measurements = self.uart.dump_measurements()
-        xr_lines = [line.text for line in self.uart.lines_since(line_index) if line.text.startswith("XR,")]
-
-        result: dict[str, Any] = {
-            "status": "ok",
-            "run_id": run_id,
-            "needs_reset": False,
-            "experiment": plan.get("name", Path(script_path).stem),
-            "script_path": str(script_path),
-            "script_args": list(script_args),
-            "timing": timing,
-            "control_timing": control_timing,
-            "begin_line": begin_line.text,
-            "end_line": end_line.text,
-            "measurement": [measurement.__dict__ for measurement in measurements],
-            "uart_lines": xr_lines,
-            "plan": {
-                key: value
-                for key, value in plan.items()
-                if not key.startswith("_")
-            },
-        }
-        if ft_capture_result is not None:
-            result["ft_capture"] = self._build_ft_capture_payload(
-                plan=plan,
-                ft_capture_result=ft_capture_result,
-                measurements=measurements,
-            )
-
-        parsed = self._parse_experiment_result(Path(plan["_script_path"]), list(plan["_script_args"]), result)
-        if parsed is not None:
-            result["parsed"] = parsed
+            result: dict[str, Any] = {
+                "status": "ok",
+                "run_id": run_id,
+                "needs_reset": False,
+                "experiment": plan.get("name", Path(script_path).stem),
+                "script_path": str(script_path),
+                "script_args": list(script_args),
+                "timing": timing,
+                "control_timing": control_timing,
+                "begin_line": begin_line.text,
+                "end_line": end_line.text,
+                "measurement": [measurement.__dict__ for measurement in measurements],
+                "uart_lines": xr_lines,
+                "plan": {
+                    key: value
+                    for key, value in plan.items()
+                    if not key.startswith("_")
+                },
+            }
+            if ft_capture_result is not None:
+                result["ft_capture"] = self._build_ft_capture_payload(
+                    run_id=run_id,
+                    plan=plan,
+                    ft_capture_result=ft_capture_result,
+                    measurements=measurements,
+                )
+
+            parsed = self._parse_experiment_result(Path(plan["_script_path"]), list(plan["_script_args"]), result)
+            if parsed is not None:
+                result["parsed"] = parsed
+        except Exception as exc:
+            if end_seen:
+                # the calculator finished the experiment, only the host side failed
+                self.status = "idle"
+                self.needs_reset = False
+            elif self.status == "running":
+                self.status = "needs_reset"
+                self.needs_reset = True
+            self.last_error = str(exc)
+            raise
+        finally:
+            if capture_active:
+                try:
+                    ft_capture.stop()
+                except Exception:
+                    pass
 
         self.status = "idle"
         self.needs_reset = False
@@ -560,6 +667,84 @@ class ExperimentDaemon:
             "recent_uart_lines": self.uart.last_lines(),
         }
 
+    def last_result_payload(self) -> dict[str, Any]:
+        return {"status": "ok", "last_result": self.last_result}
+
+    def capture_payload(self, run_id: str | None = None) -> dict[str, Any]:
+        if run_id is None:
+            return {
+                "status": "ok",
+                "capture_dir": str(self.capture_dir),
+                "run_ids": [manifest["run_id"] for _, manifest in reversed(list_capture_artifacts(self.capture_dir))],
+            }
+        manifest_path = self.capture_dir / f"{run_id}.json"
+        if not manifest_path.is_file():
+            raise RuntimeError(f"no FT capture artifact for run {run_id!r}")
+        manifest = load_capture_manifest(manifest_path)
+        return {
+            "status": "ok",
+            "manifest_path": str(manifest_path),
+            "words_path": str(self.capture_dir / manifest["words_file"]),
+            "manifest": manifest,
+        }
+
+    def subscribe_ft_capture(
+        self,
+        emit: Callable[[dict[str, Any]], bool] | None,
+        *,
+        output: str = "words",
+        duration_s: float | None = None,
+        max_words: int = DEFAULT_SUBSCRIBER_MAX_WORDS,
+        max_batch_words: int = DEFAULT_FT_STREAM_BATCH_WORDS,
+    ) -> dict[str, Any]:
+        """Stream live FT words as progress messages until ``duration_s`` or the client leaves.
+
+        ``events`` / ``compact_events`` decode each batch on its own, so
+        compaction does not merge events across batch boundaries.
+        """
+
+        if emit is None:
+            raise RuntimeError('ft_subscribe needs a streamed request ("stream": true)')
+        if output not in FT_STREAM_OUTPUTS:
+            raise RuntimeError(f"unknown ft_subscribe output {output!r}, expected one of {FT_STREAM_OUTPUTS}")
+        if max_batch_words < 1:
+            # an empty batch limit would spin on empty batches forever
+            raise RuntimeError(f"ft_subscribe max_batch_words must be at least 1, got {max_batch_words}")
+        subscriber = self.ft_capture.broadcaster.subscribe(max_words)
+        deadline = None if duration_s is None else time.monotonic() + duration_s
+        try:
+            delivered = True
+            while delivered:
+                timeout_s = FT_STREAM_HEARTBEAT_S
+                if deadline is not None:
+                    timeout_s = min(timeout_s, deadline - time.monotonic())
+                    if timeout_s <= 0:
+                        break
+                batch = subscriber.get(timeout=timeout_s, max_words=max_batch_words)
+                if batch is None:
+                    # also how a vanished client is noticed while the bus is quiet
+                    delivered = emit({"phase": "ft_heartbeat", **subscriber.stats()})
+                    continue
+                message: dict[str, Any] = {
+                    "phase": "ft_words",
+                    "start_index": batch.start_index,
+                    "word_count": len(batch.words),
+                    "dropped_words": batch.dropped_words,
+                    "dropped_chunks": batch.dropped_chunks,
+                }
+                if output == "words":
+                    message["words"] = batch.words.tolist()
+                else:
+                    columns = FtEventColumns.decode(batch.words)
+                    columns.index += batch.start_index
+                    if output == "compact_events":
+                        columns = compact_event_columns(columns)
+                    message["events"] = preview_rows(columns)
+                delivered = emit(message)
+        finally:
+            self.ft_capture.broadcaster.unsubscribe(subscriber)
+        return {"status": "ok", "action": "ft_subscribe", **subscriber.stats()}
+
     def stream_command(self, command: str) -> dict[str, Any]:
         reply = self.uart.send_command(command)
         self._poll_unsolicited_lines()
@@ -674,10 +859,28 @@ start:
         return self.status_payload()
 
 
-def handle_request(daemon: ExperimentDaemon, request: dict[str, Any]) -> dict[str, Any]:
+def handle_request(
+    daemon: ExperimentDaemon,
+    request: dict[str, Any],
+    emit: Callable[[dict[str, Any]], bool] | None = None,
+) -> dict[str, Any]:
     action = request.get("action")
     if action == "status":
         return daemon.status_payload()
+    if action == "last_result":
+        return daemon.last_result_payload()
+    if action == "capture":
+        run_id = request.get("run_id")
+        return daemon.capture_payload(None if run_id is None else str(run_id))
+    if action == "ft_subscribe":
+        duration_s = request.get("duration_s")
+        return daemon.subscribe_ft_capture(
+            emit,
+            output=str(request.get("output", "words")),
+            duration_s=None if duration_s is None else float(duration_s),
+            max_words=int(request.get("max_words", DEFAULT_SUBSCRIBER_MAX_WORDS)),
+            max_batch_words=int(request.get("max_batch_words", DEFAULT_FT_STREAM_BATCH_WORDS)),
+        )
     if action == "stream_on":
         return daemon.stream_command("F1")
     if action == "stream_off":
@@ -699,6 +902,8 @@ def handle_request(daemon: ExperimentDaemon, request: dict[str, Any]) -> dict[st
     if action == "run":
         script_path = Path(str(request["script"]))
         script_args = [str(value) for value in request.get("script_args", [])]
+        if emit is not None:
+            return daemon.run_experiment(script_path, script_args, progress=emit)
         return daemon.run_experiment(script_path, script_args)
     if action == "shutdown":
         return {"status": "ok", "shutdown": True}
@@ -706,44 +911,12 @@ def handle_request(daemon: ExperimentDaemon, request: dict[str, Any]) -> dict[st
 
 
 def serve(socket_path: Path, daemon: ExperimentDaemon) -> int:
-    socket_path.parent.mkdir(parents=True, exist_ok=True)
-    if socket_path.exists():
-        socket_path.unlink()
-
-    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
-        server.bind(str(socket_path))
-        server.listen(1)
-        try:
-            while True:
-                conn, _ = server.accept()
-                with conn:
-                    payload = bytearray()
-                    while True:
-                        chunk = conn.recv(4096)
-                        if not chunk:
-                            break
-                        payload.extend(chunk)
-                        if b"\n" in chunk:
-                            break
-                    if not payload:
-                        continue
-                    try:
-                        request = json.loads(payload.decode("utf-8"))
-                        response = handle_request(daemon, request)
-                    except Exception as exc:  # noqa: BLE001
-                        response = {
-                            "status": "error",
-                            "error": str(exc),
-                        }
-                    conn.sendall(json_dumps(response))
-                    if response.get("shutdown"):
-                        break
-        finally:
-            try:
-                socket_path.unlink()
-            except OSError:
-                pass
-    return 0
+    server = RpcServer(
+        socket_path,
+        lambda request, emit: handle_request(daemon, request, emit),
+        device_actions=DEVICE_ACTIONS,
+    )
+    return server.serve_forever()
 
 
 def main() -> int:
@@ -756,6 +929,9 @@ def main() -> int:
         assembler_dir=args.assembler_dir,
         safe_asm=args.safe_asm,
         monitor_uart=args.monitor_uart,
+        capture_dir=args.capture_dir,
+        capture_compression=args.capture_compression,
+        capture_keep=args.capture_keep,
     )
     try:
         if args.arm_safe_on_start:
@@ -1,7 +1,7 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.11"
-# dependencies = []
+# dependencies = ["numpy>=1.24.0"]
 # ///
 from __future__ import annotations
 
@@ -10,18 +10,19 @@ import json
 import sys
 from pathlib import Path
 
-from pc_e500_ft600 import (
-    annotate_event_stream,
-    compact_event_stream,
-    decode_word_stream,
-    find_measurement_window,
-    infer_execution_window,
-)
+import numpy as np
+
+from pce500_host.ft_artifact import capture_words, is_capture_manifest, load_capture_words
+from pce500_host.ft_decode import DecodedCapture, annotate_event_stream
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Decode FT600 sampled-bus words from an experiment JSON")
-    parser.add_argument("input", type=Path, help="path to experiment JSON produced by expctl/expd")
+    parser.add_argument(
+        "input",
+        type=Path,
+        help="path to experiment JSON produced by expctl/expd, or an FT capture manifest",
+    )
     parser.add_argument("--compact", action="store_true", help="drop synthetic followups and identical adjacent events")
     parser.add_argument("--limit", type=int, default=0, help="maximum number of events to print (0 = all)")
     parser.add_argument("--json", action="store_true", help="emit JSON instead of a text table")
@@ -39,8 +40,10 @@ def load_payload(path: Path) -> dict[str, object]:
     return json.loads(path.read_text())
 
 
-def load_words(payload: dict[str, object]) -> list[int]:
-    return list(payload.get("ft_capture", {}).get("words", []))
+def load_words(payload: dict[str, object], input_path: Path) -> np.ndarray | list[int]:
+    if is_capture_manifest(payload):
+        return load_capture_words(input_path)
+    return capture_words(payload.get("ft_capture", {}), base_dir=input_path.parent)
 
 
 def format_status(event) -> str:
@@ -126,27 +129,23 @@ def render_text(annotated_events) -> int:
 def main() -> int:
     args = build_parser().parse_args()
     payload = load_payload(args.input)
-    words = load_words(payload)
-    events = decode_word_stream(words)
-    if args.window == "measurement":
+    words = load_words(payload, args.input)
+    capture = DecodedCapture(words)
+    window = args.window
+    start_tag = stop_tag = None
+    if window == "measurement":
         measurement = payload.get("measurement", [])
         first = measurement[0] if measurement else None
         if first is not None:
-            window_events = find_measurement_window(
-                events,
-                start_tag=int(first["start_tag"]),
-                stop_tag=int(first["stop_tag"]),
-            )
-            if window_events:
-                events = window_events
-    elif args.window == "execution":
-        window_events = infer_execution_window(events)
-        if window_events:
-            events = window_events
-    if args.compact:
-        events = compact_event_stream(events)
-    if args.limit > 0:
-        events = events[: args.limit]
+            start_tag = int(first["start_tag"])
+            stop_tag = int(first["stop_tag"])
+    events = capture.events(
+        window=window,
+        compact=args.compact,
+        limit=args.limit if args.limit > 0 else None,
+        start_tag=start_tag,
+        stop_tag=stop_tag,
+    ).to_events()
     annotated_events = annotate_event_stream(events)
 
     if args.json:
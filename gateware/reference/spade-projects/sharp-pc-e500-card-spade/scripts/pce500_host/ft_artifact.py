@@ -0,0 +1,189 @@
+"""FT capture words stored next to the run result instead of inside it.
+
+Each run writes the retained words as little-endian ``u32`` into
+``<run_id>.u32`` (``.u32.zst`` / ``.u32.lz4`` when compressed) plus a small
+``<run_id>.json`` manifest. The run payload only carries the manifest, and
+readers memory-map uncompressed word files instead of parsing a JSON list.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+ARTIFACT_FORMAT = "pc-e500-ft-words"
+ARTIFACT_VERSION = 1
+WORD_DTYPE = "<u4"
+COMPRESSIONS = ("none", "zstd", "lz4")
+_SUFFIXES = {"none": ".u32", "zstd": ".u32.zst", "lz4": ".u32.lz4"}
+
+
+def _codec(compression: str):
+    """Module implementing ``compression``, None for uncompressed files."""
+    if compression == "none":
+        return None
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError("zstd capture compression requires the zstandard package") from exc
+        return zstandard
+    if compression == "lz4":
+        try:
+            import lz4.frame
+        except ImportError as exc:
+            raise RuntimeError("lz4 capture compression requires the lz4 package") from exc
+        return lz4.frame
+    raise ValueError(f"unknown capture compression {compression!r}, expected one of {COMPRESSIONS}")
+
+
+def check_compression(compression: str) -> None:
+    """Raise unless ``compression`` is known and its package imports.
+
+    Lets the daemon reject a plan before the hardware run instead of failing
+    while writing the artifact afterwards.
+    """
+    _codec(compression)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    codec = _codec(compression)
+    if codec is None:
+        return data
+    if compression == "zstd":
+        return codec.ZstdCompressor().compress(data)
+    return codec.compress(data)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    codec = _codec(compression)
+    if codec is None:
+        return data
+    if compression == "zstd":
+        return codec.ZstdDecompressor().decompress(data)
+    return codec.decompress(data)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def write_capture_artifact(
+    directory: Path,
+    run_id: str,
+    words: Any,
+    *,
+    compression: str = "none",
+    metadata: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Write ``words`` and its manifest into ``directory``, return the manifest.
+
+    The manifest is written last, so a manifest on disk always points at a
+    complete word file.
+    """
+
+    check_compression(compression)
+    directory.mkdir(parents=True, exist_ok=True)
+    raw = np.ascontiguousarray(words, dtype=WORD_DTYPE).tobytes()
+    data = _compress(raw, compression)
+
+    words_path = directory / f"{run_id}{_SUFFIXES[compression]}"
+    manifest_path = directory / f"{run_id}.json"
+    _write_atomic(words_path, data)
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "run_id": run_id,
+        "dtype": WORD_DTYPE,
+        "word_count": len(raw) // 4,
+        "compression": compression,
+        "byte_count": len(data),
+        "words_file": words_path.name,
+        "metadata": dict(metadata or {}),
+    }
+    _write_atomic(manifest_path, (json.dumps(manifest, indent=2) + "\n").encode())
+    return {**manifest, "manifest_path": str(manifest_path), "words_path": str(words_path)}
+
+
+def is_capture_manifest(payload: Any) -> bool:
+    return isinstance(payload, dict) and payload.get("format") == ARTIFACT_FORMAT
+
+
+def load_capture_manifest(path: Path) -> dict[str, Any]:
+    manifest = json.loads(Path(path).read_text())
+    if not is_capture_manifest(manifest):
+        raise ValueError(f"{path} is not an FT capture manifest")
+    if manifest.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"{path}: unsupported FT capture manifest version {manifest.get('version')!r}")
+    return manifest
+
+
+def load_capture_words(manifest_path: Path) -> np.ndarray:
+    """Words of the artifact behind ``manifest_path``, memory-mapped when uncompressed."""
+
+    manifest_path = Path(manifest_path)
+    manifest = load_capture_manifest(manifest_path)
+    words_path = manifest_path.parent / manifest["words_file"]
+    word_count = int(manifest["word_count"])
+    compression = manifest.get("compression", "none")
+    if compression == "none":
+        if word_count == 0:
+            return np.zeros(0, dtype=WORD_DTYPE)
+        return np.memmap(words_path, dtype=WORD_DTYPE, mode="r", shape=(word_count,))
+    words = np.frombuffer(_decompress(words_path.read_bytes(), compression), dtype=WORD_DTYPE)
+    if len(words) != word_count:
+        raise ValueError(f"{words_path}: expected {word_count} words, got {len(words)}")
+    return words
+
+
+def capture_words(ft_capture: dict[str, Any], base_dir: Path | None = None) -> np.ndarray | list[int]:
+    """Words of a run's ``ft_capture`` payload.
+
+    Reads the artifact when the payload has one, relative manifest paths are
+    resolved against ``base_dir``. Payloads that still embed ``words`` (older
+    results, the Rust daemon) return that list as is.
+    """
+
+    artifact = ft_capture.get("artifact")
+    if artifact:
+        manifest_path = Path(artifact["manifest_path"])
+        if not manifest_path.is_absolute() and base_dir is not None:
+            manifest_path = base_dir / manifest_path
+        return load_capture_words(manifest_path)
+    return list(ft_capture.get("words") or [])
+
+
+def list_capture_artifacts(directory: Path) -> list[tuple[Path, dict[str, Any]]]:
+    """``(manifest_path, manifest)`` of every artifact in ``directory``, oldest first."""
+
+    if not directory.is_dir():
+        return []
+    artifacts = []
+    for path in directory.glob("*.json"):
+        try:
+            artifacts.append((path.stat().st_mtime, path, load_capture_manifest(path)))
+        except (OSError, ValueError):
+            continue
+    artifacts.sort(key=lambda artifact: (artifact[0], artifact[1].name))
+    return [(path, manifest) for _, path, manifest in artifacts]
+
+
+def prune_capture_artifacts(directory: Path, keep: int) -> list[Path]:
+    """Delete all but the newest ``keep`` artifacts in ``directory``, return the removed manifests."""
+
+    if keep <= 0:
+        return []
+    artifacts = list_capture_artifacts(directory)
+    removed = []
+    for manifest_path, manifest in artifacts[: max(len(artifacts) - keep, 0)]:
+        (manifest_path.parent / manifest["words_file"]).unlink(missing_ok=True)
+        manifest_path.unlink(missing_ok=True)
+        removed.append(manifest_path)
+    return removed
@@ -0,0 +1,508 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+
+SUPERVISOR_ROM_MIN = 0x10000
+SUPERVISOR_ROM_MAX = 0x100FF
+EXPERIMENT_ROM_MIN = 0x10100
+EXPERIMENT_ROM_MAX = 0x106FF
+COMMAND_BLOCK_MIN = 0x107E0
+COMMAND_BLOCK_MAX = 0x107FF
+CTRL_RANGE_MIN = 0x1FFF0
+CTRL_RANGE_MAX = 0x1FFFF
+HI_STACK_MIN = 0x3F800
+HI_STACK_MAX = 0x3FFFF
+
+CTRL_ADDR_LABELS = {
+    0x1FFF0: "MARK_START",
+    0x1FFF1: "ECHO",
+    0x1FFF2: "MARK_STOP",
+    0x1FFF3: "MARK_ABORT",
+    0x1FFF4: "FT_STREAM_CFG",
+    0x1FFF5: "FT_STREAM_MODE",
+}
+
+STATUS_RW = 0x01
+STATUS_CE1_ACTIVE = 0x02
+STATUS_CE6_ACTIVE = 0x04
+STATUS_SYNTHETIC_FOLLOWUP = 0x08
+STATUS_FROM_CYCLE_START = 0x10
+STATUS_CTRL_RANGE = 0x20
+
+# kind code = 2 * bus + rw, bus: 0 address only, 1 CE1, 2 CE6, 3 CE6 control range
+KIND_NAMES = (
+    "addr_only_write",
+    "addr_only_read",
+    "ce1_write",
+    "ce1_read",
+    "ce6_write",
+    "ce6_read",
+    "ce6_ctrl_write",
+    "ce6_ctrl_read",
+)
+KIND_CODES = {name: code for code, name in enumerate(KIND_NAMES)}
+KIND_ADDR_ONLY_MAX = KIND_CODES["addr_only_read"]
+KIND_CE6_MIN = KIND_CODES["ce6_write"]
+
+
+def _kind_table() -> np.ndarray:
+    status = np.arange(64)
+    bus = np.zeros(64, dtype=np.uint8)
+    bus[(status & STATUS_CE1_ACTIVE) != 0] = 1
+    bus[(status & STATUS_CE6_ACTIVE) != 0] = 2
+    bus[((status & STATUS_CE6_ACTIVE) != 0) & ((status & STATUS_CTRL_RANGE) != 0)] = 3
+    return (2 * bus + (status & STATUS_RW)).astype(np.uint8)
+
+
+_STATUS_KIND = _kind_table()
+_STATUS_KIND_NAME = tuple(KIND_NAMES[kind] for kind in _STATUS_KIND)
+
+
+@dataclass(frozen=True)
+class FtSampleWord:
+    raw_word: int
+    addr: int
+    data: int
+    status: int
+
+
+@dataclass(frozen=True)
+class FtDecodedEvent:
+    index: int
+    raw_word: int
+    addr: int
+    data: int
+    status: int
+    rw: bool
+    ce1_active: bool
+    ce6_active: bool
+    synthetic_followup: bool
+    from_cycle_start: bool
+    ctrl_range: bool
+    kind: str
+
+
+@dataclass(frozen=True)
+class FtAnnotatedEvent:
+    event: FtDecodedEvent
+    region: str
+    addr_label: str | None
+    note: str | None
+
+
+def decode_sampled_word(word: int) -> FtSampleWord:
+    return FtSampleWord(
+        raw_word=word & 0xFFFFFFFF,
+        addr=word & 0x3FFFF,
+        data=(word >> 18) & 0xFF,
+        status=(word >> 26) & 0x3F,
+    )
+
+
+def decode_status_flags(status: int) -> dict[str, bool]:
+    return {
+        "rw": bool(status & STATUS_RW),
+        "ce1_active": bool(status & STATUS_CE1_ACTIVE),
+        "ce6_active": bool(status & STATUS_CE6_ACTIVE),
+        "synthetic_followup": bool(status & STATUS_SYNTHETIC_FOLLOWUP),
+        "from_cycle_start": bool(status & STATUS_FROM_CYCLE_START),
+        "ctrl_range": bool(status & STATUS_CTRL_RANGE),
+    }
+
+
+def _make_event(index: int, raw_word: int, addr: int, data: int, status: int) -> FtDecodedEvent:
+    return FtDecodedEvent(
+        index=index,
+        raw_word=raw_word,
+        addr=addr,
+        data=data,
+        status=status,
+        rw=bool(status & STATUS_RW),
+        ce1_active=bool(status & STATUS_CE1_ACTIVE),
+        ce6_active=bool(status & STATUS_CE6_ACTIVE),
+        synthetic_followup=bool(status & STATUS_SYNTHETIC_FOLLOWUP),
+        from_cycle_start=bool(status & STATUS_FROM_CYCLE_START),
+        ctrl_range=bool(status & STATUS_CTRL_RANGE),
+        kind=_STATUS_KIND_NAME[status],
+    )
+
+
+def classify_decoded_word(word: int, *, index: int = 0) -> FtDecodedEvent:
+    decoded = decode_sampled_word(word)
+    return _make_event(index, decoded.raw_word, decoded.addr, decoded.data, decoded.status)
+
+
+@dataclass
+class FtEventColumns:
+    """Decoded FT words as parallel arrays, the columnar form of ``list[FtDecodedEvent]``.
+
+    Slicing and fancy indexing return ``FtEventColumns`` over the same
+    columns, ``FtDecodedEvent`` objects are only built by ``to_events``.
+    """
+
+    index: np.ndarray  # int64, position in the decoded word stream
+    raw_word: np.ndarray  # uint32
+    addr: np.ndarray  # uint32
+    data: np.ndarray  # uint8
+    status: np.ndarray  # uint8
+    kind: np.ndarray  # uint8, index into KIND_NAMES
+
+    @classmethod
+    def decode(cls, words: Iterable[int] | np.ndarray | bytes | memoryview) -> FtEventColumns:
+        """Decode words given as ints, a uint32 array or little-endian packed bytes."""
+        if isinstance(words, (bytes, bytearray, memoryview)):
+            raw = np.frombuffer(words, dtype="<u4")
+        elif isinstance(words, np.ndarray):
+            raw = words.astype(np.uint32, copy=False)
+        else:
+            raw = np.array(words, dtype=np.int64).astype(np.uint32)
+        status = ((raw >> 26) & 0x3F).astype(np.uint8)
+        return cls(
+            index=np.arange(len(raw), dtype=np.int64),
+            raw_word=raw,
+            addr=raw & 0x3FFFF,
+            data=((raw >> 18) & 0xFF).astype(np.uint8),
+            status=status,
+            kind=_STATUS_KIND[status],
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, key) -> FtEventColumns:
+        return FtEventColumns(**{f.name: getattr(self, f.name)[key] for f in fields(self)})
+
+    @property
+    def rw(self) -> np.ndarray:
+        return (self.status & STATUS_RW) != 0
+
+    @property
+    def synthetic_followup(self) -> np.ndarray:
+        return (self.status & STATUS_SYNTHETIC_FOLLOWUP) != 0
+
+    def to_events(self) -> list[FtDecodedEvent]:
+        return [
+            _make_event(*row)
+            for row in zip(
+                self.index.tolist(),
+                self.raw_word.tolist(),
+                self.addr.tolist(),
+                self.data.tolist(),
+                self.status.tolist(),
+            )
+        ]
+
+
+def decode_word_columns(words: Iterable[int] | np.ndarray | bytes | memoryview) -> FtEventColumns:
+    return FtEventColumns.decode(words)
+
+
+def decode_word_stream(words: Iterable[int] | np.ndarray | bytes | memoryview) -> list[FtDecodedEvent]:
+    return FtEventColumns.decode(words).to_events()
+
+
+def annotate_address(addr: int) -> tuple[str, str | None, str | None]:
+    if addr in CTRL_ADDR_LABELS:
+        return ("ce6_ctrl", CTRL_ADDR_LABELS[addr], None)
+    if COMMAND_BLOCK_MIN <= addr <= COMMAND_BLOCK_MAX:
+        return ("command_block", f"CMD+0x{addr - COMMAND_BLOCK_MIN:02X}", None)
+    if EXPERIMENT_ROM_MIN <= addr <= EXPERIMENT_ROM_MAX:
+        return ("experiment_rom", None, None)
+    if SUPERVISOR_ROM_MIN <= addr <= SUPERVISOR_ROM_MAX:
+        return ("supervisor_rom", None, None)
+    if CTRL_RANGE_MIN <= addr <= CTRL_RANGE_MAX:
+        return ("ce6_ctrl", None, None)
+    if HI_STACK_MIN <= addr <= HI_STACK_MAX:
+        return ("high_stack_window", None, "likely stack/internal high memory")
+    return ("other", None, None)
+
+
+def annotate_event(event: FtDecodedEvent) -> FtAnnotatedEvent:
+    region, addr_label, note = annotate_address(event.addr)
+    return FtAnnotatedEvent(event=event, region=region, addr_label=addr_label, note=note)
+
+
+def annotate_event_stream(events: list[FtDecodedEvent]) -> list[FtAnnotatedEvent]:
+    return [annotate_event(event) for event in events]
+
+
+def _first(mask: np.ndarray, start: int = 0) -> int | None:
+    hits = np.flatnonzero(mask[start:])
+    return int(hits[0]) + start if len(hits) else None
+
+
+def measurement_window_bounds(columns: FtEventColumns, *, start_tag: int, stop_tag: int) -> tuple[int, int] | None:
+    """``[start, end)`` positions of the MARK_START .. MARK_STOP writes, ``None`` without a start mark."""
+    ctrl_write = columns.kind == KIND_CODES["ce6_ctrl_write"]
+    start = _first(ctrl_write & (columns.addr == 0x1FFF0) & (columns.data == (start_tag & 0xFF)))
+    if start is None:
+        return None
+    stop = _first(ctrl_write & (columns.addr == 0x1FFF2) & (columns.data == (stop_tag & 0xFF)), start + 1)
+    return (start, len(columns) if stop is None else stop + 1)
+
+
+def execution_window_bounds(columns: FtEventColumns) -> tuple[int, int] | None:
+    """From the first experiment ROM access to the first CE6 supervisor ROM access after it."""
+    start = _first((columns.addr >= EXPERIMENT_ROM_MIN) & (columns.addr <= EXPERIMENT_ROM_MAX))
+    if start is None:
+        return None
+    # a supervisor address is never in the experiment ROM, so the experiment has been left by then
+    returned = (columns.addr >= SUPERVISOR_ROM_MIN) & (columns.addr <= SUPERVISOR_ROM_MAX) & (columns.kind >= KIND_CE6_MIN)
+    stop = _first(returned, start + 1)
+    return (start, len(columns) if stop is None else stop + 1)
+
+
+def compact_positions(columns: FtEventColumns) -> np.ndarray:
+    """Positions of the events ``compact_event_stream`` keeps, in order.
+
+    An event is only ever compared with the last kept one, and that always
+    has a different addr/data than the first event of a run of equal
+    addr/data, so runs are independent. Single-event runs are kept as they
+    are and only the events of longer runs go through the sequential rules.
+    """
+
+    n = len(columns)
+    synthetic = columns.synthetic_followup
+    addr_only = columns.kind <= KIND_ADDR_ONLY_MAX
+    # synthetic address-only events never survive and never replace anything
+    candidates = np.flatnonzero(~(synthetic & addr_only))
+    if n == 0 or len(candidates) == 0:
+        return candidates
+
+    addr = columns.addr[candidates]
+    data = columns.data[candidates]
+    run_start = np.ones(len(candidates), dtype=bool)
+    run_start[1:] = (addr[1:] != addr[:-1]) | (data[1:] != data[:-1])
+    run_end = np.ones(len(candidates), dtype=bool)
+    run_end[:-1] = run_start[1:]
+    keep = run_start.copy()
+
+    in_long_run = ~(run_start & run_end)
+    if in_long_run.any():
+        positions = candidates[in_long_run]
+        kinds = columns.kind[positions].tolist()
+        syns = synthetic[positions].tolist()
+        starts = run_start[in_long_run].tolist()
+        kept = keep[in_long_run]
+        replaced_by = {}
+        last = 0
+        for i, (kind, syn, starts_run) in enumerate(zip(kinds, syns, starts)):
+            if starts_run:
+                last = i
+                continue
+            prev_kind, prev_syn = kinds[last], syns[last]
+            if syn and prev_kind <= KIND_ADDR_ONLY_MAX and kind > KIND_ADDR_ONLY_MAX:
+                # a late CE-qualified followup replaces its address-only seed
+                replaced_by[last] = i
+                kinds[last], syns[last] = kind, syn
+                continue
+            if prev_kind == kind and (syn or not prev_syn):
+                continue
+            kept[i] = True
+            last = i
+        keep[in_long_run] = kept
+        result = candidates.copy()
+        long_positions = np.flatnonzero(in_long_run)
+        for seed, replacement in replaced_by.items():
+            result[long_positions[seed]] = positions[replacement]
+        return result[keep]
+    return candidates[keep]
+
+
+def compact_event_columns(columns: FtEventColumns) -> FtEventColumns:
+    return columns[compact_positions(columns)]
+
+
+def find_measurement_window(
+    events: list[FtDecodedEvent],
+    *,
+    start_tag: int,
+    stop_tag: int,
+) -> list[FtDecodedEvent]:
+    start_index: int | None = None
+    for index, event in enumerate(events):
+        if event.kind == "ce6_ctrl_write" and event.addr == 0x1FFF0 and event.data == (start_tag & 0xFF):
+            start_index = index
+            break
+    if start_index is None:
+        return []
+    for index in range(start_index + 1, len(events)):
+        event = events[index]
+        if event.kind == "ce6_ctrl_write" and event.addr == 0x1FFF2 and event.data == (stop_tag & 0xFF):
+            return events[start_index : index + 1]
+    return events[start_index:]
+
+
+def infer_execution_window(events: list[FtDecodedEvent]) -> list[FtDecodedEvent]:
+    start_index: int | None = None
+    left_experiment = False
+    for index, event in enumerate(events):
+        if start_index is None:
+            if EXPERIMENT_ROM_MIN <= event.addr <= EXPERIMENT_ROM_MAX:
+                start_index = index
+            continue
+        if not (EXPERIMENT_ROM_MIN <= event.addr <= EXPERIMENT_ROM_MAX):
+            left_experiment = True
+        if (
+            left_experiment
+            and SUPERVISOR_ROM_MIN <= event.addr <= SUPERVISOR_ROM_MAX
+            and event.kind.startswith("ce6_")
+        ):
+            return events[start_index : index + 1]
+    return events[start_index:] if start_index is not None else []
+
+
+def compact_event_stream(events: list[FtDecodedEvent]) -> list[FtDecodedEvent]:
+    compacted: list[FtDecodedEvent] = []
+    for event in events:
+        if compacted:
+            previous = compacted[-1]
+            # A late CE-qualified synthetic followup after an address-only seed is
+            # usually the more useful representation of the real bus action.
+            if (
+                event.synthetic_followup
+                and previous.addr == event.addr
+                and previous.data == event.data
+                and previous.kind.startswith("addr_only")
+                and not event.kind.startswith("addr_only")
+            ):
+                compacted[-1] = event
+                continue
+            if (
+                previous.addr == event.addr
+                and previous.data == event.data
+                and previous.kind == event.kind
+                and previous.synthetic_followup == event.synthetic_followup
+            ):
+                continue
+        if event.synthetic_followup and compacted:
+            previous = compacted[-1]
+            if (
+                previous.addr == event.addr
+                and previous.data == event.data
+                and previous.kind == event.kind
+            ):
+                continue
+        if event.synthetic_followup and event.kind.startswith("addr_only"):
+            continue
+        compacted.append(event)
+    return compacted
+
+
+def _preview_row(annotated: FtAnnotatedEvent) -> dict[str, object]:
+    event = annotated.event
+    return {
+        "index": event.index,
+        "raw_word": event.raw_word,
+        "raw_hex": f"{event.raw_word:08X}",
+        "addr": event.addr,
+        "data": event.data,
+        "status": event.status,
+        "kind": event.kind,
+        "rw": event.rw,
+        "ce1_active": event.ce1_active,
+        "ce6_active": event.ce6_active,
+        "synthetic_followup": event.synthetic_followup,
+        "from_cycle_start": event.from_cycle_start,
+        "ctrl_range": event.ctrl_range,
+        "region": annotated.region,
+        "addr_label": annotated.addr_label,
+        "note": annotated.note,
+    }
+
+
+def preview_rows(columns: FtEventColumns) -> list[dict[str, object]]:
+    return [_preview_row(annotated) for annotated in annotate_event_stream(columns.to_events())]
+
+
+class DecodedCapture:
+    """One capture decoded once, serving any window, compaction and preview from it.
+
+    Window bounds and compacted positions are computed on first use and
+    kept, preview rows are built once per event and shared between previews.
+    """
+
+    def __init__(self, words: Iterable[int] | np.ndarray | bytes | memoryview | FtEventColumns) -> None:
+        self.columns = words if isinstance(words, FtEventColumns) else FtEventColumns.decode(words)
+        self._bounds: dict[tuple[object, ...], tuple[int, int] | None] = {}
+        self._compacted: dict[tuple[object, ...], FtEventColumns] = {}
+        self._rows: dict[int, dict[str, object]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def _window_key(self, window: str, start_tag: int | None, stop_tag: int | None) -> tuple[object, ...]:
+        if window == "measurement" and start_tag is not None and stop_tag is not None:
+            return ("measurement", start_tag & 0xFF, stop_tag & 0xFF)
+        if window == "execution":
+            return ("execution",)
+        return ("all",)
+
+    def _window_bounds(self, key: tuple[object, ...]) -> tuple[int, int] | None:
+        if key not in self._bounds:
+            if key[0] == "measurement":
+                self._bounds[key] = measurement_window_bounds(self.columns, start_tag=key[1], stop_tag=key[2])
+            elif key[0] == "execution":
+                self._bounds[key] = execution_window_bounds(self.columns)
+            else:
+                self._bounds[key] = None
+        return self._bounds[key]
+
+    def measurement_bounds(self, *, start_tag: int, stop_tag: int) -> tuple[int, int] | None:
+        return self._window_bounds(("measurement", start_tag & 0xFF, stop_tag & 0xFF))
+
+    def execution_bounds(self) -> tuple[int, int] | None:
+        return self._window_bounds(("execution",))
+
+    def events(
+        self,
+        *,
+        window: str = "all",
+        compact: bool = False,
+        limit: int | None = None,
+        start_tag: int | None = None,
+        stop_tag: int | None = None,
+    ) -> FtEventColumns:
+        """A view of the selected events, all of them when the window isn't found."""
+        key = self._window_key(window, start_tag, stop_tag)
+        if compact:
+            if key not in self._compacted:
+                self._compacted[key] = compact_event_columns(self.events(window=window, start_tag=start_tag, stop_tag=stop_tag))
+            columns = self._compacted[key]
+        else:
+            bounds = self._window_bounds(key)
+            columns = self.columns if bounds is None else self.columns[bounds[0] : bounds[1]]
+        return columns if limit is None else columns[:limit]
+
+    def preview(
+        self,
+        *,
+        limit: int = 32,
+        compact: bool = False,
+        window: str = "all",
+        start_tag: int | None = None,
+        stop_tag: int | None = None,
+    ) -> list[dict[str, object]]:
+        columns = self.events(window=window, compact=compact, limit=limit, start_tag=start_tag, stop_tag=stop_tag)
+        missing = [i for i, index in enumerate(columns.index.tolist()) if index not in self._rows]
+        if missing:
+            for row in preview_rows(columns[missing]):
+                self._rows[row["index"]] = row
+        return [self._rows[index] for index in columns.index.tolist()]
+
+
+def preview_event_stream(
+    words: Iterable[int] | np.ndarray | bytes | memoryview | FtEventColumns | DecodedCapture,
+    *,
+    limit: int = 32,
+    compact: bool = False,
+    window: str = "all",
+    start_tag: int | None = None,
+    stop_tag: int | None = None,
+) -> list[dict[str, object]]:
+    capture = words if isinstance(words, DecodedCapture) else DecodedCapture(words)
+    return capture.preview(limit=limit, compact=compact, window=window, start_tag=start_tag, stop_tag=stop_tag)
@@ -0,0 +1,126 @@
+"""Fan-out of live FT words from the capture reader thread to subscribers.
+
+The reader thread calls ``FtBroadcaster.publish`` for every decoded chunk.
+Publishing never blocks on a subscriber: each one has a bounded buffer and
+when a slow consumer lets it fill up, the oldest chunks are dropped and
+counted instead.
+"""
+
+from __future__ import annotations
+
+import collections
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+
+DEFAULT_SUBSCRIBER_MAX_WORDS = 65_536
+
+
+@dataclass(frozen=True)
+class FtStreamBatch:
+    start_index: int  # stream word index of words[0]
+    words: np.ndarray  # <u4, consecutive unless dropped_words grew
+    dropped_words: int  # total for this subscriber so far
+    dropped_chunks: int
+
+
+class FtSubscriber:
+    def __init__(self, max_words: int = DEFAULT_SUBSCRIBER_MAX_WORDS) -> None:
+        self.max_words = max(1, int(max_words))
+        self.dropped_words = 0
+        self.dropped_chunks = 0
+        self.delivered_words = 0
+        self._chunks: collections.deque[tuple[int, bytes]] = collections.deque()
+        self._buffered_words = 0
+        self._ready = threading.Condition()
+
+    def offer(self, start_index: int, data: bytes) -> None:
+        """Queue a chunk of packed words, dropping the oldest ones when full."""
+
+        word_count = len(data) // 4
+        with self._ready:
+            self._chunks.append((start_index, data))
+            self._buffered_words += word_count
+            while self._buffered_words > self.max_words and len(self._chunks) > 1:
+                _, dropped = self._chunks.popleft()
+                self._buffered_words -= len(dropped) // 4
+                self.dropped_words += len(dropped) // 4
+                self.dropped_chunks += 1
+            self._ready.notify()
+
+    def get(self, timeout: float | None = None, max_words: int | None = None) -> FtStreamBatch | None:
+        """Wait up to ``timeout`` for words, return the consecutive ones at the head of the buffer.
+
+        A batch stops at a gap left by dropped chunks, so ``start_index``
+        always locates every word in it. Returns None on timeout.
+        """
+
+        with self._ready:
+            if not self._chunks and not self._ready.wait_for(lambda: bool(self._chunks), timeout):
+                return None
+            start_index = self._chunks[0][0]
+            parts = []
+            next_index = start_index
+            taken = 0
+            while self._chunks and self._chunks[0][0] == next_index:
+                chunk_start, data = self._chunks[0]
+                chunk_words = len(data) // 4
+                if max_words is not None and taken and taken + chunk_words > max_words:
+                    break
+                if max_words is not None and chunk_words > max_words - taken:
+                    # split an oversized chunk, the rest stays queued
+                    split = (max_words - taken) * 4
+                    parts.append(data[:split])
+                    self._chunks[0] = (chunk_start + max_words - taken, data[split:])
+                    self._buffered_words -= max_words - taken
+                    taken = max_words
+                    break
+                self._chunks.popleft()
+                self._buffered_words -= chunk_words
+                parts.append(data)
+                taken += chunk_words
+                next_index += chunk_words
+            self.delivered_words += taken
+            return FtStreamBatch(
+                start_index=start_index,
+                words=np.frombuffer(b"".join(parts), dtype="<u4"),
+                dropped_words=self.dropped_words,
+                dropped_chunks=self.dropped_chunks,
+            )
+
+    def stats(self) -> dict[str, int]:
+        with self._ready:
+            return {
+                "max_words": self.max_words,
+                "buffered_words": self._buffered_words,
+                "delivered_words": self.delivered_words,
+                "dropped_words": self.dropped_words,
+                "dropped_chunks": self.dropped_chunks,
+            }
+
+
+class FtBroadcaster:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # replaced, never mutated, so publish reads it without the lock
+        self._subscribers: tuple[FtSubscriber, ...] = ()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, max_words: int = DEFAULT_SUBSCRIBER_MAX_WORDS) -> FtSubscriber:
+        subscriber = FtSubscriber(max_words)
+        with self._lock:
+            self._subscribers = (*self._subscribers, subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FtSubscriber) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscriber)
+
+    def publish(self, start_index: int, data: bytes) -> None:
+        for subscriber in self._subscribers:
+            subscriber.offer(start_index, data)
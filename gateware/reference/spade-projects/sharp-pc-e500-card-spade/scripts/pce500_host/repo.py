@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def find_repo_root(start: Path, marker: str = "py/d3xx/ftd3xx.py") -> Path:
+    """Closest of ``start`` and its parents that contains ``marker``."""
+    for candidate in [start, *start.parents]:
+        if (candidate / marker).is_file():
+            return candidate
+    raise RuntimeError(f"failed to locate retrobus-explorer repo root from {start}")
+
+
+def load_module_from_path(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed to load module {name} from {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,170 @@
+"""Multi-client newline-framed JSON server for the supervisor daemon.
+
+Every connection gets its own thread and may send any number of requests,
+one JSON object per line. Requests that carry an ``"id"`` are dispatched
+concurrently and their responses echo that id, so they can be pipelined and
+answered out of order. Requests without an id are answered in order, which
+keeps one-request-per-connection clients working unchanged.
+
+Actions in ``device_actions`` touch the hardware and are serialized through
+a single device worker thread; everything else (status, last result,
+capture artifacts) runs on the connection's thread and is not held up by a
+slow ``run``.
+
+A handler may call ``emit(payload)`` any number of times before returning to
+stream intermediate messages. They are sent as ``{"status": "progress", ...}``
+lines ahead of the final response, only for requests that set
+``"stream": true``. ``emit`` returns False once the client is gone; a
+message that can't be delivered is dropped, so a device action always runs
+to completion, while an open-ended stream can check the result and stop.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from collections.abc import Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+
+Emit = Callable[[dict[str, Any]], bool]
+Handler = Callable[[dict[str, Any], Emit | None], dict[str, Any]]
+
+ACCEPT_POLL_S = 0.2
+
+
+def encode_message(payload: dict[str, Any]) -> bytes:
+    return (json.dumps(payload, sort_keys=True) + "\n").encode("utf-8")
+
+
+class _Connection:
+    def __init__(self, server: RpcServer, conn: socket.socket) -> None:
+        self.server = server
+        self.conn = conn
+        self._write_lock = threading.Lock()
+        self._pending: list[threading.Thread] = []
+
+    def send(self, payload: dict[str, Any]) -> bool:
+        data = encode_message(payload)
+        with self._write_lock:
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                # the client went away, the request still ran to completion
+                return False
+        return True
+
+    def serve(self) -> None:
+        with self.conn:
+            buffer = bytearray()
+            while not self.server.stopped:
+                try:
+                    chunk = self.conn.recv(65536)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                buffer.extend(chunk)
+                while b"\n" in buffer:
+                    line, _, rest = bytes(buffer).partition(b"\n")
+                    buffer = bytearray(rest)
+                    if line.strip():
+                        self._dispatch(line)
+            if buffer.strip():
+                # a final request without the trailing newline
+                self._dispatch(bytes(buffer))
+            for thread in self._pending:
+                thread.join()
+
+    def _dispatch(self, line: bytes) -> None:
+        try:
+            request = json.loads(line.decode("utf-8"))
+            if not isinstance(request, dict):
+                raise TypeError("request must be a JSON object")
+        except Exception as exc:  # noqa: BLE001
+            self.send({"status": "error", "error": f"invalid request: {exc}"})
+            return
+        if "id" not in request:
+            self._run(request)
+            return
+        thread = threading.Thread(target=self._run, args=(request,), daemon=True)
+        self._pending = [pending for pending in self._pending if pending.is_alive()]
+        self._pending.append(thread)
+        thread.start()
+
+    def _run(self, request: dict[str, Any]) -> None:
+        tag = {"id": request["id"]} if "id" in request else {}
+        emit = None
+        if request.get("stream"):
+
+            def emit(payload: dict[str, Any]) -> bool:
+                return self.send({**payload, "status": "progress", **tag})
+
+        try:
+            response = self.server.call(request, emit)
+        except Exception as exc:  # noqa: BLE001
+            response = {
+                "status": "error",
+                "error": str(exc),
+            }
+        self.send({**response, **tag})
+        if response.get("shutdown"):
+            self.server.stop()
+
+
+class RpcServer:
+    def __init__(
+        self,
+        socket_path: Path,
+        handler: Handler,
+        *,
+        device_actions: Collection[str],
+    ) -> None:
+        self.socket_path = socket_path
+        self.handler = handler
+        self.device_actions = frozenset(device_actions)
+        self._device_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="device")
+        self._stop_event = threading.Event()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def call(self, request: dict[str, Any], emit: Emit | None = None) -> dict[str, Any]:
+        if request.get("action") in self.device_actions:
+            return self._device_worker.submit(self.handler, request, emit).result()
+        return self.handler(request, emit)
+
+    def serve_forever(self, ready: threading.Event | None = None) -> int:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(self.socket_path))
+            server.listen()
+            server.settimeout(ACCEPT_POLL_S)
+            if ready is not None:
+                ready.set()
+            try:
+                while not self.stopped:
+                    try:
+                        conn, _ = server.accept()
+                    except TimeoutError:
+                        continue
+                    conn.settimeout(None)
+                    connection = _Connection(self, conn)
+                    threading.Thread(target=connection.serve, daemon=True).start()
+            finally:
+                self._device_worker.shutdown(wait=True)
+                try:
+                    self.socket_path.unlink()
+                except OSError:
+                    pass
+        return 0
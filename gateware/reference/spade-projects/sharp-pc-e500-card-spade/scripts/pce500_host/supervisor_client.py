@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import socket
 import time
+from collections.abc import Callable
 from pathlib import Path
 
 
@@ -23,8 +24,20 @@ def resolve_socket(socket_path: Path) -> Path:
     return socket_path
 
 
-def send_request(socket_path: Path, payload: dict[str, object]) -> dict[str, object]:
+def send_request(
+    socket_path: Path,
+    payload: dict[str, object],
+    on_progress: Callable[[dict[str, object]], None] | None = None,
+) -> dict[str, object]:
+    """Send one request and return its response.
+
+    With ``on_progress`` the request asks for a streamed response and every
+    ``"progress"`` message ahead of the final response is passed to it.
+    """
+
     resolved_socket = resolve_socket(socket_path)
+    if on_progress is not None:
+        payload = {**payload, "stream": True}
     response = bytearray()
     last_error: OSError | None = None
     for attempt in range(CONNECT_RETRIES):
@@ -37,7 +50,14 @@ def send_request(socket_path: Path, payload: dict[str, object]) -> dict[str, obj
                     if not chunk:
                         break
                     response.extend(chunk)
-                    if b"\n" in chunk:
+                    while on_progress is not None and b"\n" in response:
+                        line, _, rest = bytes(response).partition(b"\n")
+                        message = json.loads(line.decode("utf-8"))
+                        if message.get("status") != "progress":
+                            break
+                        on_progress(message)
+                        response = bytearray(rest)
+                    if b"\n" in response:
                         break
             last_error = None
             break
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from pce500_host.ft_artifact import (
+    capture_words,
+    check_compression,
+    is_capture_manifest,
+    load_capture_words,
+    prune_capture_artifacts,
+    write_capture_artifact,
+)
+
+
+def test_artifact_round_trip_is_memory_mapped(tmp_path):
+    words = np.arange(1000, dtype=np.uint32) * 0x01010101
+    artifact = write_capture_artifact(tmp_path, "run-0001", words, metadata={"experiment": "demo"})
+
+    assert (tmp_path / "run-0001.u32").read_bytes() == words.astype("<u4").tobytes()
+    manifest = json.loads((tmp_path / "run-0001.json").read_text())
+    assert is_capture_manifest(manifest)
+    assert manifest["word_count"] == 1000
+    assert manifest["metadata"] == {"experiment": "demo"}
+
+    loaded = load_capture_words(artifact["manifest_path"])
+    assert isinstance(loaded, np.memmap)
+    assert loaded.tolist() == words.tolist()
+    assert capture_words({"artifact": {"manifest_path": "run-0001.json"}}, base_dir=tmp_path).tolist() == words.tolist()
+
+
+def test_empty_and_legacy_captures(tmp_path):
+    artifact = write_capture_artifact(tmp_path, "empty", [])
+    assert len(load_capture_words(artifact["manifest_path"])) == 0
+    assert capture_words({"words": [1, 2, 3]}) == [1, 2, 3]
+    assert capture_words({}) == []
+
+
+def test_unknown_or_missing_compression(tmp_path):
+    check_compression("none")
+    with pytest.raises(ValueError):
+        check_compression("gzip")
+    with pytest.raises(ValueError):
+        write_capture_artifact(tmp_path, "run", [1], compression="gzip")
+    for compression, module in (("zstd", "zstandard"), ("lz4", "lz4.frame")):
+        try:
+            __import__(module)
+        except ImportError:
+            with pytest.raises(RuntimeError):
+                check_compression(compression)
+            with pytest.raises(RuntimeError):
+                write_capture_artifact(tmp_path, "run", [1], compression=compression)
+        else:
+            artifact = write_capture_artifact(tmp_path, f"run-{compression}", [1, 2], compression=compression)
+            assert load_capture_words(artifact["manifest_path"]).tolist() == [1, 2]
+
+
+def test_prune_keeps_newest(tmp_path):
+    for i in range(5):
+        artifact = write_capture_artifact(tmp_path, f"run-{i}", [i])
+        os.utime(artifact["manifest_path"], (i, i))
+    removed = prune_capture_artifacts(tmp_path, keep=2)
+
+    assert sorted(path.name for path in removed) == ["run-0.json", "run-1.json", "run-2.json"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["run-3.json", "run-3.u32", "run-4.json", "run-4.u32"]
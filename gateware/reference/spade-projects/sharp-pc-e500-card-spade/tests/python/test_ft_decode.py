@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import random
+import struct
+
+import pytest
+
+from pce500_host.ft_decode import (
+    EXPERIMENT_ROM_MIN,
+    SUPERVISOR_ROM_MIN,
+    DecodedCapture,
+    FtEventColumns,
+    annotate_event_stream,
+    classify_decoded_word,
+    compact_event_columns,
+    compact_event_stream,
+    execution_window_bounds,
+    find_measurement_window,
+    infer_execution_window,
+    measurement_window_bounds,
+    preview_event_stream,
+)
+
+
+def make_word(addr: int, data: int, status: int) -> int:
+    return (status << 26) | (data << 18) | addr
+
+
+def random_words(rng: random.Random, count: int) -> list[int]:
+    addrs = [0x1FFF0, 0x1FFF2, SUPERVISOR_ROM_MIN + 4, EXPERIMENT_ROM_MIN + 8, 0x3F900, 0x00123]
+    words = []
+    while len(words) < count:
+        addr = rng.choice(addrs)
+        data = rng.choice([0x11, 0x12, rng.randrange(256)])
+        # runs of the same addr/data with varying status exercise the compaction rules
+        for _ in range(rng.choice([1, 1, 2, 3, 5])):
+            words.append(make_word(addr, data, rng.randrange(64)))
+    return words[:count]
+
+
+def test_decode_matches_per_word_classification():
+    words = random_words(random.Random(0), 2000)
+    columns = FtEventColumns.decode(words)
+    assert columns.to_events() == [classify_decoded_word(word, index=i) for i, word in enumerate(words)]
+    packed = struct.pack(f"<{len(words)}I", *words)
+    assert FtEventColumns.decode(packed).to_events() == columns.to_events()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compaction_matches_event_stream(seed: int):
+    words = random_words(random.Random(seed), 3000)
+    columns = FtEventColumns.decode(words)
+    assert compact_event_columns(columns).to_events() == compact_event_stream(columns.to_events())
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_windows_match_event_stream(seed: int):
+    words = random_words(random.Random(100 + seed), 500)
+    columns = FtEventColumns.decode(words)
+    events = columns.to_events()
+
+    bounds = measurement_window_bounds(columns, start_tag=0x11, stop_tag=0x12)
+    expected = find_measurement_window(events, start_tag=0x11, stop_tag=0x12)
+    assert (events[bounds[0] : bounds[1]] if bounds else []) == expected
+
+    bounds = execution_window_bounds(columns)
+    expected = infer_execution_window(events)
+    assert (events[bounds[0] : bounds[1]] if bounds else []) == expected
+
+
+def test_preview_builds_rows_for_the_limit_only():
+    words = random_words(random.Random(7), 1000)
+    events = compact_event_stream(infer_execution_window(FtEventColumns.decode(words).to_events()))
+    preview = preview_event_stream(words, limit=5, compact=True, window="execution")
+    annotated = annotate_event_stream(events[:5])
+
+    assert [row["index"] for row in preview] == [a.event.index for a in annotated]
+    assert [row["region"] for row in preview] == [a.region for a in annotated]
+    assert preview[0]["raw_hex"] == f"{events[0].raw_word:08X}"
+    assert preview_event_stream([], limit=5) == []
+
+
+def test_decoded_capture_serves_every_preview_from_one_decode():
+    words = random_words(random.Random(11), 2000)
+    capture = DecodedCapture(words)
+    requests = [
+        {"limit": 32},
+        {"limit": 64, "compact": True},
+        {"limit": 64, "compact": True, "window": "execution"},
+        {"limit": 64, "compact": True, "window": "measurement", "start_tag": 0x11, "stop_tag": 0x12},
+        {"limit": 64, "compact": True, "window": "measurement", "start_tag": 0x99, "stop_tag": 0x12},
+    ]
+    for request in requests:
+        assert capture.preview(**request) == preview_event_stream(words, **request)
+
+    events = FtEventColumns.decode(words).to_events()
+    bounds = capture.execution_bounds()
+    assert events[bounds[0] : bounds[1]] == infer_execution_window(events)
+    assert capture.measurement_bounds(start_tag=0x99, stop_tag=0x12) is None
+    # compacted windows and rows are cached, not recomputed
+    assert capture.events(compact=True, window="execution") is capture.events(compact=True, window="execution")
+    assert capture.preview(limit=4)[0] is capture.preview(limit=4, window="all")[0]
+    assert capture.events(window="execution", limit=3).index.tolist() == list(range(bounds[0], bounds[0] + 3))
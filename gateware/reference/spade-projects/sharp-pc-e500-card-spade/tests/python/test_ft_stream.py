@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from pce500_host.ft_stream import FtBroadcaster, FtSubscriber
+
+
+def chunk(start: int, count: int) -> bytes:
+    return np.arange(start, start + count, dtype="<u4").tobytes()
+
+
+def test_batches_stop_at_drop_gaps_and_count_drops():
+    subscriber = FtSubscriber(max_words=10)
+    for start in range(0, 20, 4):
+        subscriber.offer(start, chunk(start, 4))
+    # 20 words offered into a 10 word buffer: the three oldest chunks are gone
+    assert subscriber.stats()["dropped_words"] == 12
+    assert subscriber.dropped_chunks == 3
+
+    batch = subscriber.get(timeout=0)
+    assert batch.start_index == 12
+    assert batch.words.tolist() == list(range(12, 20))
+    assert (batch.dropped_words, batch.dropped_chunks) == (12, 3)
+    assert subscriber.get(timeout=0) is None
+
+    subscriber.offer(20, chunk(20, 4))
+    subscriber.offer(30, chunk(30, 2))
+    assert subscriber.get(timeout=0).words.tolist() == [20, 21, 22, 23]
+    assert subscriber.get(timeout=0).start_index == 30
+
+
+def test_max_words_splits_large_chunks():
+    subscriber = FtSubscriber(max_words=100)
+    subscriber.offer(0, chunk(0, 10))
+    subscriber.offer(10, chunk(10, 10))
+
+    batches = []
+    while (batch := subscriber.get(timeout=0, max_words=4)) is not None:
+        batches.append((batch.start_index, batch.words.tolist()))
+    assert batches[0] == (0, [0, 1, 2, 3])
+    assert [word for _, words in batches for word in words] == list(range(20))
+    assert all(start == words[0] for start, words in batches)
+    assert subscriber.stats()["delivered_words"] == 20
+
+
+def test_slow_subscriber_does_not_block_publisher():
+    broadcaster = FtBroadcaster()
+    slow = broadcaster.subscribe(max_words=16)
+    fast = broadcaster.subscribe(max_words=1 << 20)
+    received = []
+
+    def consume():
+        next_index = 0
+        while next_index < 4096:
+            batch = fast.get(timeout=2.0)
+            assert batch is not None and batch.start_index == next_index
+            received.extend(batch.words.tolist())
+            next_index += len(batch.words)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for start in range(0, 4096, 8):
+        broadcaster.publish(start, chunk(start, 8))
+    consumer.join(5.0)
+
+    assert received == list(range(4096))
+    assert fast.dropped_words == 0
+    assert slow.dropped_words == 4096 - 16
+    assert slow.get(timeout=0).words.tolist() == list(range(4080, 4096))
+
+    broadcaster.unsubscribe(slow)
+    broadcaster.unsubscribe(fast)
+    assert broadcaster.subscriber_count == 0
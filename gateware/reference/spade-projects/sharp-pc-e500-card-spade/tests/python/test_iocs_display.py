@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import importlib.util
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SCRIPT_PATH = PROJECT_ROOT / "experiments" / "iocs_sequence.py"
+
+
+def _load_module():
+    spec = importlib.util.spec_from_file_location("iocs_sequence", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec is not None
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def _controller(module, chips):
+    controller = object.__new__(module._TraceDisplayController)
+    controller.chips = chips
+    return controller
+
+
+def _source(chip, page: int, col: int):
+    return chip.vram[page][col], chip.vram_pc_source[page][col]
+
+
+def _expected_pixel(chips, row: int, col: int) -> tuple[int, int | None]:
+    left, right = chips
+    # right chip top, left chip top, left chip bottom mirrored, right chip bottom mirrored
+    if col < 64:
+        chip, page, src_col = right, row // 8, col
+    elif col < 120:
+        chip, page, src_col = left, row // 8, col - 64
+    elif col < 176:
+        chip, page, src_col = left, 4 + row // 8, 55 - (col - 120)
+    else:
+        chip, page, src_col = right, 4 + row // 8, 63 - (col - 176)
+    byte, source = _source(chip, page, src_col)
+    return (0 if (byte >> (row % 8)) & 1 else 1), source
+
+
+def test_display_buffers_match_chip_layout():
+    module = _load_module()
+    rng = random.Random(7)
+    chips = [
+        SimpleNamespace(
+            vram=[[rng.randrange(256) for _ in range(64)] for _ in range(8)],
+            vram_pc_source=[[rng.choice([None, rng.randrange(100)]) for _ in range(64)] for _ in range(8)],
+        )
+        for _ in range(2)
+    ]
+    controller = _controller(module, chips)
+
+    pixels = controller.get_display_buffer()
+    sources = controller.get_display_source_buffer()
+
+    assert pixels.shape == (32, 240)
+    assert sources.shape == (32, 240)
+    for row in range(32):
+        for col in range(240):
+            assert (pixels[row, col], sources[row, col]) == _expected_pixel(chips, row, col)
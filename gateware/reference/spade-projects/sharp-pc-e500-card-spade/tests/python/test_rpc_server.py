@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+from tempfile import gettempdir
+
+from pce500_host import supervisor_client
+from pce500_host.rpc_server import RpcServer
+
+
+class FakeDevice:
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.emit_results = []
+        self.completed = threading.Event()
+
+    def handle(self, request, emit):
+        action = request["action"]
+        if action == "status":
+            return {"status": "ok", "action": "status"}
+        if action == "run":
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            if emit is not None:
+                emit({"phase": "running"})
+            self.release.wait(5.0)
+            if emit is not None:
+                self.emit_results.append(emit({"phase": "end"}))
+            with self.lock:
+                self.active -= 1
+            self.completed.set()
+            return {"status": "ok", "action": "run", "name": request.get("name")}
+        if action == "shutdown":
+            return {"status": "ok", "shutdown": True}
+        raise RuntimeError(f"unknown action {action!r}")
+
+
+def start_server(device: FakeDevice, name: str) -> tuple[Path, threading.Thread]:
+    socket_path = Path(gettempdir()) / f"pce500_rpc_{name}.sock"
+    server = RpcServer(socket_path, device.handle, device_actions=("run", "shutdown"))
+    ready = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, args=(ready,), daemon=True)
+    thread.start()
+    assert ready.wait(2.0)
+    return socket_path, thread
+
+
+def read_messages(client: socket.socket, count: int) -> list[dict]:
+    buffer = b""
+    while buffer.count(b"\n") < count:
+        chunk = client.recv(4096)
+        assert chunk
+        buffer += chunk
+    return [json.loads(line) for line in buffer.splitlines()]
+
+
+def test_status_is_served_while_a_run_holds_the_device():
+    device = FakeDevice()
+    socket_path, thread = start_server(device, "concurrent")
+    results = []
+    runners = [
+        threading.Thread(target=lambda: results.append(supervisor_client.send_request(socket_path, {"action": "run"})))
+        for _ in range(2)
+    ]
+    for runner in runners:
+        runner.start()
+    time.sleep(0.05)
+
+    assert supervisor_client.send_request(socket_path, {"action": "status"}) == {"status": "ok", "action": "status"}
+    assert supervisor_client.send_request(socket_path, {"action": "bogus"})["status"] == "error"
+    device.release.set()
+    for runner in runners:
+        runner.join(2.0)
+    assert [result["action"] for result in results] == ["run", "run"]
+    assert device.max_active == 1
+
+    assert supervisor_client.send_request(socket_path, {"action": "shutdown"})["shutdown"] is True
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert not socket_path.exists()
+
+
+def test_pipelined_requests_are_matched_by_id():
+    device = FakeDevice()
+    socket_path, thread = start_server(device, "pipelined")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        requests = [
+            {"action": "run", "id": 1, "name": "slow", "stream": True},
+            {"action": "status", "id": 2},
+            "not json",
+        ]
+        client.sendall(b"".join((json.dumps(r) if isinstance(r, dict) else r).encode() + b"\n" for r in requests))
+        # the run is still waiting for the device, everything else is already answered
+        messages = read_messages(client, 3)
+        device.release.set()
+        messages += read_messages(client, 2)
+
+    assert {"id": 1, "phase": "running", "status": "progress"} in messages
+    assert {"id": 1, "phase": "end", "status": "progress"} in messages
+    assert {"id": 2, "action": "status", "status": "ok"} in messages
+    assert any(m["status"] == "error" and "id" not in m for m in messages)
+    assert messages[-1] == {"id": 1, "action": "run", "name": "slow", "status": "ok"}
+
+    progress = []
+    device.release.set()
+    response = supervisor_client.send_request(socket_path, {"action": "run"}, on_progress=progress.append)
+    assert progress == [{"phase": "running", "status": "progress"}, {"phase": "end", "status": "progress"}]
+    assert response["action"] == "run"
+
+    supervisor_client.send_request(socket_path, {"action": "shutdown"})
+    thread.join(2.0)
+
+
+def test_client_disconnect_does_not_abort_a_streamed_device_action():
+    device = FakeDevice()
+    socket_path, thread = start_server(device, "disconnect")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(b'{"action": "run", "stream": true}\n')
+        assert read_messages(client, 1) == [{"phase": "running", "status": "progress"}]
+    # give the server a moment to see the closed socket, then let the run finish
+    time.sleep(0.05)
+    device.release.set()
+    assert device.completed.wait(2.0)
+    assert supervisor_client.send_request(socket_path, {"action": "status"})["status"] == "ok"
+    # the progress message after the disconnect was dropped, not raised
+    assert device.emit_results in ([True], [False])
+
+    supervisor_client.send_request(socket_path, {"action": "shutdown"})
+    thread.join(2.0)
@@ -3,10 +3,13 @@ from __future__ import annotations
 import importlib.util
 import json
 import sys
+import tempfile
 import types
 import unittest
 from pathlib import Path
 
+import numpy as np
+
 from pce500_host.contract import SUPERVISOR_RPC_ACTIONS
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -85,5 +88,166 @@ class SupervisorRpcContractTest(unittest.TestCase):
                 self.assertEqual(response["status"], "ok")
 
 
+class FakeUart:
+    def set_timing(self, cycles: int):
+        pass
+
+    def set_control_timing(self, cycles: int):
+        pass
+
+    def clear_measurements(self):
+        pass
+
+    def write_rom_bytes(self, start_address: int, data: bytes, *, fast: bool = True):
+        pass
+
+    def synchronize_rx_boundary(self):
+        pass
+
+    def line_count(self):
+        return 0
+
+    def wait_for_line(self, predicate, timeout: float, start_index: int = 0):
+        for sequence in range(1, 16):
+            for text in (f"XR,BEGIN,{sequence:02X}", f"XR,END,{sequence:02X},00"):
+                if predicate(text):
+                    return types.SimpleNamespace(text=text)
+        raise TimeoutError("no matching line")
+
+    def dump_measurements(self):
+        return []
+
+    def lines_since(self, index: int):
+        return []
+
+
+class FakeFtCapture:
+    def __init__(self):
+        self.session_open = False
+
+    def set_max_retained_words(self, max_retained_words: int):
+        pass
+
+    def start(self):
+        if self.session_open:
+            raise RuntimeError("FT capture session already started")
+        self.session_open = True
+
+    def stop(self):
+        self.session_open = False
+        return None
+
+
+class RunExperimentCleanupTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_python_supervisor_module()
+
+    def make_daemon(self):
+        daemon = self.module.ExperimentDaemon.__new__(self.module.ExperimentDaemon)
+        daemon.status = "idle"
+        daemon.needs_reset = False
+        daemon.last_error = None
+        daemon.last_result = None
+        daemon._next_seq = 1
+        daemon.uart = FakeUart()
+        daemon.ft_capture = FakeFtCapture()
+        daemon._poll_unsolicited_lines = lambda: None
+        daemon._make_run_id = lambda: "run-0001"
+        daemon._load_plan = lambda script_path, script_args: {
+            "name": "example",
+            "asm_text": "RETF\n",
+            "fill_experiment_region": False,
+            "_script_path": str(script_path),
+            "_script_args": list(script_args),
+        }
+        daemon._assemble_image_from_text = lambda text: (0x10100, b"\x00")
+        daemon._compose_command_block = lambda plan, sequence: b""
+        daemon._commit_command_block = lambda block: None
+        daemon._parse_experiment_result = lambda script_path, script_args, result: None
+        daemon.capture_compression = "none"
+        return daemon
+
+    def test_progress_failure_mid_run_closes_the_ft_session(self):
+        daemon = self.make_daemon()
+
+        def progress(message):
+            if message["phase"] == "begin":
+                raise ConnectionError("client disconnected")
+
+        with self.assertRaises(ConnectionError):
+            daemon.run_experiment(Path("/tmp/example.py"), [], progress=progress)
+        self.assertFalse(daemon.ft_capture.session_open)
+        self.assertEqual(daemon.status, "needs_reset")
+        self.assertEqual(daemon.last_error, "client disconnected")
+
+    def test_host_failure_after_the_end_line_leaves_the_device_idle(self):
+        daemon = self.make_daemon()
+
+        def progress(message):
+            if message["phase"] == "end":
+                raise ConnectionError("client disconnected")
+
+        with self.assertRaises(ConnectionError):
+            daemon.run_experiment(Path("/tmp/example.py"), [], progress=progress)
+        self.assertFalse(daemon.ft_capture.session_open)
+        self.assertEqual(daemon.status, "idle")
+
+        result = daemon.run_experiment(Path("/tmp/example.py"), [])
+        self.assertEqual(result["status"], "ok")
+        self.assertIsNone(daemon.last_error)
+
+
+    def test_unknown_plan_compression_is_rejected_before_the_run(self):
+        daemon = self.make_daemon()
+        load_plan = daemon._load_plan
+        daemon._load_plan = lambda script_path, script_args: {
+            **load_plan(script_path, script_args),
+            "ft_capture_compression": "gzip",
+        }
+
+        with self.assertRaises(ValueError):
+            daemon.run_experiment(Path("/tmp/example.py"), [])
+        self.assertFalse(daemon.ft_capture.session_open)
+        self.assertEqual(daemon.status, "idle")
+
+    def test_ft_subscribe_rejects_empty_batches(self):
+        daemon = self.make_daemon()
+        for max_batch_words in (0, -1):
+            with self.assertRaises(RuntimeError):
+                daemon.subscribe_ft_capture(lambda message: True, max_batch_words=max_batch_words)
+
+    def test_artifact_write_failure_keeps_the_words_inline(self):
+        daemon = self.make_daemon()
+        with tempfile.TemporaryDirectory() as tmp:
+            # a file where the capture directory should be
+            daemon.capture_dir = Path(tmp) / "captures"
+            daemon.capture_dir.write_text("")
+            daemon.capture_keep = 10
+            ft_capture_result = types.SimpleNamespace(
+                words=np.array([0x00450100, 0x0489FFF0], dtype="<u4"),
+                raw_bytes=16,
+                chunk_count=1,
+                pending_bytes_hex="",
+                decode_swap_u16=False,
+                drain_idle_s=0.1,
+                drain_hard_s=1.0,
+                retained_words=2,
+                total_words_seen=2,
+                max_retained_words=16,
+                truncated_head=False,
+            )
+            payload = daemon._build_ft_capture_payload(
+                run_id="run-0001",
+                plan={"name": "example"},
+                ft_capture_result=ft_capture_result,
+                measurements=[],
+            )
+        self.assertIn("artifact_error", payload)
+        self.assertNotIn("artifact", payload)
+        self.assertEqual(payload["words"], [0x00450100, 0x0489FFF0])
+        self.assertEqual(len(payload["preview"]), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
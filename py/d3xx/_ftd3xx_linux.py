@@ -426,3 +426,66 @@ FT_ClearStreamPipe.argtypes = [FT_HANDLE, BOOLEAN, BOOLEAN, UCHAR]
 FT_ClearStreamPipe.__doc__ = \
     """FT_STATUS FT_ClearStreamPipe(FT_HANDLE ftHandle, BOOLEAN bAllWritePipes, BOOLEAN bAllReadPipes, UCHAR ucPipeID)"""
 
+
+
+class _OVERLAPPED(Structure):
+    pass
+
+
+# Only touched by the library (FT_InitializeOverlapped), the layout just has
+# to be at least as large as the native one.
+_OVERLAPPED._fields_ = [
+    ('Internal', c_size_t),
+    ('InternalHigh', c_size_t),
+    ('Offset', DWORD),
+    ('OffsetHigh', DWORD),
+    ('hEvent', HANDLE),
+]
+LPOVERLAPPED = POINTER(_OVERLAPPED)
+OVERLAPPED = _OVERLAPPED
+
+# Asynchronous transfers are missing from older libftd3xx builds.
+if hasattr(_libraries[_libname], 'FT_ReadPipeAsync'):
+    FT_ReadPipeAsync = _libraries[_libname].FT_ReadPipeAsync
+    FT_ReadPipeAsync.restype = FT_STATUS
+    # FT_ReadPipeAsync(ftHandle, ucFifoID, pucBuffer, ulBufferLength, pulBytesTransferred, pOverlapped)
+    FT_ReadPipeAsync.argtypes = [FT_HANDLE, UCHAR, LPVOID, ULONG, PULONG, LPOVERLAPPED]
+    FT_ReadPipeAsync.__doc__ = \
+        """FT_STATUS FT_ReadPipeAsync(FT_HANDLE ftHandle, UCHAR ucFifoID, LPVOID pucBuffer, ULONG ulBufferLength, PULONG pulBytesTransferred, LPOVERLAPPED pOverlapped)"""
+
+    FT_GetOverlappedResult = _libraries[_libname].FT_GetOverlappedResult
+    FT_GetOverlappedResult.restype = FT_STATUS
+    # FT_GetOverlappedResult(ftHandle, pOverlapped, pulBytesTransferred, bWait)
+    FT_GetOverlappedResult.argtypes = [FT_HANDLE, LPOVERLAPPED, PULONG, BOOL]
+    FT_GetOverlappedResult.__doc__ = \
+        """FT_STATUS FT_GetOverlappedResult(FT_HANDLE ftHandle, LPOVERLAPPED pOverlapped, PULONG pulBytesTransferred, BOOL bWait)"""
+
+    FT_InitializeOverlapped = _libraries[_libname].FT_InitializeOverlapped
+    FT_InitializeOverlapped.restype = FT_STATUS
+    # FT_InitializeOverlapped(ftHandle, pOverlapped)
+    FT_InitializeOverlapped.argtypes = [FT_HANDLE, LPOVERLAPPED]
+    FT_InitializeOverlapped.__doc__ = \
+        """FT_STATUS FT_InitializeOverlapped(FT_HANDLE ftHandle, LPOVERLAPPED pOverlapped)"""
+
+    FT_ReleaseOverlapped = _libraries[_libname].FT_ReleaseOverlapped
+    FT_ReleaseOverlapped.restype = FT_STATUS
+    # FT_ReleaseOverlapped(ftHandle, pOverlapped)
+    FT_ReleaseOverlapped.argtypes = [FT_HANDLE, LPOVERLAPPED]
+    FT_ReleaseOverlapped.__doc__ = \
+        """FT_STATUS FT_ReleaseOverlapped(FT_HANDLE ftHandle, LPOVERLAPPED pOverlapped)"""
+
+if hasattr(_libraries[_libname], 'FT_AbortPipe'):
+    FT_AbortPipe = _libraries[_libname].FT_AbortPipe
+    FT_AbortPipe.restype = FT_STATUS
+    # FT_AbortPipe(ftHandle, ucPipeID)
+    FT_AbortPipe.argtypes = [FT_HANDLE, UCHAR]
+    FT_AbortPipe.__doc__ = \
+        """FT_STATUS FT_AbortPipe(FT_HANDLE ftHandle, UCHAR ucPipeID)"""
+
+if hasattr(_libraries[_libname], 'FT_SetPipeTimeout'):
+    FT_SetPipeTimeout = _libraries[_libname].FT_SetPipeTimeout
+    FT_SetPipeTimeout.restype = FT_STATUS
+    # FT_SetPipeTimeout(ftHandle, ucPipeID, TimeoutInMs)
+    FT_SetPipeTimeout.argtypes = [FT_HANDLE, UCHAR, ULONG]
+    FT_SetPipeTimeout.__doc__ = \
+        """FT_STATUS FT_SetPipeTimeout(FT_HANDLE ftHandle, UCHAR ucPipeID, ULONG TimeoutInMs)"""
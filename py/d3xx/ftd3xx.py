@@ -308,6 +308,16 @@ class FTD3XX:
         """Clear stream pipe for continous transfer of fixed size"""
         self.status = call_ft(_ft.FT_ClearStreamPipe, self.handle, _ft.BOOLEAN(0), _ft.BOOLEAN(0), _ft.UCHAR(pipe))
 
+    def supportsAsync(self):
+        """True when overlapped reads and FT_AbortPipe are available"""
+        return hasattr(_ft, "FT_InitializeOverlapped") and hasattr(_ft, "FT_AbortPipe")
+
+    def createOverlapped(self):
+        """Allocate and initialize an OVERLAPPED for readPipeAsync"""
+        overlapped = _ft.OVERLAPPED()
+        self.initializeOverlapped(overlapped)
+        return overlapped
+
 
     # OS-dependent functions
     # If Windows
@@ -323,10 +333,10 @@ class FTD3XX:
             self.status = call_ft(_ft.FT_ReleaseOverlapped, self.handle, overlapped)
             return self.status
 
-        def getOverlappedResults(self, overlapped, bytesTransferred):
+        def getOverlappedResults(self, overlapped, bytesTransferred, wait=True):
             """ initialize overlapped """
             self.status = call_ft(_ft.FT_GetOverlappedResult, self.handle, overlapped, c.byref(bytesTransferred),
-                                  _ft.BOOL(1))
+                                  _ft.BOOL(wait))
             return self.status
 
         def writePipe(self, pipe, data, datalen):
@@ -358,6 +368,18 @@ class FTD3XX:
             return {"bytesTransferred": bytesTransferred.value,
                     "bytes": data.raw[:bytesTransferred.value] if raw is True else data.value[:bytesTransferred.value]}
 
+        def readPipeInto(self, pipe, buffer, timeout=None):
+            """Recv the data into a writable buffer (bytearray, memoryview, ...) without copying.
+
+            Returns the number of bytes transferred to the start of ``buffer``. On Windows
+            the timeout is set per pipe with setPipeTimeout, ``timeout`` is ignored."""
+            bytesTransferred = _ft.ULONG()
+            datalen = memoryview(buffer).nbytes
+            data = (c.c_char * datalen).from_buffer(buffer)
+            self.status = call_ft(_ft.FT_ReadPipeEx, self.handle, _ft.UCHAR(pipe), data, _ft.ULONG(datalen),
+                                  c.byref(bytesTransferred), None)
+            return bytesTransferred.value
+
         def readPipeAsync(self, pipe, data, datalen, transferred, overlapped):
             """Recv the data to the device."""
             self.status = call_ft(_ft.FT_ReadPipeEx, self.handle, _ft.UCHAR(pipe), data, _ft.ULONG(datalen),
@@ -420,6 +442,50 @@ class FTD3XX:
             return {"bytesTransferred": bytesTransferred.value,
                     "bytes": data.value[:bytesTransferred.value] if raw is False else data.raw[:bytesTransferred.value]}
 
+        def readPipeInto(self, channel, buffer, timeout=1000):
+            """Recv the data into a writable buffer (bytearray, memoryview, ...) without copying.
+
+            Returns the number of bytes transferred to the start of ``buffer``."""
+            bytesTransferred = _ft.ULONG()
+            datalen = memoryview(buffer).nbytes
+            data = (c.c_char * datalen).from_buffer(buffer)
+            self.status = call_ft(_ft.FT_ReadPipeEx, self.handle, _ft.UCHAR(channel), data, _ft.ULONG(datalen),
+                                  c.byref(bytesTransferred), timeout)
+            return bytesTransferred.value
+
+        def initializeOverlapped(self, overlapped):
+            """ initialize overlapped """
+            self.status = call_ft(_ft.FT_InitializeOverlapped, self.handle, overlapped)
+            return self.status
+
+        def releaseOverlapped(self, overlapped):
+            """ release overlapped """
+            self.status = call_ft(_ft.FT_ReleaseOverlapped, self.handle, overlapped)
+            return self.status
+
+        def getOverlappedResults(self, overlapped, bytesTransferred, wait=True):
+            """Get the result of an asynchronous transfer, FT_IO_INCOMPLETE while it is pending and not wait"""
+            self.status = call_ft(_ft.FT_GetOverlappedResult, self.handle, overlapped, c.byref(bytesTransferred),
+                                  _ft.BOOL(wait))
+            return self.status
+
+        def readPipeAsync(self, channel, data, datalen, transferred, overlapped):
+            """Queue a read, returns FT_IO_PENDING until getOverlappedResults reports it done"""
+            self.status = call_ft(_ft.FT_ReadPipeAsync, self.handle, _ft.UCHAR(channel), data, _ft.ULONG(datalen),
+                                  c.byref(transferred), overlapped)
+            return self.status
+
+        def abortPipe(self, channel):
+            """Abort ongoing transfers for the specifed pipe"""
+            self.status = call_ft(_ft.FT_AbortPipe, self.handle, _ft.UCHAR(channel))
+
+        # only in libftd3xx builds that export it, check with hasattr(device, "setPipeTimeout")
+        if hasattr(_ft, "FT_SetPipeTimeout"):
+
+            def setPipeTimeout(self, channel, timeoutMS):
+                """Set pipe timeout"""
+                self.status = call_ft(_ft.FT_SetPipeTimeout, self.handle, _ft.UCHAR(channel), _ft.ULONG(timeoutMS))
+
 
 __all__ = ["call_ft",
            "listDevices",
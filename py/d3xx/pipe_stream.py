@@ -0,0 +1,193 @@
+import ctypes as c
+import queue
+import threading
+import time
+
+from defines import FT_IO_INCOMPLETE, FT_IO_PENDING, FT_OK, FT_OPERATION_ABORTED, FT_TIMEOUT
+
+DEFAULT_TRANSFER_SIZE = 64 * 1024
+DEFAULT_NUM_TRANSFERS = 8
+DEFAULT_TIMEOUT_MS = 100
+POLL_INTERVAL_S = 0.0002
+
+
+class PipeStreamError(Exception):
+    def __init__(self, status):
+        super().__init__(f"FT600 transfer failed with status {status}")
+        self.status = status
+
+
+class PipeStreamReader:
+    """Continuous reader for an FT600 IN pipe.
+
+    With overlapped I/O (``device.supportsAsync()``) ``num_transfers`` reads
+    of ``transfer_size`` bytes are queued in the driver at all times; each
+    completed one is handed to the consumer and immediately resubmitted, so
+    the FIFO keeps draining while Python is busy. Without it a helper thread
+    loops on ``readPipeInto`` and hands buffers from a pool of the same size
+    to the consumer.
+
+    Completed transfers reach the consumer in order as memoryviews that are
+    only valid during the call. A consumer with a ``put`` method (a queue)
+    gets ``bytes`` copies instead.
+
+    In async mode the bytes of transfers still queued at stop are delivered
+    after the abort. Where the device has ``setPipeTimeout`` (Windows, and
+    Linux libftd3xx builds exporting ``FT_SetPipeTimeout``) the pipe timeout
+    is set to ``timeout_ms`` as well, so a partially filled transfer
+    completes (as FT_TIMEOUT) while the bus is quiet; otherwise it is only
+    delivered once filled or at stop.
+    """
+
+    def __init__(
+        self,
+        device,
+        pipe,
+        transfer_size=DEFAULT_TRANSFER_SIZE,
+        num_transfers=DEFAULT_NUM_TRANSFERS,
+        timeout_ms=DEFAULT_TIMEOUT_MS,
+        use_async=None,
+    ):
+        self.device = device
+        self.pipe = pipe
+        self.transfer_size = transfer_size
+        self.num_transfers = max(1, num_transfers)
+        self.timeout_ms = timeout_ms
+        if use_async is None:
+            use_async = hasattr(device, "supportsAsync") and device.supportsAsync()
+        self.use_async = use_async
+        self.transfers = 0
+        self.bytes = 0
+        self.empty_transfers = 0
+
+    def stats(self):
+        return {
+            "mode": "async" if self.use_async else "thread",
+            "num_transfers": self.num_transfers,
+            "transfer_size": self.transfer_size,
+            "transfers": self.transfers,
+            "bytes": self.bytes,
+            "empty_transfers": self.empty_transfers,
+        }
+
+    def run(self, consumer, stop_event):
+        """Deliver data to ``consumer`` until ``stop_event`` is set."""
+
+        if hasattr(consumer, "put"):
+            sink = consumer
+            consumer = lambda view: sink.put(bytes(view))  # noqa: E731
+        if self.use_async:
+            self._run_async(consumer, stop_event)
+        else:
+            self._run_threaded(consumer, stop_event)
+
+    def _deliver(self, consumer, view):
+        self.transfers += 1
+        if len(view) == 0:
+            self.empty_transfers += 1
+            return
+        self.bytes += len(view)
+        consumer(view)
+
+    def _run_async(self, consumer, stop_event):
+        device = self.device
+        if hasattr(device, "setPipeTimeout"):
+            device.setPipeTimeout(self.pipe, self.timeout_ms)
+        slots = []
+        pending = []
+        tail = []
+        i = 0
+        stopped = False
+        try:
+            for slot in range(self.num_transfers):
+                buffer = bytearray(self.transfer_size)
+                slots.append(
+                    (
+                        buffer,
+                        (c.c_char * len(buffer)).from_buffer(buffer),
+                        c.c_ulong(),
+                        device.createOverlapped(),
+                    )
+                )
+                pending.append(False)
+                self._submit(slots, pending, slot)
+
+            while not stop_event.is_set():
+                buffer, _data, transferred, overlapped = slots[i]
+                status = device.getOverlappedResults(overlapped, transferred, wait=False)
+                if status == FT_IO_INCOMPLETE:
+                    time.sleep(POLL_INTERVAL_S)
+                    continue
+                if status not in (FT_OK, FT_TIMEOUT):
+                    raise PipeStreamError(status)
+                pending[i] = False
+                # a timed out transfer still holds whatever arrived before the timeout
+                self._deliver(consumer, memoryview(buffer)[: transferred.value])
+                self._submit(slots, pending, i)
+                i = (i + 1) % len(slots)
+            stopped = True
+        finally:
+            # buffers must outlive the transfers the driver still holds
+            if any(pending):
+                device.abortPipe(self.pipe)
+            for k in range(len(slots)):
+                slot = (i + k) % len(slots)
+                buffer, _data, transferred, overlapped = slots[slot]
+                if pending[slot]:
+                    transferred.value = 0
+                    status = device.getOverlappedResults(overlapped, transferred, wait=True)
+                    pending[slot] = False
+                    if status in (FT_OK, FT_TIMEOUT, FT_OPERATION_ABORTED) and transferred.value:
+                        tail.append((buffer, transferred.value))
+            for _buffer, _data, _transferred, overlapped in slots:
+                device.releaseOverlapped(overlapped)
+        if stopped:
+            for buffer, n in tail:
+                self._deliver(consumer, memoryview(buffer)[:n])
+
+    def _submit(self, slots, pending, i):
+        buffer, data, transferred, overlapped = slots[i]
+        status = self.device.readPipeAsync(self.pipe, data, len(buffer), transferred, overlapped)
+        if status not in (FT_OK, FT_IO_PENDING):
+            raise PipeStreamError(status)
+        pending[i] = True
+
+    def _run_threaded(self, consumer, stop_event):
+        free = queue.Queue()
+        for _ in range(self.num_transfers):
+            free.put(bytearray(self.transfer_size))
+        filled = queue.Queue()
+        errors = []
+        stopping = threading.Event()
+
+        def read_loop():
+            try:
+                while not stop_event.is_set() and not stopping.is_set():
+                    try:
+                        buffer = free.get(timeout=self.timeout_ms / 1000)
+                    except queue.Empty:
+                        continue
+                    n = self.device.readPipeInto(self.pipe, buffer, timeout=self.timeout_ms)
+                    filled.put((buffer, n))
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+            finally:
+                filled.put(None)
+
+        thread = threading.Thread(target=read_loop, name="ft600-pipe-stream", daemon=True)
+        thread.start()
+        try:
+            while (item := filled.get()) is not None:
+                buffer, n = item
+                try:
+                    self._deliver(consumer, memoryview(buffer)[:n])
+                finally:
+                    free.put(buffer)
+        finally:
+            stopping.set()
+            thread.join()
+        if errors:
+            raise errors[0]
+
+
+__all__ = ["PipeStreamReader", "PipeStreamError"]
@@ -0,0 +1,180 @@
+import ctypes as c
+import queue
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# the d3xx modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from defines import FT_IO_INCOMPLETE, FT_IO_PENDING, FT_OK, FT_OPERATION_ABORTED, FT_TIMEOUT  # noqa: E402
+from pipe_stream import PipeStreamError, PipeStreamReader  # noqa: E402
+
+
+class FakeOverlapped:
+    def __init__(self):
+        self.request = None
+        self.released = False
+
+
+class FakeDevice:
+    """Serves ``chunks`` in order, one per completed transfer, then times out.
+
+    A chunk may be a ``(status, bytes)`` pair to complete with another status,
+    e.g. FT_TIMEOUT with a partial transfer. Transfers still queued at abort
+    return the ``aborted`` chunks in submission order.
+    """
+
+    def __init__(self, chunks, incomplete_polls=1, aborted=()):
+        self.chunks = list(chunks)
+        self.aborted_chunks = list(aborted)
+        self.incomplete_polls = incomplete_polls
+        self.pipe_timeout = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.aborted = False
+        self.overlapped = []
+        self.served = threading.Event()
+
+    def supportsAsync(self):
+        return True
+
+    def createOverlapped(self):
+        overlapped = FakeOverlapped()
+        self.overlapped.append(overlapped)
+        return overlapped
+
+    def releaseOverlapped(self, overlapped):
+        overlapped.released = True
+        return FT_OK
+
+    def readPipeAsync(self, pipe, data, datalen, transferred, overlapped):
+        assert overlapped.request is None
+        overlapped.request = [data, datalen, self.incomplete_polls]
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return FT_IO_PENDING
+
+    def getOverlappedResults(self, overlapped, transferred, wait=True):
+        data, datalen, polls = overlapped.request
+        if self.aborted:
+            overlapped.request = None
+            self.in_flight -= 1
+            chunk = self.aborted_chunks.pop(0) if self.aborted_chunks else b""
+            c.memmove(data, chunk, len(chunk))
+            transferred.value = len(chunk)
+            return FT_OPERATION_ABORTED
+        if polls > 0 and not wait:
+            overlapped.request[2] -= 1
+            return FT_IO_INCOMPLETE
+        overlapped.request = None
+        self.in_flight -= 1
+        if not self.chunks:
+            self.served.set()
+            transferred.value = 0
+            return FT_TIMEOUT
+        status, chunk = self._next_chunk()
+        c.memmove(data, chunk, len(chunk))
+        transferred.value = len(chunk)
+        return status
+
+    def _next_chunk(self):
+        chunk = self.chunks.pop(0)
+        return chunk if isinstance(chunk, tuple) else (FT_OK, chunk)
+
+    def setPipeTimeout(self, pipe, timeout_ms):
+        self.pipe_timeout = (pipe, timeout_ms)
+
+    def abortPipe(self, pipe):
+        self.aborted = True
+
+    def readPipeInto(self, pipe, buffer, timeout=1000):
+        if not self.chunks:
+            self.served.set()
+            return 0
+        _status, chunk = self._next_chunk()
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+def run_until_served(reader, device, consumer):
+    stop = threading.Event()
+    thread = threading.Thread(target=reader.run, args=(consumer, stop))
+    thread.start()
+    assert device.served.wait(5)
+    stop.set()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+@pytest.mark.parametrize("use_async", [True, False])
+def test_delivers_chunks_in_order(use_async):
+    chunks = [bytes([i]) * (i % 7 + 1) for i in range(50)]
+    device = FakeDevice(chunks)
+    reader = PipeStreamReader(device, 0x82, transfer_size=16, num_transfers=4, use_async=use_async)
+
+    received = []
+    run_until_served(reader, device, lambda view: received.append(bytes(view)))
+
+    assert received == chunks
+    stats = reader.stats()
+    assert stats["mode"] == ("async" if use_async else "thread")
+    assert stats["bytes"] == sum(len(chunk) for chunk in chunks)
+
+
+def test_async_keeps_transfers_queued():
+    device = FakeDevice([b"x" * 8] * 20, incomplete_polls=3)
+    reader = PipeStreamReader(device, 0x82, transfer_size=8, num_transfers=4)
+    assert reader.use_async
+
+    run_until_served(reader, device, lambda view: None)
+
+    assert device.max_in_flight == 4
+    assert device.submitted >= 20 + 4
+    assert device.aborted
+    assert device.in_flight == 0
+    assert all(overlapped.released for overlapped in device.overlapped)
+
+
+def test_queue_consumer_gets_copies():
+    device = FakeDevice([b"ab", b"cd"])
+    reader = PipeStreamReader(device, 0x82, transfer_size=4, num_transfers=2)
+
+    out = queue.Queue()
+    run_until_served(reader, device, out)
+
+    assert [out.get_nowait(), out.get_nowait()] == [b"ab", b"cd"]
+
+
+def test_async_error_releases_transfers():
+    device = FakeDevice([b"ab"])
+
+    def fail(overlapped, transferred, wait=True):
+        if not wait:
+            return 4  # FT_IO_ERROR
+        return FakeDevice.getOverlappedResults(device, overlapped, transferred, wait)
+
+    device.getOverlappedResults = fail
+    reader = PipeStreamReader(device, 0x82, transfer_size=4, num_transfers=2)
+    with pytest.raises(PipeStreamError):
+        reader.run(lambda view: None, threading.Event())
+    assert device.in_flight == 0
+    assert all(overlapped.released for overlapped in device.overlapped)
+
+
+def test_async_delivers_partial_and_aborted_transfers():
+    device = FakeDevice([b"ab", (FT_TIMEOUT, b"c"), (FT_TIMEOUT, b"")], aborted=[b"de", b"f"])
+    reader = PipeStreamReader(device, 0x82, transfer_size=4, num_transfers=3, timeout_ms=50)
+
+    received = []
+    run_until_served(reader, device, lambda view: received.append(bytes(view)))
+
+    assert device.pipe_timeout == (0x82, 50)
+    # the quiet-bus partial transfer and the tail held by the aborted transfers
+    assert received == [b"ab", b"c", b"de", b"f"]
+    assert reader.stats()["bytes"] == 6
+    assert all(overlapped.released for overlapped in device.overlapped)
@@ -0,0 +1,282 @@
+from google.protobuf.internal import containers as _containers
+from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
+from google.protobuf.internal import python_message as _python_message
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Mapping as _Mapping, Optional as _Optional, Union as _Union
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class DebugAnnotation(_message.Message):
+    __slots__ = ["array_values", "bool_value", "dict_entries", "double_value", "int_value", "legacy_json_value", "name", "name_iid", "nested_value", "pointer_value", "proto_type_name", "proto_type_name_iid", "proto_value", "string_value", "string_value_iid", "uint_value"]
+    class NestedValue(_message.Message):
+        __slots__ = ["array_values", "bool_value", "dict_keys", "dict_values", "double_value", "int_value", "nested_type", "string_value"]
+        class NestedType(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+            __slots__ = []
+        ARRAY: DebugAnnotation.NestedValue.NestedType
+        ARRAY_VALUES_FIELD_NUMBER: _ClassVar[int]
+        BOOL_VALUE_FIELD_NUMBER: _ClassVar[int]
+        DICT: DebugAnnotation.NestedValue.NestedType
+        DICT_KEYS_FIELD_NUMBER: _ClassVar[int]
+        DICT_VALUES_FIELD_NUMBER: _ClassVar[int]
+        DOUBLE_VALUE_FIELD_NUMBER: _ClassVar[int]
+        INT_VALUE_FIELD_NUMBER: _ClassVar[int]
+        NESTED_TYPE_FIELD_NUMBER: _ClassVar[int]
+        STRING_VALUE_FIELD_NUMBER: _ClassVar[int]
+        UNSPECIFIED: DebugAnnotation.NestedValue.NestedType
+        array_values: _containers.RepeatedCompositeFieldContainer[DebugAnnotation.NestedValue]
+        bool_value: bool
+        dict_keys: _containers.RepeatedScalarFieldContainer[str]
+        dict_values: _containers.RepeatedCompositeFieldContainer[DebugAnnotation.NestedValue]
+        double_value: float
+        int_value: int
+        nested_type: DebugAnnotation.NestedValue.NestedType
+        string_value: str
+        def __init__(self, nested_type: _Optional[_Union[DebugAnnotation.NestedValue.NestedType, str]] = ..., dict_keys: _Optional[_Iterable[str]] = ..., dict_values: _Optional[_Iterable[_Union[DebugAnnotation.NestedValue, _Mapping]]] = ..., array_values: _Optional[_Iterable[_Union[DebugAnnotation.NestedValue, _Mapping]]] = ..., int_value: _Optional[int] = ..., double_value: _Optional[float] = ..., bool_value: bool = ..., string_value: _Optional[str] = ...) -> None: ...
+    ARRAY_VALUES_FIELD_NUMBER: _ClassVar[int]
+    BOOL_VALUE_FIELD_NUMBER: _ClassVar[int]
+    DICT_ENTRIES_FIELD_NUMBER: _ClassVar[int]
+    DOUBLE_VALUE_FIELD_NUMBER: _ClassVar[int]
+    INT_VALUE_FIELD_NUMBER: _ClassVar[int]
+    LEGACY_JSON_VALUE_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    NAME_IID_FIELD_NUMBER: _ClassVar[int]
+    NESTED_VALUE_FIELD_NUMBER: _ClassVar[int]
+    POINTER_VALUE_FIELD_NUMBER: _ClassVar[int]
+    PROTO_TYPE_NAME_FIELD_NUMBER: _ClassVar[int]
+    PROTO_TYPE_NAME_IID_FIELD_NUMBER: _ClassVar[int]
+    PROTO_VALUE_FIELD_NUMBER: _ClassVar[int]
+    STRING_VALUE_FIELD_NUMBER: _ClassVar[int]
+    STRING_VALUE_IID_FIELD_NUMBER: _ClassVar[int]
+    UINT_VALUE_FIELD_NUMBER: _ClassVar[int]
+    array_values: _containers.RepeatedCompositeFieldContainer[DebugAnnotation]
+    bool_value: bool
+    dict_entries: _containers.RepeatedCompositeFieldContainer[DebugAnnotation]
+    double_value: float
+    int_value: int
+    legacy_json_value: str
+    name: str
+    name_iid: int
+    nested_value: DebugAnnotation.NestedValue
+    pointer_value: int
+    proto_type_name: str
+    proto_type_name_iid: int
+    proto_value: bytes
+    string_value: str
+    string_value_iid: int
+    uint_value: int
+    def __init__(self, name_iid: _Optional[int] = ..., name: _Optional[str] = ..., bool_value: bool = ..., uint_value: _Optional[int] = ..., int_value: _Optional[int] = ..., double_value: _Optional[float] = ..., pointer_value: _Optional[int] = ..., nested_value: _Optional[_Union[DebugAnnotation.NestedValue, _Mapping]] = ..., legacy_json_value: _Optional[str] = ..., string_value: _Optional[str] = ..., string_value_iid: _Optional[int] = ..., proto_type_name: _Optional[str] = ..., proto_type_name_iid: _Optional[int] = ..., proto_value: _Optional[bytes] = ..., dict_entries: _Optional[_Iterable[_Union[DebugAnnotation, _Mapping]]] = ..., array_values: _Optional[_Iterable[_Union[DebugAnnotation, _Mapping]]] = ...) -> None: ...
+
+class DebugAnnotationName(_message.Message):
+    __slots__ = ["iid", "name"]
+    IID_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    iid: int
+    name: str
+    def __init__(self, iid: _Optional[int] = ..., name: _Optional[str] = ...) -> None: ...
+
+class EventName(_message.Message):
+    __slots__ = ["iid", "name"]
+    IID_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    iid: int
+    name: str
+    def __init__(self, iid: _Optional[int] = ..., name: _Optional[str] = ...) -> None: ...
+
+class InternedData(_message.Message):
+    __slots__ = ["debug_annotation_names", "event_names"]
+    DEBUG_ANNOTATION_NAMES_FIELD_NUMBER: _ClassVar[int]
+    EVENT_NAMES_FIELD_NUMBER: _ClassVar[int]
+    debug_annotation_names: _containers.RepeatedCompositeFieldContainer[DebugAnnotationName]
+    event_names: _containers.RepeatedCompositeFieldContainer[EventName]
+    def __init__(self, event_names: _Optional[_Iterable[_Union[EventName, _Mapping]]] = ..., debug_annotation_names: _Optional[_Iterable[_Union[DebugAnnotationName, _Mapping]]] = ...) -> None: ...
+
+class ProcessDescriptor(_message.Message):
+    __slots__ = ["chrome_process_type", "cmdline", "legacy_sort_index", "pid", "process_labels", "process_name", "process_priority", "start_timestamp_ns"]
+    class ChromeProcessType(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = []
+    CHROME_PROCESS_TYPE_FIELD_NUMBER: _ClassVar[int]
+    CMDLINE_FIELD_NUMBER: _ClassVar[int]
+    LEGACY_SORT_INDEX_FIELD_NUMBER: _ClassVar[int]
+    PID_FIELD_NUMBER: _ClassVar[int]
+    PROCESS_BROWSER: ProcessDescriptor.ChromeProcessType
+    PROCESS_GPU: ProcessDescriptor.ChromeProcessType
+    PROCESS_LABELS_FIELD_NUMBER: _ClassVar[int]
+    PROCESS_NAME_FIELD_NUMBER: _ClassVar[int]
+    PROCESS_PPAPI_BROKER: ProcessDescriptor.ChromeProcessType
+    PROCESS_PPAPI_PLUGIN: ProcessDescriptor.ChromeProcessType
+    PROCESS_PRIORITY_FIELD_NUMBER: _ClassVar[int]
+    PROCESS_RENDERER: ProcessDescriptor.ChromeProcessType
+    PROCESS_SANDBOX_HELPER: ProcessDescriptor.ChromeProcessType
+    PROCESS_UNSPECIFIED: ProcessDescriptor.ChromeProcessType
+    PROCESS_UTILITY: ProcessDescriptor.ChromeProcessType
+    PROCESS_ZYGOTE: ProcessDescriptor.ChromeProcessType
+    START_TIMESTAMP_NS_FIELD_NUMBER: _ClassVar[int]
+    chrome_process_type: ProcessDescriptor.ChromeProcessType
+    cmdline: _containers.RepeatedScalarFieldContainer[str]
+    legacy_sort_index: int
+    pid: int
+    process_labels: _containers.RepeatedScalarFieldContainer[str]
+    process_name: str
+    process_priority: int
+    start_timestamp_ns: int
+    def __init__(self, pid: _Optional[int] = ..., cmdline: _Optional[_Iterable[str]] = ..., process_name: _Optional[str] = ..., process_priority: _Optional[int] = ..., start_timestamp_ns: _Optional[int] = ..., chrome_process_type: _Optional[_Union[ProcessDescriptor.ChromeProcessType, str]] = ..., legacy_sort_index: _Optional[int] = ..., process_labels: _Optional[_Iterable[str]] = ...) -> None: ...
+
+class SourceLocation(_message.Message):
+    __slots__ = ["file_name", "function_name", "iid", "line_number"]
+    FILE_NAME_FIELD_NUMBER: _ClassVar[int]
+    FUNCTION_NAME_FIELD_NUMBER: _ClassVar[int]
+    IID_FIELD_NUMBER: _ClassVar[int]
+    LINE_NUMBER_FIELD_NUMBER: _ClassVar[int]
+    file_name: str
+    function_name: str
+    iid: int
+    line_number: int
+    def __init__(self, iid: _Optional[int] = ..., file_name: _Optional[str] = ..., function_name: _Optional[str] = ..., line_number: _Optional[int] = ...) -> None: ...
+
+class ThreadDescriptor(_message.Message):
+    __slots__ = ["chrome_thread_type", "legacy_sort_index", "pid", "reference_thread_instruction_count", "reference_thread_time_us", "reference_timestamp_us", "thread_name", "tid"]
+    class ChromeThreadType(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = []
+    CHROME_THREAD_COMPOSITOR: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_COMPOSITOR_WORKER: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_IO: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_MAIN: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_MEMORY_INFRA: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_POOL_BG_BLOCKING: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_POOL_BG_WORKER: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_POOL_FB_BLOCKING: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_POOL_FG_WORKER: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_POOL_SERVICE: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_SAMPLING_PROFILER: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_SERVICE_WORKER: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_TYPE_FIELD_NUMBER: _ClassVar[int]
+    CHROME_THREAD_UNSPECIFIED: ThreadDescriptor.ChromeThreadType
+    CHROME_THREAD_VIZ_COMPOSITOR: ThreadDescriptor.ChromeThreadType
+    LEGACY_SORT_INDEX_FIELD_NUMBER: _ClassVar[int]
+    PID_FIELD_NUMBER: _ClassVar[int]
+    REFERENCE_THREAD_INSTRUCTION_COUNT_FIELD_NUMBER: _ClassVar[int]
+    REFERENCE_THREAD_TIME_US_FIELD_NUMBER: _ClassVar[int]
+    REFERENCE_TIMESTAMP_US_FIELD_NUMBER: _ClassVar[int]
+    THREAD_NAME_FIELD_NUMBER: _ClassVar[int]
+    TID_FIELD_NUMBER: _ClassVar[int]
+    chrome_thread_type: ThreadDescriptor.ChromeThreadType
+    legacy_sort_index: int
+    pid: int
+    reference_thread_instruction_count: int
+    reference_thread_time_us: int
+    reference_timestamp_us: int
+    thread_name: str
+    tid: int
+    def __init__(self, pid: _Optional[int] = ..., tid: _Optional[int] = ..., thread_name: _Optional[str] = ..., chrome_thread_type: _Optional[_Union[ThreadDescriptor.ChromeThreadType, str]] = ..., reference_timestamp_us: _Optional[int] = ..., reference_thread_time_us: _Optional[int] = ..., reference_thread_instruction_count: _Optional[int] = ..., legacy_sort_index: _Optional[int] = ...) -> None: ...
+
+class Trace(_message.Message):
+    __slots__ = ["packet"]
+    PACKET_FIELD_NUMBER: _ClassVar[int]
+    packet: _containers.RepeatedCompositeFieldContainer[TracePacket]
+    def __init__(self, packet: _Optional[_Iterable[_Union[TracePacket, _Mapping]]] = ...) -> None: ...
+
+class TracePacket(_message.Message):
+    __slots__ = ["first_packet_on_sequence", "interned_data", "previous_packet_dropped", "sequence_flags", "timestamp", "timestamp_clock_id", "track_descriptor", "track_event", "trusted_packet_sequence_id", "trusted_pid", "trusted_uid"]
+    class SequenceFlags(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = []
+    FIRST_PACKET_ON_SEQUENCE_FIELD_NUMBER: _ClassVar[int]
+    INTERNED_DATA_FIELD_NUMBER: _ClassVar[int]
+    PREVIOUS_PACKET_DROPPED_FIELD_NUMBER: _ClassVar[int]
+    SEQUENCE_FLAGS_FIELD_NUMBER: _ClassVar[int]
+    SEQ_INCREMENTAL_STATE_CLEARED: TracePacket.SequenceFlags
+    SEQ_NEEDS_INCREMENTAL_STATE: TracePacket.SequenceFlags
+    SEQ_UNSPECIFIED: TracePacket.SequenceFlags
+    TIMESTAMP_CLOCK_ID_FIELD_NUMBER: _ClassVar[int]
+    TIMESTAMP_FIELD_NUMBER: _ClassVar[int]
+    TRACK_DESCRIPTOR_FIELD_NUMBER: _ClassVar[int]
+    TRACK_EVENT_FIELD_NUMBER: _ClassVar[int]
+    TRUSTED_PACKET_SEQUENCE_ID_FIELD_NUMBER: _ClassVar[int]
+    TRUSTED_PID_FIELD_NUMBER: _ClassVar[int]
+    TRUSTED_UID_FIELD_NUMBER: _ClassVar[int]
+    first_packet_on_sequence: bool
+    interned_data: InternedData
+    previous_packet_dropped: bool
+    sequence_flags: int
+    timestamp: int
+    timestamp_clock_id: int
+    track_descriptor: TrackDescriptor
+    track_event: TrackEvent
+    trusted_packet_sequence_id: int
+    trusted_pid: int
+    trusted_uid: int
+    def __init__(self, timestamp: _Optional[int] = ..., timestamp_clock_id: _Optional[int] = ..., track_event: _Optional[_Union[TrackEvent, _Mapping]] = ..., track_descriptor: _Optional[_Union[TrackDescriptor, _Mapping]] = ..., trusted_uid: _Optional[int] = ..., trusted_packet_sequence_id: _Optional[int] = ..., trusted_pid: _Optional[int] = ..., interned_data: _Optional[_Union[InternedData, _Mapping]] = ..., sequence_flags: _Optional[int] = ..., previous_packet_dropped: bool = ..., first_packet_on_sequence: bool = ...) -> None: ...
+
+class TrackDescriptor(_message.Message):
+    __slots__ = ["name", "parent_uuid", "process", "thread", "uuid"]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    PARENT_UUID_FIELD_NUMBER: _ClassVar[int]
+    PROCESS_FIELD_NUMBER: _ClassVar[int]
+    THREAD_FIELD_NUMBER: _ClassVar[int]
+    UUID_FIELD_NUMBER: _ClassVar[int]
+    name: str
+    parent_uuid: int
+    process: ProcessDescriptor
+    thread: ThreadDescriptor
+    uuid: int
+    def __init__(self, uuid: _Optional[int] = ..., parent_uuid: _Optional[int] = ..., name: _Optional[str] = ..., process: _Optional[_Union[ProcessDescriptor, _Mapping]] = ..., thread: _Optional[_Union[ThreadDescriptor, _Mapping]] = ...) -> None: ...
+
+class TrackEvent(_message.Message):
+    __slots__ = ["categories", "category_iids", "counter_value", "debug_annotations", "double_counter_value", "extra_counter_track_uuids", "extra_counter_values", "extra_double_counter_track_uuids", "extra_double_counter_values", "flow_ids", "flow_ids_old", "name", "name_iid", "source_location", "source_location_iid", "terminating_flow_ids", "terminating_flow_ids_old", "track_uuid", "type"]
+    class Type(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = []
+    CATEGORIES_FIELD_NUMBER: _ClassVar[int]
+    CATEGORY_IIDS_FIELD_NUMBER: _ClassVar[int]
+    COUNTER_VALUE_FIELD_NUMBER: _ClassVar[int]
+    DEBUG_ANNOTATIONS_FIELD_NUMBER: _ClassVar[int]
+    DOUBLE_COUNTER_VALUE_FIELD_NUMBER: _ClassVar[int]
+    EXTRA_COUNTER_TRACK_UUIDS_FIELD_NUMBER: _ClassVar[int]
+    EXTRA_COUNTER_VALUES_FIELD_NUMBER: _ClassVar[int]
+    EXTRA_DOUBLE_COUNTER_TRACK_UUIDS_FIELD_NUMBER: _ClassVar[int]
+    EXTRA_DOUBLE_COUNTER_VALUES_FIELD_NUMBER: _ClassVar[int]
+    Extensions: _python_message._ExtensionDict
+    FLOW_IDS_FIELD_NUMBER: _ClassVar[int]
+    FLOW_IDS_OLD_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    NAME_IID_FIELD_NUMBER: _ClassVar[int]
+    SOURCE_LOCATION_FIELD_NUMBER: _ClassVar[int]
+    SOURCE_LOCATION_IID_FIELD_NUMBER: _ClassVar[int]
+    TERMINATING_FLOW_IDS_FIELD_NUMBER: _ClassVar[int]
+    TERMINATING_FLOW_IDS_OLD_FIELD_NUMBER: _ClassVar[int]
+    TRACK_UUID_FIELD_NUMBER: _ClassVar[int]
+    TYPE_COUNTER: TrackEvent.Type
+    TYPE_FIELD_NUMBER: _ClassVar[int]
+    TYPE_INSTANT: TrackEvent.Type
+    TYPE_SLICE_BEGIN: TrackEvent.Type
+    TYPE_SLICE_END: TrackEvent.Type
+    TYPE_UNSPECIFIED: TrackEvent.Type
+    categories: _containers.RepeatedScalarFieldContainer[str]
+    category_iids: _containers.RepeatedScalarFieldContainer[int]
+    counter_value: int
+    debug_annotations: _containers.RepeatedCompositeFieldContainer[DebugAnnotation]
+    double_counter_value: float
+    extra_counter_track_uuids: _containers.RepeatedScalarFieldContainer[int]
+    extra_counter_values: _containers.RepeatedScalarFieldContainer[int]
+    extra_double_counter_track_uuids: _containers.RepeatedScalarFieldContainer[int]
+    extra_double_counter_values: _containers.RepeatedScalarFieldContainer[float]
+    flow_ids: _containers.RepeatedScalarFieldContainer[int]
+    flow_ids_old: _containers.RepeatedScalarFieldContainer[int]
+    name: str
+    name_iid: int
+    source_location: SourceLocation
+    source_location_iid: int
+    terminating_flow_ids: _containers.RepeatedScalarFieldContainer[int]
+    terminating_flow_ids_old: _containers.RepeatedScalarFieldContainer[int]
+    track_uuid: int
+    type: TrackEvent.Type
+    def __init__(self, category_iids: _Optional[_Iterable[int]] = ..., categories: _Optional[_Iterable[str]] = ..., name_iid: _Optional[int] = ..., name: _Optional[str] = ..., type: _Optional[_Union[TrackEvent.Type, str]] = ..., track_uuid: _Optional[int] = ..., counter_value: _Optional[int] = ..., double_counter_value: _Optional[float] = ..., extra_counter_track_uuids: _Optional[_Iterable[int]] = ..., extra_counter_values: _Optional[_Iterable[int]] = ..., extra_double_counter_track_uuids: _Optional[_Iterable[int]] = ..., extra_double_counter_values: _Optional[_Iterable[float]] = ..., flow_ids_old: _Optional[_Iterable[int]] = ..., flow_ids: _Optional[_Iterable[int]] = ..., terminating_flow_ids_old: _Optional[_Iterable[int]] = ..., terminating_flow_ids: _Optional[_Iterable[int]] = ..., debug_annotations: _Optional[_Iterable[_Union[DebugAnnotation, _Mapping]]] = ..., source_location: _Optional[_Union[SourceLocation, _Mapping]] = ..., source_location_iid: _Optional[int] = ...) -> None: ...
+
+class UnsymbolizedSourceLocation(_message.Message):
+    __slots__ = ["iid", "mapping_id", "rel_pc"]
+    IID_FIELD_NUMBER: _ClassVar[int]
+    MAPPING_ID_FIELD_NUMBER: _ClassVar[int]
+    REL_PC_FIELD_NUMBER: _ClassVar[int]
+    iid: int
+    mapping_id: int
+    rel_pc: int
+    def __init__(self, iid: _Optional[int] = ..., mapping_id: _Optional[int] = ..., rel_pc: _Optional[int] = ...) -> None: ...
@@ -0,0 +1,96 @@
+"""Page/column display RAM shared by the LCD controller models.
+
+The SED1560 (PC-G850) and the HD61202 (PC-E500) both organize VRAM as pages
+of 8 pixel lines: one byte per column and page, bit 0 is the top line.
+``PageVRAM`` keeps that layout in a ``(pages, columns)`` uint8 array and the
+helpers turn it into ``(lines, columns)`` bitmaps and lay bitmaps out on a
+screen with a few array operations.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+PAGE_HEIGHT = 8
+
+_BITS = np.arange(PAGE_HEIGHT, dtype=np.uint8)
+
+
+def unpack_pages(pages) -> np.ndarray:
+    """``(pages, columns)`` VRAM bytes to a ``(pages * 8, columns)`` 0/1 bitmap."""
+
+    pages = np.asarray(pages, dtype=np.uint8)
+    return ((pages[:, None, :] >> _BITS[None, :, None]) & 1).reshape(-1, pages.shape[1])
+
+
+def expand_pages(values) -> np.ndarray:
+    """Repeat per page/column values (of any dtype) for each of the 8 lines of the page."""
+
+    return np.repeat(np.asarray(values), PAGE_HEIGHT, axis=0)
+
+
+def copy_region(dest: np.ndarray, src: np.ndarray, row: int, col: int, *, mirror: bool = False) -> None:
+    """Copy ``src`` into ``dest`` with its top left corner at ``(row, col)``, columns reversed if ``mirror``."""
+
+    height, width = src.shape
+    dest[row : row + height, col : col + width] = src[:, ::-1] if mirror else src
+
+
+class PageVRAM:
+    """VRAM of ``pages`` x ``columns`` bytes.
+
+    Indexing by page returns a writable row, so controller code can keep
+    using ``vram[page][col] = value``.
+    """
+
+    def __init__(self, pages: int, columns: int):
+        self.data = np.zeros((pages, columns), dtype=np.uint8)
+
+    @classmethod
+    def from_rows(cls, rows) -> PageVRAM:
+        """Wrap a copy of nested per-page lists (or any 2D array-like)."""
+
+        data = np.array(rows, dtype=np.uint8)
+        vram = cls(*data.shape)
+        vram.data = data
+        return vram
+
+    @property
+    def pages(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def columns(self) -> int:
+        return self.data.shape[1]
+
+    def __len__(self) -> int:
+        return self.pages
+
+    def __getitem__(self, page):
+        return self.data[page]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    def __eq__(self, other) -> bool:
+        return np.array_equal(self.data, np.asarray(other))
+
+    def write(self, page: int, col: int, value: int) -> bool:
+        """Store ``value``, returns whether the byte changed."""
+
+        row = self.data[page]
+        if row[col] == value:
+            return False
+        row[col] = value
+        return True
+
+    def to_bitmap(self, pages: slice = slice(None), columns: slice = slice(None)) -> np.ndarray:
+        """0/1 bitmap of the selected pages and columns."""
+
+        return unpack_pages(self.data[pages, columns])
+
+    def tolist(self) -> list[list[int]]:
+        return self.data.tolist()
@@ -1,6 +1,10 @@
 #include <pybind11/functional.h>
 #include <pybind11/pybind11.h>
 
+#include <cstring>
+#include <stdexcept>
+#include <string>
+
 #include "z80.hpp"
 
 namespace py = pybind11;
@@ -98,6 +102,49 @@ class PyZ80 {
 
   PyRegister reg() const { return PyRegister(z80.reg); }
 
+  // Snapshot and restore all registers, used to skip memoized instructions
+  py::bytes state() const {
+    return py::bytes(reinterpret_cast<const char*>(&z80.reg), sizeof(z80.reg));
+  }
+  void set_state(const py::bytes& state) { z80.reg = from_bytes(state); }
+
+  static Z80::Register from_bytes(const py::bytes& state) {
+    std::string s = state;
+    if (s.size() != sizeof(Z80::Register)) {
+      throw std::invalid_argument("state size mismatch");
+    }
+    Z80::Register r;
+    std::memcpy(&r, s.data(), sizeof(r));
+    return r;
+  }
+  static py::bytes to_bytes(const Z80::Register& r) {
+    return py::bytes(reinterpret_cast<const char*>(&r), sizeof(r));
+  }
+
+  // state() with R, WZ and the clock counter cleared: these don't change what
+  // an instruction reads and writes, so they are left out of memo keys
+  static py::bytes memo_key(const py::bytes& state) {
+    Z80::Register r = from_bytes(state);
+    r.R &= 0x80;
+    r.WZ = 0;
+    r.consumeClockCounter = 0;
+    return to_bytes(r);
+  }
+
+  // `after` with R and the clock counter advanced from `state` by as much as
+  // they advanced from `before` to `after`, i.e. by the memoized
+  // instruction's M1 cycles and clocks
+  static py::bytes replay(const py::bytes& state, const py::bytes& before,
+                          const py::bytes& after) {
+    Z80::Register s = from_bytes(state);
+    Z80::Register b = from_bytes(before);
+    Z80::Register a = from_bytes(after);
+    a.R = (a.R & 0x80) | ((s.R + a.R - b.R) & 0x7F);
+    a.consumeClockCounter =
+        s.consumeClockCounter + a.consumeClockCounter - b.consumeClockCounter;
+    return to_bytes(a);
+  }
+
   unsigned short PC() const { return z80.reg.PC; }
   void setPC(unsigned short value) { z80.reg.PC = value; }
 };
@@ -145,6 +192,12 @@ PYBIND11_MODULE(pyz80, m) {
       .def("set_consume_clock_callback", &PyZ80::set_consume_clock_callback,
            "Set the clock consumption callback")
       .def_property_readonly("reg", &PyZ80::reg, "Get the current register state")
+      .def("state", &PyZ80::state, "Get all registers as bytes")
+      .def("set_state", &PyZ80::set_state, "Restore registers from state()")
+      .def_static("memo_key", &PyZ80::memo_key,
+                  "state() without R, WZ and the clock counter")
+      .def_static("replay", &PyZ80::replay,
+                  "Apply a memoized instruction's before/after states to state")
       .def_property("PC", &PyZ80::PC, &PyZ80::setPC, "Get or set the PC");
 }
 
@@ -0,0 +1,40 @@
+import numpy as np
+
+from shared.lcd_vram import PageVRAM, copy_region, expand_pages, unpack_pages
+
+
+def test_unpack_pages_bit_order():
+    bitmap = unpack_pages([[0b0000_0001, 0b1000_0000], [0xFF, 0x00]])
+    assert bitmap.shape == (16, 2)
+    assert bitmap[:8, 0].tolist() == [1, 0, 0, 0, 0, 0, 0, 0]
+    assert bitmap[:8, 1].tolist() == [0, 0, 0, 0, 0, 0, 0, 1]
+    assert bitmap[8:, 0].all()
+    assert not bitmap[8:, 1].any()
+
+
+def test_page_vram():
+    vram = PageVRAM(2, 4)
+    assert len(vram) == 2
+    assert vram.columns == 4
+
+    assert vram.write(1, 2, 0x0F)
+    assert not vram.write(1, 2, 0x0F)
+    vram[0][3] = 0x80
+    assert vram.tolist() == [[0, 0, 0, 0x80], [0, 0, 0x0F, 0]]
+    assert vram == PageVRAM.from_rows([[0, 0, 0, 0x80], [0, 0, 0x0F, 0]])
+
+    assert vram.to_bitmap(slice(1, 2), slice(2, 3))[:, 0].tolist() == [1, 1, 1, 1, 0, 0, 0, 0]
+    assert np.asarray(vram).shape == (2, 4)
+
+
+def test_copy_region_and_expand_pages():
+    dest = np.zeros((2, 6), dtype=np.uint8)
+    src = np.array([[1, 2, 3], [4, 5, 6]], dtype=np.uint8)
+    copy_region(dest, src, 0, 0)
+    copy_region(dest, src, 0, 3, mirror=True)
+    assert dest.tolist() == [[1, 2, 3, 3, 2, 1], [4, 5, 6, 6, 5, 4]]
+
+    sources = expand_pages(np.array([[None, 7]], dtype=object))
+    assert sources.shape == (8, 2)
+    assert sources[5, 1] == 7
+    assert sources[0, 0] is None
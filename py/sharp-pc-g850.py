@@ -8,6 +8,7 @@ app = marimo.App(width="medium")
 def _():
     import asyncio
     import datetime
+    import os
     import queue
     import time
     from contextlib import asynccontextmanager
@@ -24,6 +25,7 @@ def _():
         datetime,
         humanize,
         mo,
+        os,
         pandas,
         queue,
         time,
@@ -58,6 +60,7 @@ def _(ctypes, ftd3xx, mft):
     class Ft600Device:
         def __init__(self):
             self.channel = 0
+            self.read_buffer = bytearray()
 
             self.D3XX = ftd3xx.create(0, mft.FT_OPEN_BY_INDEX)
             if self.D3XX is None:
@@ -77,14 +80,18 @@ def _(ctypes, ftd3xx, mft):
 
         # benchmarks:
         # 100: ~5000 packets/sec, ~7MB/sec when mashing buttons; up to ~46% CPU load
+        def read_into(self, buffer):
+            return self.D3XX.readPipeInto(self.channel, buffer, 100)
+
+        # returns a view into a reused buffer, only valid until the next read()
         def read(self, datalen):
-            bytesTransferred = mft.ULONG()
-            data = ctypes.create_string_buffer(datalen)
-            ftd3xx.call_ft(mft.FT_ReadPipeEx, self.D3XX.handle, mft.UCHAR(self.channel), data, mft.ULONG(datalen),
-                                    ctypes.byref(bytesTransferred), 100)
-            if bytesTransferred.value == 0:
+            if len(self.read_buffer) < datalen:
+                self.read_buffer = bytearray(datalen)
+            view = memoryview(self.read_buffer)[:datalen]
+            bytesTransferred = self.read_into(view)
+            if bytesTransferred == 0:
                 return None
-            return data.raw[:bytesTransferred.value]
+            return view[:bytesTransferred]
     return (Ft600Device,)
 
 
@@ -103,12 +110,23 @@ def _():
 
 @app.cell
 def _():
-    from z80bus import bus_parser, key_matrix, sed1560
+    from z80bus import batch_parser, bus_parser, capture_file, event_store, key_matrix, sed1560, sharded_parser
 
     IOPort = bus_parser.IOPort
     Type = bus_parser.Type
     InstructionType = bus_parser.InstructionType
-    return IOPort, InstructionType, Type, bus_parser, key_matrix, sed1560
+    return (
+        IOPort,
+        InstructionType,
+        Type,
+        batch_parser,
+        bus_parser,
+        capture_file,
+        event_store,
+        key_matrix,
+        sed1560,
+        sharded_parser,
+    )
 
 
 @app.cell
@@ -141,12 +159,16 @@ def _(Enum, mo):
         STREAM_TO_FASTAPI = 0
         LOCAL_BUFFER = 1
         LOCAL_PIPELINE = 2
+        LOCAL_FILE = 3
+        LOCAL_LIVE_LCD = 4
 
     collect_data_type = mo.ui.radio(
         options={
             "Stream to local FastAPI worker": CollectDataType.STREAM_TO_FASTAPI,
             "Local Pipeline (results in data loss)": CollectDataType.LOCAL_PIPELINE,
+            "Local live LCD (parser processes fed through shared memory)": CollectDataType.LOCAL_LIVE_LCD,
             "Local Buffer": CollectDataType.LOCAL_BUFFER,
+            "Local Capture File (captures/*.bin)": CollectDataType.LOCAL_FILE,
         },
         value='Local Buffer',
     )
@@ -200,16 +222,23 @@ def _(collect_data_type, collect_date_timeout, mo):
 @app.cell(hide_code=True)
 async def _(
     CollectDataType,
+    ExitStack,
     Ft600Device,
     TransferRateCalculator,
+    batch_parser,
     bus_parser,
+    capture_file,
     collect_data_button,
     collect_data_type,
     collect_date_timeout,
     datetime,
+    event_store,
     humanize,
     mo,
+    os,
     queue,
+    sed1560,
+    sharded_parser,
     time,
     websockets,
 ):
@@ -236,6 +265,7 @@ async def _(
                 errors_queue=self.errors_queue,
                 out_ports_queue=None,
                 save_all_events=True,
+                all_events=event_store.EventStore(),
             )
             self.buf = b""
 
@@ -263,17 +293,63 @@ async def _(
             pass
 
         async def all_events(self):
-            self.parser = bus_parser.PipelineBusParser(
-                errors_queue=self.errors_queue,
-                out_ports_queue=None,
-                save_all_events=True,
-            )
+            self.parser = batch_parser.BatchBusParser()
+            # same assumption as PipelineBusParser: the capture may start before the first ROM_BANK write
+            self.parser.rom_bank = 0
             combined_buffer = b''.join(self.buffer)
             expect_num_events = len(combined_buffer) / 4
             print(f'Buffer size: {humanize.naturalsize(len(combined_buffer), binary=True)}; expected number of events: {expect_num_events}')
-            self.parser.parse(combined_buffer)
-            self.parser.flush()
-            return self.parser.all_events
+            columns, errors = self.parser.parse(combined_buffer)
+            for e in errors:
+                self.errors_queue.put(e)
+            return event_store.EventStore.from_columns(columns)
+
+
+    class LocalFileAdapter:
+        def __init__(self):
+            self.errors_queue = queue.Queue()
+            os.makedirs("captures", exist_ok=True)
+            self.path = f"captures/g850-{datetime.datetime.now():%Y%m%d-%H%M%S}.bin"
+            self.writer = capture_file.CaptureWriter(self.path)
+
+        async def send(self, data):
+            self.writer.write(data)
+
+        async def start(self):
+            pass
+
+        async def all_events(self):
+            self.writer.close()
+            reader = capture_file.CaptureReader(self.path)
+            print(f'{self.path}: {humanize.naturalsize(len(reader), binary=True)}; {reader.header}')
+            events, errors = sharded_parser.parse_sharded(self.path)
+            for e in errors:
+                self.errors_queue.put(e)
+            return events
+
+
+    class LocalLiveLcdAdapter:
+        # FT600 data -> ShmRingBuffer -> parser process -> PortEventRing -> LCD process
+        def __init__(self):
+            self.errors_queue = queue.Queue()
+            self.stack = ExitStack()
+
+        async def start(self):
+            self.lcd = self.stack.enter_context(sed1560.DrawLCDContext())
+            self.parser = self.stack.enter_context(bus_parser.ParseContext(ports_output=self.lcd.input_queue))
+
+        async def send(self, data):
+            # don't stall the FT600 reads, a full ring drops the chunk and counts it
+            self.parser.input_queue.put(data, block=False)
+            try:
+                mo.output.replace(self.lcd.display_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+        async def all_events(self):
+            print(self.parser.input_queue.stats())
+            self.stack.close()
+            return []
 
 
     async def GetBusData(streamer, num_seconds_before_timeout=3):
@@ -311,7 +387,12 @@ async def _(
 
                 d.write(b'S+')
 
-                image_index = 1
+                if collect_data_type.value == CollectDataType.STREAM_TO_FASTAPI:
+                    # the page receives a frame whenever the LCD changes
+                    mo.output.replace(
+                        mo.Html('<iframe src="http://localhost:8000/lcd/view" width="680" height="240"></iframe>')
+                    )
+
                 transmission_buf = b""
                 last_transmission_time = None
                 _spinner.update(subtitle="Collecting data ...")
@@ -337,17 +418,6 @@ async def _(
                         status_num_bytes_sent += len(bytes)
                         transmission_buf = b""
 
-                        if (
-                            collect_data_type.value
-                            == CollectDataType.STREAM_TO_FASTAPI
-                        ):
-                            mo.output.replace(
-                                mo.image(
-                                    f"http://localhost:8000/lcd?force_redraw={image_index}"
-                                )
-                            )
-                            image_index += 1
-
                 d.write(b'S-')
 
             _spinner.update(subtitle="Collecting data ...")
@@ -365,10 +435,16 @@ async def _(
             streamer = LocalBufferAdapter
         case CollectDataType.LOCAL_PIPELINE:
             streamer = LocalPipelineAdapter
+        case CollectDataType.LOCAL_FILE:
+            streamer = LocalFileAdapter
+        case CollectDataType.LOCAL_LIVE_LCD:
+            streamer = LocalLiveLcdAdapter
     parsed = await GetBusData(streamer, collect_date_timeout.value)
     return (
         GetBusData,
         LocalBufferAdapter,
+        LocalFileAdapter,
+        LocalLiveLcdAdapter,
         LocalPipelineAdapter,
         WebsocketAdapter,
         parsed,
@@ -377,8 +453,11 @@ async def _(
 
 
 @app.cell
-def _(pandas, parsed):
-    df = pandas.DataFrame(parsed)
+def _(event_store, pandas, parsed):
+    if isinstance(parsed, event_store.EventStore):
+        df = parsed.to_dataframe()
+    else:
+        df = pandas.DataFrame(parsed)
     return (df,)
 
 
@@ -475,61 +554,7 @@ def _(Type, z80):
 
 @app.cell
 def _():
-    # PC-G850
-    FUNCTIONS = {
-        0xBA36: "set_rom_bank",
-        # modifies stack
-        0x93CD: "jump_after_set_rom_bank",
-        0x93F3: "jump_after_set_rom_bank_cleanup",
-        # https://www.akiyan.com/pc-g850_technical_data
-        0x8440: "draw_char",  # BE62h
-        0x8738: "draw_char_continuous",  # BFEEh
-        0x84BF: "draw_string",  # BFF1h
-        0x89BE: "is_key_down",  # BE53h
-        0x88C1: "wait_for_key_down",  # BCFDh
-    }
-
-    BNIDA_NAMES_RAW = {
-        "33856": "draw_char",
-        "33983": "draw_string",
-        "34027": "scroll_display_one_line_up",
-        "34091": "read_lcd_command_until_something?",
-        "34616": "draw_char_continuous",
-        "35009": "wait_for_key_down",
-        "35262": "is_key_down",
-        "35304": "scan_key_down?_wrap",
-        "35309": "scan_key_down?",
-        "35419": "key_something_halt?",
-        "35501": "wait_80",
-        "35510": "wait_332",
-        "35516": "wait",
-        "36431": "do_halt?",
-        "37610": "delay?",
-        "37893": "draw_after_reset?",
-        "41317": "draw_run_program_mode",
-        "42796": "error_in?",
-        "43005": "break_in?",
-        "43114": "get_lcd_row_to_draw_possibly_scroll",
-        "47117": "draw_string2?",
-        "47670": "set_rom_bank",
-        "48381": "wait_for_key_down_wrap",
-        "48441": "draw_after_reset_wrap",
-        "48723": "is_key_down_wrap",
-        "49131": "scroll_display_one_line_up_wrap",
-        "49134": "draw_char_continuous_wrap",
-        "49137": "draw_string_wrap",
-        "49152": "main?",
-        "65321": "do_reset_memory?",
-    }
-
-    BNIDA_NAMES = {int(k, 10): v for k, v in BNIDA_NAMES_RAW.items()}
-
-    def get_function_name(addr: int):
-        if addr in BNIDA_NAMES:
-            return BNIDA_NAMES[addr]
-        if addr in FUNCTIONS:
-            return FUNCTIONS[addr]
-        return f"sub_{hex(addr)[2:]}"
+    from z80bus.symbols import BNIDA_NAMES, BNIDA_NAMES_RAW, FUNCTIONS, get_function_name
     return BNIDA_NAMES, BNIDA_NAMES_RAW, FUNCTIONS, get_function_name
 
 
@@ -550,111 +575,7 @@ def _():
 
 @app.cell
 def _():
-    class DrawCharInterpreter:
-        CHAR_NAMES = {
-            0: "␣",
-            33: "A",
-            34: "B",
-            35: "C",
-            36: "D",
-            37: "E",
-            38: "F",
-            39: "G",
-            40: "H",
-            41: "I",
-            42: "J",
-            43: "K",
-            44: "L",
-            45: "M",
-            46: "N",
-            47: "O",
-            48: "P",
-            49: "Q",
-            50: "R",
-            51: "S",
-            52: "T",
-            53: "U",
-            54: "V",
-            55: "W",
-            56: "X",
-            57: "Y",
-            58: "Z",
-            0x1E: ">",
-        }
-
-        CHAR_NAMES_BE5F = {
-            0x20: "␣",
-            0x2A: "*",
-            0x41: "A",
-            0x42: "B",
-            0x43: "C",
-            0x44: "D",
-            0x45: "E",
-            0x46: "F",
-            0x47: "G",
-            0x48: "H",
-            0x49: "I",
-            0x4A: "J",
-            0x4B: "K",
-            0x4C: "L",
-            0x4D: "M",
-            0x4E: "N",
-            0x4F: "O",
-            0x50: "P",
-            0x51: "Q",
-            0x52: "R",
-            0x53: "S",
-            0x54: "T",
-            0x55: "U",
-            0x56: "V",
-            0x57: "W",
-            0x58: "X",
-            0x59: "Y",
-            0x5A: "Z",
-            0x61: "a",
-            0x62: "b",
-            0x63: "c",
-            0x64: "d",
-            0x65: "e",
-            0x66: "f",
-            0x67: "g",
-            0x68: "h",
-            0x69: "i",
-            0x6A: "j",
-            0x6B: "k",
-            0x6C: "l",
-            0x6D: "m",
-            0x6E: "n",
-            0x6F: "o",
-            0x70: "p",
-            0x71: "q",
-            0x72: "r",
-            0x73: "s",
-            0x74: "t",
-            0x75: "u",
-            0x76: "v",
-            0x77: "w",
-            0x78: "x",
-            0x79: "y",
-            0x7A: "z",
-        }
-
-        @staticmethod
-        def char_num(char, func_addr):
-            if func_addr == 0xBE5F:
-                char += 0x10
-            return char
-
-        @staticmethod
-        def char_name(char, func_addr):
-            if func_addr == 0xBE5F:
-                if char in DrawCharInterpreter.CHAR_NAMES_BE5F:
-                    return DrawCharInterpreter.CHAR_NAMES_BE5F[char]
-                return hex(char)
-
-            if char in DrawCharInterpreter.CHAR_NAMES:
-                return DrawCharInterpreter.CHAR_NAMES[char]
-            return hex(char)
+    from z80bus.symbols import DrawCharInterpreter
     return (DrawCharInterpreter,)
 
 
@@ -665,361 +586,34 @@ def _(bus_parser):
 
 
 @app.cell
-def _(
-    DrawCharInterpreter,
-    InstructionType,
-    Optional,
-    PerfettoTraceBuilder,
-    Pyz80Runner,
-    Type,
-    dataclass,
-    dataclasses,
-    datetime,
-    get_function_name,
-    key_matrix,
-    mo,
-    parsed,
-    pyz80,
-):
-    @dataclass
-    class PerfettoStack:
-        begin_event: object
-        begin_ts: int
-        reg: Optional[pyz80.RegisterPair]
-
-        caller: int
-        pc: int
-        expected_return_addr: int
-
-
-    class PerfettoTraceCreator:
-        def __init__(self):
-            self.pc = None
-            self.last_stack_event = None
-            self.last_stack_event_index = None
-            self.stack = []
-            self.ts = 0
-            self.index = None
-            self.builder = None
-
-            self.main_thread = None
-            self.keys_thread = None
-            self.draw_char_thread = None
-            self.draw_char_addr = {0x8440, 0xbe62, 0xbe5f}
-
-            self.runner = Pyz80Runner()
-            self.key_matrix = key_matrix.KeyMatrixInterpreter()
-            self.last_pressed_keys = []
-
-            self.enrichment = {
-                # draw_char
-                0x8440: {'A': 'char', 'D': 'y', 'E': 'x'},
-                0xbe5f: {'A': 'char', 'D': 'y', 'E': 'x'},
-                0xbe62: {'A': 'char', 'D': 'y', 'E': 'x'},
-                # draw_char_continuous
-                0x8738: {'A': 'char', 'B': 'num_char', 'D': 'y', 'E': 'x'},
-                0xbfee: {'A': 'char', 'B': 'num_char', 'D': 'y', 'E': 'x'},
-                # draw_string
-                0x84bf: {'B': 'num_char', 'D': 'y', 'E': 'x', 'HL': 'str_ptr'},
-                0xbff1: {'B': 'num_char', 'D': 'y', 'E': 'x', 'HL': 'str_ptr'},
-            }
-
-            self.interesting_functions = set(self.enrichment.keys())
-            self.interesting_functions.add(0x14000) # alternative string draw?
-
-        def create_perfetto_trace(self, data):
-            current_date_time_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.builder = PerfettoTraceBuilder(f'SHARP PC-G850 {current_date_time_str}')
-
-            self.main_thread = self.builder.add_thread_descriptor(self.builder.process_uuid, "main")
-            self.keys_thread = self.builder.add_thread_descriptor(self.builder.process_uuid, "keys")
-            self.draw_char_thread = self.builder.add_thread_descriptor(self.builder.process_uuid, "draw_char")
-
-            for index, e in enumerate(data):
-                self.index = index
-                self.ts += 1
-
-                self.runner.eval(e)
-
-                if e.type == Type.FETCH:
-                    self.pc = e.addr
-
-                    # it might be useful later
-                    if len(self.stack) > 0 and not self.stack[-1].reg:
-                        self.stack[-1].reg = self.runner.reg()
-
-                    # self.runner.eval(e) will move the pc to the last_pc
-                    if self.runner.last_pc_full in self.interesting_functions:
-                        self.enrich_interesting_function(self.runner.last_pc_full)
-
-                    if self.last_stack_event is not None:
-                        if self.last_stack_event.instr == InstructionType.CALL:
-                            self._handle_call_event(e)
-                        else:
-                            self._handle_ret_event(e)
-                    self.last_stack_event = None
-                    self.last_stack_event_index = None
-                elif e.type in [Type.IN_PORT, Type.OUT_PORT]:
-                    self._handle_port_event(e)
-
-                    self.key_matrix.eval(e)
-                    if self.last_pressed_keys != self.key_matrix.pressed_keys():
-                        self._handle_pressed_keys(self.last_pressed_keys, self.key_matrix.pressed_keys())
-                        self.last_pressed_keys = self.key_matrix.pressed_keys()
-                elif e.type in [Type.READ_STACK, Type.WRITE_STACK]:
-                    self._handle_stack_event(e)
-
-                # next FETCH instruction will be the destination of the CALL/RET
-                if e.instr in [InstructionType.CALL, InstructionType.RET]:
-                    self.last_stack_event = e
-                    self.last_stack_event_index = index
-
-            return self.builder
-
-        # FIXME: ideally want separate tracks for the items, as they're independent and not nested
-        def _handle_pressed_keys(self, last, curr):
-            # first need to close the slices for the keys that are no longer pressed
-            stop_pressed = set(last) - set(curr)
-            for k in stop_pressed:
-                self.builder.add_slice_event(self.keys_thread, self.ts, 'end')
-
-            # then open slices for keys that weren't pressed before and are pressed now
-            start_pressed = set(curr) - set(last)
-            for k in start_pressed:
-                self.builder.add_slice_event(self.keys_thread, self.ts, 'begin', f'key {k}')
-
-        def _annotate_common(self, be, e, name):
-            with be.annotation(name) as ann:
-                ann.int("index", self.last_stack_event_index)
-                ann.pointer("pc", self.pc)
-                ann.pointer("caller", self.last_stack_event.addr)
-                if e.bank:
-                    ann.int("bank", e.bank)
-
-        def _handle_call_event(self, e):
-            function_name = get_function_name(self.pc)
-            with self.builder.add_slice_event(self.main_thread, self.ts, 'begin', function_name) as begin_event:
-                expected_return_addr = self.last_stack_event.addr + 3
-                self.stack.append(PerfettoStack(
-                    begin_event=begin_event,
-                    begin_ts=self.ts,
-                    reg=None,
-                    caller=self.last_stack_event.addr,
-                    pc=self.pc,
-                    expected_return_addr=expected_return_addr
-                ))
-                self._annotate_common(begin_event, e, 'call')
-
-        def enrich_interesting_function(self, addr):
-            assert len(self.stack) > 0
-            s = self.stack[-1]
-            if addr in self.enrichment:
-                with s.begin_event.annotation("enrich") as ann:
-                    for reg, field in self.enrichment[addr].items():
-                        if len(reg) == 2:
-                            high = getattr(self.runner.reg(), reg[0])
-                            low = getattr(self.runner.reg(), reg[1])
-                            ann.pointer(field, (high << 8) | low)
-                        else:
-                            ann.int(field, getattr(self.runner.reg(), reg))
-            else:
-                with s.begin_event.annotation("reg") as ann:
-                    reg = self.runner.reg()
-                    # iterate over all fields in RegisterPair and add them to the annotation as pointers
-                    for field in dataclasses.fields(reg):
-                        ann.pointer(field.name, getattr(reg, field.name))
-
-        def create_draw_char_slice(self, s, e):
-            char = DrawCharInterpreter.char_name(s.reg.A, s.pc)
-            begin = self.builder.add_slice_event(self.draw_char_thread, s.begin_ts, 'begin', char)
-            with begin.annotation('draw_char') as ann:
-                ann.pointer("char", s.reg.A)
-                ann.pointer("x", s.reg.E)
-                ann.pointer("y", s.reg.D)
-            self.builder.add_slice_event(self.draw_char_thread, self.ts, 'end')
-
-        def _handle_mismatched_ret_event(self, e, s):
-            # sub_93cd hacks the return address after switching rom bank
-            if self.last_stack_event.addr == 0x93f2:
-                self._handle_call_event(e)
-                self.stack[-1].expected_return_addr = 0x93f3
-                return
-
-            with self.builder.add_instant_event(self.main_thread, self.ts, 'BAD_RET').annotation('ret') as ann:
-                ann.int("index", self.index)
-                ann.pointer("pc", self.pc)
-                ann.pointer("expected_return_addr", s.expected_return_addr)
-
-        def _handle_ret_event(self, e):
-            if self.stack:
-                s = self.stack.pop()
-
-                if s.pc in self.draw_char_addr:
-                    self.create_draw_char_slice(s, e)
-
-                self.builder.add_slice_event(self.main_thread, self.ts, 'end')
-                self._annotate_common(s.begin_event, e, 'ret')
-
-                if self.pc != s.expected_return_addr:
-                    self._handle_mismatched_ret_event(e, s)
-            else:
-                underflow = self.builder.add_instant_event(self.main_thread, self.ts, 'UNDERFLOW')
-                self._annotate_common(underflow, e, 'ret')
-
-        def _handle_port_event(self, e):
-            direction = 'in' if e.type == Type.IN_PORT else 'out'
-            name = f'{e.port.name} {direction} {hex(e.val)}'
-            with self.builder.add_instant_event(self.main_thread, self.ts, name).annotation('call') as ann:
-                ann.int("index", self.index)
-                ann.pointer("pc", self.pc)
-                ann.pointer("port", e.port.value)
-                ann.pointer("val", e.val)
-
-        def _handle_stack_event(self, e):
-            direction = 'POP' if e.type == Type.READ_STACK else 'PUSH'
-            name = f'{direction} {hex(e.val)}'
-            with self.builder.add_instant_event(self.main_thread, self.ts, name).annotation('stack') as ann:
-                ann.int("index", self.index)
-                ann.pointer("pc", self.pc)
-                ann.pointer("addr", e.addr)
-                ann.pointer("val", e.val)
+def _(Pyz80Runner, mo, parsed):
+    from z80bus.perfetto import PerfettoTraceCreator
 
+    perfetto_trace_path = "sharp-pc-g850-perfetto.pb"
+    with open(perfetto_trace_path, "wb") as perfetto_trace_file:
+        perfetto_trace_size = PerfettoTraceCreator(runner=Pyz80Runner()).create_perfetto_trace(parsed, out=perfetto_trace_file).num_bytes
 
     def get_perfetto_trace_data():
-        ppp = PerfettoTraceCreator().create_perfetto_trace(parsed)
-        return ppp.serialize()
+        with open(perfetto_trace_path, "rb") as f:
+            return f.read()
 
     download_perfetto = mo.download(
         label='Download Perfetto Trace',
         data=get_perfetto_trace_data,
         filename="sharp-pc-g850-perfetto.pb",
     )
-    len(get_perfetto_trace_data())
+    perfetto_trace_size
     download_perfetto
     return (
-        PerfettoStack,
         PerfettoTraceCreator,
         download_perfetto,
         get_perfetto_trace_data,
+        perfetto_trace_file,
+        perfetto_trace_path,
+        perfetto_trace_size,
     )
 
 
-@app.cell(hide_code=True)
-def _():
-    import perfetto_pb2 as perfetto
-
-    class DebugAnnotation:
-        def __init__(self, ann):
-            self.ann = ann
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, type, value, traceback):
-            pass
-
-        def entry(self, name):
-            entry = self.ann.dict_entries.add()
-            entry.name = name
-            return entry
-
-        def pointer(self, name, value):
-            entry = self.entry(name)
-            entry.pointer_value = value
-
-        def string(self, name, value):
-            entry = self.entry(name)
-            entry.string_value = value
-
-        def bool(self, name, value):
-            entry = self.entry(name)
-            entry.bool_value = value
-
-        def int(self, name, value):
-            entry = self.entry(name)
-            entry.int_value = value
-
-    class TrackEvent:
-        def __init__(self, event):
-            self.event = event
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, type, value, traceback):
-            pass
-
-        def annotation(self, name):
-            ann = self.event.debug_annotations.add()
-            ann.name = name
-            return DebugAnnotation(ann)
-
-    class PerfettoTraceBuilder:
-        def __init__(self, process_name: str):
-            self.trace = perfetto.Trace()
-            self.last_track_uuid = 0
-            self.trusted_packet_sequence_id = 0x123
-            # self.process_uuid = 0x456
-            self.pid = 1234
-            self.last_tid = 1
-            # self.tid = 5678
-
-            self.process_uuid = self.add_process_descriptor(process_name)
-            # self.add_thread_descriptor(thread_descriptor)
-
-        def add_process_descriptor(self, process_name: str):
-            self.last_track_uuid += 1
-            track_uuid = self.last_track_uuid
-
-            packet = self.trace.packet.add()
-            packet.track_descriptor.uuid = track_uuid # self.process_uuid
-            packet.track_descriptor.process.pid = self.pid
-            packet.track_descriptor.process.process_name = process_name
-            return track_uuid
-
-        def add_thread_descriptor(self, process_uuid: int, thread_name: str):
-            self.last_track_uuid += 1
-            track_uuid = self.last_track_uuid
-
-            packet = self.trace.packet.add()
-            packet.track_descriptor.uuid = track_uuid
-            packet.track_descriptor.parent_uuid = process_uuid
-            packet.track_descriptor.thread.pid = self.pid
-            packet.track_descriptor.thread.tid = self.last_tid
-            self.last_tid += 1
-            packet.track_descriptor.thread.thread_name = thread_name
-            return track_uuid
-
-        def add_slice_event(self, track_uuid, timestamp: int, event_type: str, name: Optional[str] = None):
-            packet = self.trace.packet.add()
-            packet.timestamp = timestamp
-
-            if event_type == 'begin':
-                packet.track_event.type = perfetto.TrackEvent.TYPE_SLICE_BEGIN
-                packet.track_event.name = name
-            elif event_type == 'end':
-                packet.track_event.type = perfetto.TrackEvent.TYPE_SLICE_END
-            else:
-                raise ValueError("event_type must be either 'begin' or 'end'.")
-
-            packet.track_event.track_uuid = track_uuid
-            packet.trusted_packet_sequence_id = self.trusted_packet_sequence_id
-            return TrackEvent(packet.track_event)
-
-        def add_instant_event(self, track_uuid, timestamp: int, name: str):
-            packet = self.trace.packet.add()
-            packet.timestamp = timestamp
-            packet.track_event.type = perfetto.TrackEvent.TYPE_INSTANT
-            packet.track_event.track_uuid = track_uuid
-            packet.track_event.name = name
-            packet.trusted_packet_sequence_id = self.trusted_packet_sequence_id
-            return TrackEvent(packet.track_event)
-
-        def serialize(self) -> bytes:
-            return self.trace.SerializeToString()
-    return DebugAnnotation, PerfettoTraceBuilder, TrackEvent, perfetto
-
-
 @app.cell(hide_code=True)
 def _():
     def read_rom_banks():
@@ -1045,9 +639,9 @@ def _():
 
 
 @app.cell
-def _(RomVerifier, rom_banks):
+def _(bus_parser, rom_banks):
     def make_continuous_rom_image():
-        result = b'\x00' * RomVerifier.ROM0_ADDR_START
+        result = b'\x00' * bus_parser.ROM_ADDR_START
         for bank in sorted(rom_banks.keys()):
             result += rom_banks[bank]
 
@@ -1066,125 +660,20 @@ def _(RomVerifier, rom_banks):
 
 
 @app.cell(hide_code=True)
-def _(IOPort, Type, df, rom_banks):
-    class RomVerifier:
-        RAM_ADDR_START = 0x100
-        ROM0_ADDR_START = 0x8000
-        # bank1 and up
-        BANK_ADDR_START = 0xC000
-
-        def __init__(self):
-            self.rom_bank = None
-
-            # Setting BK'2 to 1 enables the CPU's /CEROM2 signal and disconnects the main ROM.
-            # BK'1 and BK'0 are output to the BANK1 and BANK0 terminals of the 40-pin system bus.
-            self.ex_bank = None
-
-            # RAM CE signal selection:
-            # 0: CERAM1 (internal RAM)
-            # 1: CERAM2 (external RAM on system bus)
-            self.ram_bank = None
-
-            self.ram = ['-'] * 0x8000
-
-            self.i = 0
-
-        def get_rom_bank(self, bank):
-            assert(self.rom_bank is not None)
-            if self.rom_bank != bank:
-                raise ValueError(f"Expected rom_bank {hex(self.rom_bank)}, got {hex(bank)}")
-
-        def get_ex_bank(self, bank):
-            assert(self.ex_bank is not None)
-            if self.ex_bank != bank:
-                raise ValueError(f"Expected ex_bank {self.ex_bank}, got {bank}")
-
-        def get_ram_bank(self, bank):
-            assert(self.ram_bank is not None)
-            if self.ram_bank != bank:
-                raise ValueError(f"Expected ram_bank {hex(self.ram_bank)}, got {hex(bank)}")
-
-        def set_rom_bank(self, bank):
-            if self.rom_bank != bank:
-                # print(f"Setting rom_bank to {hex(bank)}")
-                pass
-            self.rom_bank = bank
-
-        def set_ex_bank(self, bank):
-            if self.ex_bank != bank:
-                # print(f"Setting ex_bank to {hex(bank)}")
-                pass
-            self.ex_bank = bank
-
-        def set_ram_bank(self, bank):
-            if self.ram_bank != bank:
-                # print(f"Setting ram_bank to {hex(bank)}")
-                pass
-            self.ram_bank = bank
-
-        def write(self, addr, val):
-            if addr > self.RAM_ADDR_START and addr < self.ROM0_ADDR_START:
-                self.ram[addr] = val
-            if addr > self.ROM0_ADDR_START:
-                raise ValueError(f"Unexpected write to ROM region: {hex(addr)}: {hex(val)}")
-
-        def read(self, addr, val):
-            if addr > self.ROM0_ADDR_START and addr < self.BANK_ADDR_START:
-                expect = rom_banks[0][addr - self.ROM0_ADDR_START]
-                if val != expect:
-                    print(f"ex_bank({self.ex_bank}): mismatch at {hex(addr)}: {hex(val)} != {hex(expect)}")
-
-            if addr > self.BANK_ADDR_START:
-                expect = rom_banks[self.rom_bank][addr - self.BANK_ADDR_START]
-                if val != expect:
-                    print(f"rom_bank({self.rom_bank}): mismatch at {hex(addr)}: {hex(val)} != {hex(expect)}")
+def _(event_store, parsed, rom_banks):
+    from z80bus.rom_verify import verify_rom
 
     def verify_rom_memory():
-        verifier = RomVerifier()
-
-        # IO Port documentation:
-        # http://park19.wakwak.com/~gadget_factory/factory/pokecom/io.html
-        for r in df.iloc[0:1000000].itertuples():
-            # print(r.type, r.val, r.addr)
-
-            try:
-                port = IOPort(r.addr) if r.type in [Type.IN_PORT, Type.OUT_PORT] else None
-            except ValueError:
-                continue
-
-            if r.type == Type.WRITE:
-                verifier.write(r.addr, r.val)
-            elif r.type in [Type.READ, Type.FETCH]:
-                verifier.read(r.addr, r.val)
-            elif r.type == Type.IN_PORT:
-                match port:
-                    case IOPort.ROM_EX_BANK:
-                        rom_bank = r.val & 0x0F
-                        ex_bank = (r.val & 0x70) >> 4
-                        verifier.get_rom_bank(rom_bank)
-                        verifier.get_ex_bank(ex_bank)
-                    case IOPort.RAM_BANK:
-                        verifier.get_ram_bank(r.val)
-                    case IOPort.ROM_BANK:
-                        verifier.get_rom_bank(r.val)
-            elif r.type == Type.OUT_PORT:
-                match port:
-                    case IOPort.ROM_EX_BANK:
-                        rom_bank = r.val & 0x0F
-                        ex_bank = (r.val & 0x70) >> 4
-                        verifier.set_rom_bank(rom_bank)
-                        verifier.set_ex_bank(ex_bank)
-                    case IOPort.RAM_BANK:
-                        verifier.set_ram_bank(r.val)
-                    case IOPort.ROM_BANK:
-                        verifier.set_rom_bank(r.val)
-            else:
-                raise ValueError(f"Unknown type {r.type}")
-
-        return verifier
+        if isinstance(parsed, event_store.EventStore):
+            store = parsed
+        else:
+            store = event_store.EventStore()
+            store.extend(parsed)
+        return verify_rom(store.columns(), rom_banks)
 
-    # verifier = verify_rom_memory()
-    return RomVerifier, verify_rom_memory
+    # rom_mismatches = verify_rom_memory()
+    # rom_mismatches.to_dataframe()
+    return verify_rom, verify_rom_memory
 
 
 @app.cell(hide_code=True)
@@ -1519,6 +1008,26 @@ def _(df, df_valh):
     return
 
 
+@app.cell(hide_code=True)
+def _(mo):
+    crosscheck_button = mo.ui.run_button(label="Cross-check capture against pyz80")
+    crosscheck_button
+    return (crosscheck_button,)
+
+
+@app.cell
+def _(crosscheck_button, mo, parsed, rom_banks):
+    # the whole capture, executing only instructions whose registers and bus inputs weren't seen before
+    mo.stop(not crosscheck_button.value)
+
+    from z80bus.crosscheck import CrossChecker, Pyz80Core
+
+    crosscheck = CrossChecker(Pyz80Core(), rom_banks)
+    crosscheck_divergences = crosscheck.check(parsed)
+    crosscheck.stats(), [str(d) for d in crosscheck_divergences[:20]]
+    return CrossChecker, Pyz80Core, crosscheck, crosscheck_divergences
+
+
 @app.cell
 def _(Pyz80Runner, df, orig_end, orig_start):
     runner = Pyz80Runner(debug_index_start=orig_start, debug_index_end=orig_end)
@@ -1585,20 +1094,25 @@ def _(mo, parsed_lcd_commands_df):
     return get_lcd_commands_range, lcd_commands_range
 
 
-@app.cell(hide_code=True)
-def _(lcd_commands_range, parsed_lcd_commands):
-    parsed_lcd_commands_filtered = parsed_lcd_commands[lcd_commands_range.value['start']: lcd_commands_range.value['start'] + lcd_commands_range.value['length']]
-    return (parsed_lcd_commands_filtered,)
+@app.cell
+def _(parsed_lcd_commands, sed1560):
+    # VRAM copies every HISTORY_INTERVAL commands, so scrubbing doesn't re-evaluate from the start
+    lcd_history = sed1560.SED1560History.record(parsed_lcd_commands)
+    for _index, _error in lcd_history.errors:
+        print(f"LCD command {_index} skipped: {_error}")
+    return (lcd_history,)
 
 
 @app.cell
-def _(parsed_lcd_commands_filtered, sed1560):
-    display = sed1560.SED1560Interpreter()
-    for cmd in parsed_lcd_commands_filtered:
-        display.eval(cmd)
+def _(lcd_commands_range, lcd_history):
+    # the screen as it was right after the selected range, i.e. after the first start + length
+    # commands; start alone only picks the rows shown in the command tables
+    display = lcd_history.interpreter_at(
+        min(lcd_commands_range.value['start'] + lcd_commands_range.value['length'], len(lcd_history))
+    )
 
     display.vram_image()
-    return cmd, display
+    return (display,)
 
 
 @app.cell(hide_code=True)
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from z80bus.bus_parser import (
+    BANK_ADDR_START,
+    BANK_SIZE,
+    OPCODE_CALL_PREFIX,
+    OPCODE_CONDITIONAL_CALL_PREFIX,
+    OPCODE_CONDITIONAL_RET_PREFIX,
+    OPCODE_MULTI_PREFIX,
+    OPCODE_RET_PREFIX,
+    ROM_ADDR_START,
+    STACK_SIZE,
+    BaseBusParser,
+    Event,
+    InstructionType,
+    IOPort,
+    Type,
+)
+
+RECORD_SIZE = 4
+
+# sentinels for fields that are None in the Event dataclass
+NO_PC = 0xFFFFFFFF
+NO_BANK = -1
+NO_PORT = -1
+NO_INSTR = 0
+
+TYPE_CODE = {t: ord(t.value) for t in Type}
+CODE_TYPE = {code: t for t, code in TYPE_CODE.items()}
+
+_VALID_TYPE = np.zeros(256, dtype=bool)
+_VALID_TYPE[list(TYPE_CODE.values())] = True
+
+_VALID_PORT = np.zeros(256, dtype=bool)
+_VALID_PORT[[p.value for p in IOPort]] = True
+
+
+def _opcode_table() -> np.ndarray:
+    table = np.full(256, NO_INSTR, dtype=np.uint8)
+    for opcodes, instr in (
+        (OPCODE_MULTI_PREFIX, InstructionType.MULTI_PREFIX),
+        (OPCODE_CALL_PREFIX, InstructionType.CALL),
+        (OPCODE_CONDITIONAL_CALL_PREFIX, InstructionType.CALL_CONDITIONAL),
+        (OPCODE_RET_PREFIX, InstructionType.RET),
+        (OPCODE_CONDITIONAL_RET_PREFIX, InstructionType.RET_CONDITIONAL),
+    ):
+        table[list(opcodes)] = instr.value
+    return table
+
+
+_OPCODE_INSTR = _opcode_table()
+
+
+@dataclass
+class EventColumns:
+    """Columnar equivalent of ``list[Event]``.
+
+    ``type`` holds the ASCII code of the ``Type`` value, ``offset`` is the byte
+    offset of the record in the parsed buffer. Fields that are ``None`` in
+    ``Event`` are stored as the ``NO_*`` sentinels.
+    """
+
+    offset: np.ndarray  # int64
+    type: np.ndarray  # uint8
+    val: np.ndarray  # uint32, ERROR records carry a 24-bit counter
+    addr: np.ndarray  # uint32
+    pc: np.ndarray  # uint32
+    bank: np.ndarray  # int16
+    port: np.ndarray  # int16
+    instr: np.ndarray  # uint8
+
+    @classmethod
+    def empty(cls, size: int = 0) -> EventColumns:
+        return cls(
+            offset=np.zeros(size, dtype=np.int64),
+            type=np.zeros(size, dtype=np.uint8),
+            val=np.zeros(size, dtype=np.uint32),
+            addr=np.zeros(size, dtype=np.uint32),
+            pc=np.full(size, NO_PC, dtype=np.uint32),
+            bank=np.full(size, NO_BANK, dtype=np.int16),
+            port=np.full(size, NO_PORT, dtype=np.int16),
+            instr=np.full(size, NO_INSTR, dtype=np.uint8),
+        )
+
+    def __len__(self) -> int:
+        return len(self.type)
+
+    def __getitem__(self, key) -> EventColumns:
+        return EventColumns(**{f.name: getattr(self, f.name)[key] for f in fields(self)})
+
+    def to_events(self) -> list[Event]:
+        events = []
+        for type_code, val, addr, pc, bank, port, instr in zip(
+            self.type.tolist(),
+            self.val.tolist(),
+            self.addr.tolist(),
+            self.pc.tolist(),
+            self.bank.tolist(),
+            self.port.tolist(),
+            self.instr.tolist(),
+            strict=True,
+        ):
+            events.append(
+                Event(
+                    type=CODE_TYPE[type_code],
+                    val=val,
+                    addr=addr,
+                    pc=None if pc == NO_PC else pc,
+                    bank=None if bank == NO_BANK else bank,
+                    port=None if port == NO_PORT else IOPort(port),
+                    instr=None if instr == NO_INSTR else InstructionType(instr),
+                )
+            )
+        return events
+
+
+def find_record_offsets(raw: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+    """Locate record boundaries the same way ``BusParser.parse`` resyncs.
+
+    Returns the record offsets, the offsets of skipped invalid type bytes and
+    the offset where parsing stopped. Only invalid bytes are visited in Python;
+    runs of aligned records are produced with ``arange``.
+    """
+
+    last_start = len(raw) - RECORD_SIZE
+    if last_start < 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0
+
+    def invalid_on_stride(phase: int) -> np.ndarray:
+        return np.flatnonzero(~_VALID_TYPE[raw[phase : last_start + 1 : RECORD_SIZE]]) * RECORD_SIZE + phase
+
+    aligned_invalid = invalid_on_stride(0)
+    if len(aligned_invalid) == 0:
+        offsets = np.arange(0, last_start + 1, RECORD_SIZE, dtype=np.int64)
+        return offsets, aligned_invalid, int(offsets[-1]) + RECORD_SIZE
+
+    # invalid type bytes bucketed by alignment, so the next one on a given stride is a searchsorted away
+    by_phase = [aligned_invalid] + [invalid_on_stride(phase) for phase in range(1, RECORD_SIZE)]
+
+    runs = []
+    skipped = []
+    offset = 0
+    while offset <= last_start:
+        phase_invalid = by_phase[offset % RECORD_SIZE]
+        i = np.searchsorted(phase_invalid, offset)
+        stop = int(phase_invalid[i]) if i < len(phase_invalid) else last_start + RECORD_SIZE
+        if stop > offset:
+            runs.append(np.arange(offset, min(stop, last_start + 1), RECORD_SIZE, dtype=np.int64))
+            offset = int(runs[-1][-1]) + RECORD_SIZE
+        if offset == stop and stop <= last_start:
+            skipped.append(stop)
+            offset = stop + 1
+
+    offsets = np.concatenate(runs) if runs else np.zeros(0, dtype=np.int64)
+    return offsets, np.array(skipped, dtype=np.int64), offset
+
+
+def _forward_fill(mask: np.ndarray, values: np.ndarray, initial: int) -> np.ndarray:
+    """For every position, the value at the last position (inclusive) where mask is set."""
+    idx = np.where(mask, np.arange(len(mask)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[np.maximum(idx, 0)].astype(np.int64)
+    filled[idx < 0] = initial
+    return filled
+
+
+def rom_banks(columns: EventColumns, initial: int | None) -> np.ndarray:
+    """ROM bank in effect after each event, ``NO_BANK`` while still unknown."""
+    port = columns.port
+    sets_bank = (port == IOPort.ROM_BANK.value) | (port == IOPort.ROM_EX_BANK.value)
+    bank_val = np.where(port == IOPort.ROM_EX_BANK.value, columns.val & 0x0F, columns.val)
+    return _forward_fill(sets_bank, bank_val, NO_BANK if initial is None else initial)
+
+
+class BatchBusParser(BaseBusParser):
+    """Decode a whole capture buffer into ``EventColumns`` with vectorized passes.
+
+    Produces the same events and errors as ``BusParser.parse``. Like
+    ``BusParser``, ``rom_bank`` and ``pc`` carry over between ``parse`` calls
+    while the instruction state is reset at the start of every buffer.
+    """
+
+    def parse(self, data) -> tuple[EventColumns, list[str]]:
+        columns, errors, end = self.decode(data)
+        messages = [message for _, message in errors]
+        if end != memoryview(data).nbytes:
+            messages.append("Trailing data")
+        return columns, messages
+
+    def decode(self, data, base_offset: int = 0) -> tuple[EventColumns, list[tuple[int, str]], int]:
+        """Decode ``data`` that starts at ``base_offset`` in the capture.
+
+        Returns the columns, ``(offset, message)`` errors ordered by offset and
+        the relative offset where decoding stopped (a partial record may follow).
+        Offsets in the columns and error messages include ``base_offset``.
+        """
+
+        self._instruction_state.reset_all()
+
+        raw = np.frombuffer(data, dtype=np.uint8)
+        offsets, skipped, end = find_record_offsets(raw)
+
+        errors = [(int(o) + base_offset, f"Invalid type at offset {int(o) + base_offset}: {int(raw[o])}") for o in skipped]
+
+        n = len(offsets)
+        cols = EventColumns.empty(n)
+        cols.offset = offsets + base_offset
+        if n == 0:
+            return cols, errors, end
+
+        type_code = raw[offsets].copy()
+        b1 = raw[offsets + 1].astype(np.uint32)
+        b2 = raw[offsets + 2].astype(np.uint32)
+        b3 = raw[offsets + 3].astype(np.uint32)
+
+        is_error = type_code == TYPE_CODE[Type.ERROR]
+        val = np.where(is_error, b1 | (b2 << 8) | (b3 << 16), b1)
+        addr = np.where(is_error, 0, b2 | (b3 << 8)).astype(np.int64)
+
+        # the second M1 of a prefixed opcode is an operand read, see InstructionState.prefix_event
+        fetch_idx = np.flatnonzero(type_code == TYPE_CODE[Type.FETCH])
+        fetch_prefix = np.isin(b1[fetch_idx], list(OPCODE_MULTI_PREFIX))
+        chain_reset = np.ones(len(fetch_idx), dtype=bool)
+        chain_reset[1:] = ~fetch_prefix[:-1]
+        chain_start = np.where(chain_reset, np.arange(len(fetch_idx)), 0)
+        np.maximum.accumulate(chain_start, out=chain_start)
+        converted = (np.arange(len(fetch_idx)) - chain_start) % 2 == 1
+        type_code[fetch_idx[converted]] = TYPE_CODE[Type.READ]
+        real_fetch = np.zeros(n, dtype=bool)
+        real_fetch[fetch_idx[~converted]] = True
+
+        is_port = (type_code == TYPE_CODE[Type.IN_PORT]) | (type_code == TYPE_CODE[Type.OUT_PORT])
+        port_addr = addr & 0xFF
+        addr = np.where(is_port, port_addr, addr)
+        valid_port = is_port & _VALID_PORT[port_addr]
+        cols.port[valid_port] = port_addr[valid_port]
+        cols.val = val.astype(np.uint32)
+        invalid_port = is_port & ~valid_port
+        for o, port in zip(cols.offset[invalid_port].tolist(), port_addr[invalid_port].tolist(), strict=True):
+            errors.append((o, f"Invalid port at offset {o}: {hex(port)}"))
+
+        # rom bank in effect for each record, set by the latest ROM_BANK/ROM_EX_BANK access
+        rom_bank = rom_banks(cols, self.rom_bank)
+
+        memory = real_fetch | (type_code == TYPE_CODE[Type.READ]) | (type_code == TYPE_CODE[Type.WRITE])
+        banked = memory & (addr >= BANK_ADDR_START)
+        if (banked & (rom_bank == NO_BANK)).any():
+            raise ValueError("rom_bank is None when trying to calculate full address for banked memory")
+        addr = np.where(banked, addr + BANK_SIZE * (rom_bank - 1), addr)
+        cols.bank[memory & (addr >= ROM_ADDR_START) & ~banked] = 0
+        cols.bank[banked] = rom_bank[banked]
+
+        stack = memory & ~real_fetch & (addr < ROM_ADDR_START) & (addr > ROM_ADDR_START - STACK_SIZE)
+        read_stack = stack & (type_code == TYPE_CODE[Type.READ])
+        write_stack = stack & (type_code == TYPE_CODE[Type.WRITE])
+        type_code[read_stack] = TYPE_CODE[Type.READ_STACK]
+        type_code[write_stack] = TYPE_CODE[Type.WRITE_STACK]
+
+        initial_pc = NO_PC if self.pc is None else self.pc
+        pc = _forward_fill(real_fetch, addr, initial_pc)
+
+        instr = np.where(real_fetch, _OPCODE_INSTR[b1 & 0xFF], NO_INSTR).astype(np.uint8)
+        # a stack access within the instruction resolves a conditional CALL/RET as taken
+        instruction_id = np.cumsum(real_fetch) - 1
+        owner = np.flatnonzero(real_fetch)
+        for accesses, conditional, taken in (
+            (read_stack, InstructionType.RET_CONDITIONAL, InstructionType.RET),
+            (write_stack, InstructionType.CALL_CONDITIONAL, InstructionType.CALL),
+        ):
+            has_access = np.zeros(len(owner), dtype=bool)
+            ids = instruction_id[accesses]
+            has_access[ids[ids >= 0]] = True
+            heads = owner[has_access]
+            heads = heads[instr[heads] == conditional.value]
+            instr[heads] = taken.value
+
+        cols.type = type_code
+        cols.addr = addr.astype(np.uint32)
+        cols.pc = pc.astype(np.uint32)
+        cols.instr = instr
+
+        if len(owner):
+            self.pc = int(addr[owner[-1]])
+        if rom_bank[-1] != NO_BANK:
+            self.rom_bank = int(rom_bank[-1])
+
+        errors.sort(key=lambda error: error[0])
+        return cols, errors, end
+
+
+def iter_decode(parser: BatchBusParser, data, chunk_size: int = 1 << 26) -> Iterator[tuple[EventColumns, list[str]]]:
+    """Decode a large buffer (e.g. a ``numpy.memmap``) piece by piece.
+
+    Each piece ends right before its last real FETCH and the next one starts
+    there, so instruction state never straddles two ``decode`` calls and the
+    concatenated output equals ``parser.parse(data)``.
+    """
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    size = len(raw)
+    base = 0
+    stop = min(chunk_size, size)
+    while True:
+        rom_bank, pc = parser.rom_bank, parser.pc
+        columns, errors, end = parser.decode(raw[base:stop], base)
+
+        if stop == size:
+            messages = [message for _, message in errors]
+            if base + end != size:
+                messages.append("Trailing data")
+            yield columns, messages
+            return
+
+        fetches = np.flatnonzero(columns.type == TYPE_CODE[Type.FETCH])
+        if len(fetches) == 0 or fetches[-1] == 0:
+            # no instruction boundary to cut at, retry with a bigger piece
+            parser.rom_bank, parser.pc = rom_bank, pc
+            stop = min(stop + chunk_size, size)
+            continue
+
+        cut = int(fetches[-1])
+        next_base = int(columns.offset[cut])
+        kept = columns[:cut]
+        bank = rom_banks(kept, rom_bank)[-1]
+        parser.rom_bank = None if bank == NO_BANK else int(bank)
+        parser.pc = None if kept.pc[-1] == NO_PC else int(kept.pc[-1])
+        yield kept, [message for offset, message in errors if offset < next_base]
+
+        base = next_base
+        stop = min(base + chunk_size, size)
@@ -359,7 +359,7 @@ class BusParser(BaseBusParser):
 
 
 class PipelineBusParser(BaseBusParser):
-    def __init__(self, errors_queue, out_ports_queue, save_all_events=False):
+    def __init__(self, errors_queue, out_ports_queue, save_all_events=False, all_events=None):
         super().__init__()
         self.save_all_events = save_all_events
         self.status_num_errors = 0
@@ -374,22 +374,27 @@ class PipelineBusParser(BaseBusParser):
         self.pc = None
         self.errors = []
 
-        self.all_events = []
+        # any list-like sink works, e.g. z80bus.event_store.EventStore
+        self.all_events = all_events if all_events is not None else []
         # buffer for the current instruction
         self.buf = []
 
     def stats(self):
-        return {
+        stats = {
             "len_all_events": len(self.all_events),
             "num_out_ports": self.status_num_out_ports,
             "num_errors": self.status_num_errors,
         }
+        # z80bus.shm_ring.PortEventRing reports back-pressure and overflow counters
+        if hasattr(self.out_ports_queue, "stats"):
+            stats["out_ports_ring"] = self.out_ports_queue.stats()
+        return stats
 
     def flush(self):
-        for e in self.buf:
-            if self.save_all_events:
-                self.all_events.append(e)
+        if self.save_all_events:
+            self.all_events.extend(self.buf)
 
+        for e in self.buf:
             if e.type in [Type.IN_PORT, Type.OUT_PORT]:
                 self.status_num_out_ports += 1
                 if self.out_ports_queue is not None:
@@ -398,7 +403,8 @@ class PipelineBusParser(BaseBusParser):
 
         for e in self.errors:
             self.status_num_errors += 1
-            self.errors_queue.put(e)
+            if self.errors_queue is not None:
+                self.errors_queue.put(e)
         self.errors = []
 
         self._instruction_state.reset_conditionals()
@@ -466,11 +472,28 @@ def parse_data_thread(
             "num_empty_queue": status_num_empty_queue,
         }
     )
+    if hasattr(input_queue, "stats"):
+        status["input_ring"] = input_queue.stats()
     status_queue.put(status)
 
 
 class ParseContext:
-    def __init__(self, input_queue, all_events_output, errors_output, ports_output):
+    """Runs ``parse_data_thread`` in its own process.
+
+    Without an ``input_queue`` the raw FT600 data goes through a
+    ``ShmRingBuffer`` the context creates and closes on exit
+    (``self.input_queue``). Pass a ``z80bus.shm_ring.PortEventRing`` as
+    ``ports_output`` to hand port events to ``DrawLCDContext`` the same way;
+    ``None`` outputs are skipped.
+    """
+
+    def __init__(self, input_queue=None, all_events_output=None, errors_output=None, ports_output=None):
+        # shm_ring imports this module
+        from z80bus.shm_ring import ShmRingBuffer
+
+        self._owned_input = input_queue is None
+        if input_queue is None:
+            input_queue = ShmRingBuffer.create()
         self.input_queue = input_queue
         self.all_events_output = all_events_output
         self.errors_output = errors_output
@@ -508,6 +531,8 @@ class ParseContext:
         print(f"ParseContext: exit2 {datetime.datetime.now()}")
         print(self.status_queue.get())
 
-        self.all_events_output.put(None)
-        self.errors_output.put(None)
-        self.ports_output.put(None)
+        for output in (self.all_events_output, self.errors_output, self.ports_output):
+            if output is not None:
+                output.put(None)
+        if self._owned_input:
+            self.input_queue.close()
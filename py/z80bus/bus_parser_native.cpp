@@ -0,0 +1,383 @@
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <cstdint>
+#include <new>
+#include <vector>
+
+// Mirrors BaseBusParser._create_event and BatchBusParser.decode, see bus_parser.py.
+
+namespace {
+
+constexpr std::uint32_t kRomAddrStart = 0x8000;
+constexpr std::uint32_t kBankAddrStart = 0xC000;
+constexpr std::uint32_t kBankSize = 0x4000;
+constexpr std::uint32_t kStackSize = 0x400;
+
+constexpr std::uint32_t kNoPc = 0xFFFFFFFF;
+constexpr std::int16_t kNoBank = -1;
+constexpr std::int16_t kNoPort = -1;
+
+// InstructionType values
+constexpr std::uint8_t kNoInstr = 0;
+constexpr std::uint8_t kCall = 1;
+constexpr std::uint8_t kCallConditional = 2;
+constexpr std::uint8_t kRet = 3;
+constexpr std::uint8_t kRetConditional = 4;
+constexpr std::uint8_t kMultiPrefix = 5;
+
+constexpr int kErrorInvalidType = 0;
+constexpr int kErrorInvalidPort = 1;
+
+bool is_valid_type(unsigned char c) {
+    switch (c) {
+        case 'M':
+        case 'R':
+        case 'W':
+        case 'r':
+        case 'w':
+        case 'E':
+        case 'S':
+        case 's':
+            return true;
+        default:
+            return false;
+    }
+}
+
+bool is_valid_port(std::uint32_t port) {
+    switch (port) {
+        case 0x10: case 0x11: case 0x12: case 0x13: case 0x14: case 0x15: case 0x16: case 0x17:
+        case 0x18: case 0x19: case 0x1A: case 0x1B: case 0x1C: case 0x1D: case 0x1E: case 0x1F:
+        case 0x40: case 0x41:
+        case 0x60: case 0x61: case 0x62: case 0x63: case 0x64: case 0x65: case 0x66: case 0x67:
+        case 0x68: case 0x69: case 0x6B: case 0x6C: case 0x6D: case 0x6E: case 0x6F:
+            return true;
+        default:
+            return false;
+    }
+}
+
+std::uint8_t classify_opcode(std::uint32_t opcode) {
+    switch (opcode) {
+        case 0xCB: case 0xDD: case 0xED: case 0xFD:
+            return kMultiPrefix;
+        case 0xCD:
+            return kCall;
+        case 0xC4: case 0xCC: case 0xD4: case 0xDC: case 0xE4: case 0xEC: case 0xF4: case 0xFC:
+            return kCallConditional;
+        case 0xC9:
+            return kRet;
+        case 0xC0: case 0xC8: case 0xD0: case 0xD8: case 0xE0: case 0xE8: case 0xF0: case 0xF8:
+            return kRetConditional;
+        default:
+            return kNoInstr;
+    }
+}
+
+struct Output {
+    std::int64_t* offset;
+    std::uint8_t* type;
+    std::uint32_t* val;
+    std::uint32_t* addr;
+    std::uint32_t* pc;
+    std::int16_t* bank;
+    std::int16_t* port;
+    std::uint8_t* instr;
+};
+
+// collected while the GIL is released, turned into Python tuples afterwards
+struct DecodeError {
+    Py_ssize_t offset;
+    int kind;
+    unsigned long value;
+};
+
+PyObject* errors_to_list(const std::vector<DecodeError>& decode_errors) {
+    PyObject* errors = PyList_New(static_cast<Py_ssize_t>(decode_errors.size()));
+    if (errors == nullptr) {
+        return nullptr;
+    }
+    for (std::size_t i = 0; i < decode_errors.size(); ++i) {
+        const DecodeError& e = decode_errors[i];
+        PyObject* error = Py_BuildValue("(nik)", e.offset, e.kind, e.value);
+        if (error == nullptr) {
+            Py_DECREF(errors);
+            return nullptr;
+        }
+        PyList_SET_ITEM(errors, static_cast<Py_ssize_t>(i), error);
+    }
+    return errors;
+}
+
+}  // namespace
+
+static PyObject* decode_records(PyObject* /* self */, PyObject* args, PyObject* kwargs) {
+    Py_buffer data = {};
+    Py_buffer columns[8] = {};
+    Py_ssize_t base_offset = 0;
+    long rom_bank = -1;
+    long long pc = -1;
+    static const char* kwlist[] = {
+        "data", "offset", "type", "val", "addr", "pc", "bank", "port", "instr",
+        "base_offset", "rom_bank", "initial_pc", nullptr,
+    };
+
+    if (!PyArg_ParseTupleAndKeywords(
+            args,
+            kwargs,
+            "y*w*w*w*w*w*w*w*w*|nlL:decode_records",
+            const_cast<char**>(kwlist),
+            &data,
+            &columns[0],
+            &columns[1],
+            &columns[2],
+            &columns[3],
+            &columns[4],
+            &columns[5],
+            &columns[6],
+            &columns[7],
+            &base_offset,
+            &rom_bank,
+            &pc)) {
+        return nullptr;
+    }
+
+    auto release = [&]() {
+        PyBuffer_Release(&data);
+        for (auto& column : columns) {
+            if (column.buf != nullptr) {
+                PyBuffer_Release(&column);
+            }
+        }
+    };
+
+    const Py_ssize_t size = data.len;
+    const Py_ssize_t capacity = size / 4;
+    const Py_ssize_t item_sizes[8] = {8, 1, 4, 4, 4, 2, 2, 1};
+    for (int i = 0; i < 8; ++i) {
+        if (columns[i].len < capacity * item_sizes[i]) {
+            release();
+            PyErr_SetString(PyExc_ValueError, "output columns are too small");
+            return nullptr;
+        }
+    }
+
+    Output out = {
+        static_cast<std::int64_t*>(columns[0].buf),
+        static_cast<std::uint8_t*>(columns[1].buf),
+        static_cast<std::uint32_t*>(columns[2].buf),
+        static_cast<std::uint32_t*>(columns[3].buf),
+        static_cast<std::uint32_t*>(columns[4].buf),
+        static_cast<std::int16_t*>(columns[5].buf),
+        static_cast<std::int16_t*>(columns[6].buf),
+        static_cast<std::uint8_t*>(columns[7].buf),
+    };
+
+    std::vector<DecodeError> decode_errors;
+    bool out_of_memory = false;
+
+    const auto* raw = static_cast<const unsigned char*>(data.buf);
+    bool prefix = false;
+    Py_ssize_t last_call_conditional = -1;
+    Py_ssize_t last_ret_conditional = -1;
+    Py_ssize_t count = 0;
+    Py_ssize_t offset = 0;
+    bool banked_without_rom_bank = false;
+
+    // only plain memory is touched below, the buffers stay exported until release()
+    Py_BEGIN_ALLOW_THREADS
+    try {
+        while (offset + 4 <= size) {
+            const unsigned char type = raw[offset];
+            if (!is_valid_type(type)) {
+                decode_errors.push_back({base_offset + offset, kErrorInvalidType, type});
+                offset += 1;
+                continue;
+            }
+
+            const std::uint32_t b1 = raw[offset + 1];
+            const std::uint32_t b2 = raw[offset + 2];
+            const std::uint32_t b3 = raw[offset + 3];
+            const Py_ssize_t i = count;
+            out.offset[i] = base_offset + offset;
+            offset += 4;
+
+            unsigned char event_type = type;
+            std::uint32_t val = b1;
+            std::uint32_t addr = b2 | (b3 << 8);
+            std::int16_t bank = kNoBank;
+            std::int16_t port = kNoPort;
+            std::uint8_t instr = kNoInstr;
+
+            if (event_type == 'E') {
+                val = b1 | (b2 << 8) | (b3 << 16);
+                addr = 0;
+            }
+
+            if (prefix && event_type == 'M') {
+                event_type = 'R';
+                prefix = false;
+            }
+
+            const bool memory = event_type == 'M' || event_type == 'R' || event_type == 'W';
+            if (memory) {
+                if (addr >= kBankAddrStart) {
+                    if (rom_bank < 0) {
+                        banked_without_rom_bank = true;
+                        break;
+                    }
+                    addr = addr + kBankSize * static_cast<std::uint32_t>(rom_bank - 1);
+                    bank = static_cast<std::int16_t>(rom_bank);
+                } else if (addr >= kRomAddrStart) {
+                    bank = 0;
+                }
+            }
+
+            if (event_type == 'M') {
+                prefix = false;
+                last_call_conditional = -1;
+                last_ret_conditional = -1;
+                pc = addr;
+                instr = classify_opcode(val);
+                if (instr == kMultiPrefix) {
+                    prefix = true;
+                } else if (instr == kCallConditional) {
+                    last_call_conditional = i;
+                } else if (instr == kRetConditional) {
+                    last_ret_conditional = i;
+                }
+            } else if (memory) {
+                if (addr < kRomAddrStart && addr > kRomAddrStart - kStackSize) {
+                    if (event_type == 'R') {
+                        event_type = 'S';
+                        if (last_ret_conditional >= 0) {
+                            out.instr[last_ret_conditional] = kRet;
+                        }
+                    } else {
+                        event_type = 's';
+                        if (last_call_conditional >= 0) {
+                            out.instr[last_call_conditional] = kCall;
+                        }
+                    }
+                }
+            } else if (event_type == 'r' || event_type == 'w') {
+                addr &= 0xFF;
+                if (is_valid_port(addr)) {
+                    port = static_cast<std::int16_t>(addr);
+                    if (addr == 0x69) {
+                        rom_bank = static_cast<long>(val);
+                    } else if (addr == 0x19) {
+                        rom_bank = static_cast<long>(val & 0x0F);
+                    }
+                } else {
+                    decode_errors.push_back({out.offset[i], kErrorInvalidPort, addr});
+                }
+            }
+
+            out.type[i] = event_type;
+            out.val[i] = val;
+            out.addr[i] = addr;
+            out.pc[i] = pc < 0 ? kNoPc : static_cast<std::uint32_t>(pc);
+            out.bank[i] = bank;
+            out.port[i] = port;
+            out.instr[i] = instr;
+            count += 1;
+        }
+    } catch (const std::bad_alloc&) {
+        out_of_memory = true;
+    }
+    Py_END_ALLOW_THREADS
+
+    release();
+    if (out_of_memory) {
+        return PyErr_NoMemory();
+    }
+    if (banked_without_rom_bank) {
+        PyErr_SetString(
+            PyExc_ValueError, "rom_bank is None when trying to calculate full address for banked memory");
+        return nullptr;
+    }
+
+    PyObject* errors = errors_to_list(decode_errors);
+    if (errors == nullptr) {
+        return nullptr;
+    }
+    return Py_BuildValue("(nnlLN)", count, offset, rom_bank, pc, errors);
+}
+
+// Ordered access to the u64 counters of z80bus.shm_ring, which are shared
+// between processes: a store-release of the head/tail index publishes the data
+// written before it to the process that load-acquires the index.
+
+static std::uint64_t* header_word(Py_buffer* header, Py_ssize_t index) {
+    if (index < 0 || (index + 1) * static_cast<Py_ssize_t>(sizeof(std::uint64_t)) > header->len) {
+        PyErr_SetString(PyExc_IndexError, "header index out of range");
+        return nullptr;
+    }
+    return static_cast<std::uint64_t*>(header->buf) + index;
+}
+
+static PyObject* load_acquire(PyObject* /* self */, PyObject* args) {
+    Py_buffer header = {};
+    Py_ssize_t index = 0;
+    if (!PyArg_ParseTuple(args, "w*n:load_acquire", &header, &index)) {
+        return nullptr;
+    }
+    std::uint64_t* word = header_word(&header, index);
+    const std::uint64_t value = word != nullptr ? __atomic_load_n(word, __ATOMIC_ACQUIRE) : 0;
+    PyBuffer_Release(&header);
+    return word != nullptr ? PyLong_FromUnsignedLongLong(value) : nullptr;
+}
+
+static PyObject* store_release(PyObject* /* self */, PyObject* args) {
+    Py_buffer header = {};
+    Py_ssize_t index = 0;
+    unsigned long long value = 0;
+    if (!PyArg_ParseTuple(args, "w*nK:store_release", &header, &index, &value)) {
+        return nullptr;
+    }
+    std::uint64_t* word = header_word(&header, index);
+    if (word != nullptr) {
+        __atomic_store_n(word, static_cast<std::uint64_t>(value), __ATOMIC_RELEASE);
+    }
+    PyBuffer_Release(&header);
+    if (word == nullptr) {
+        return nullptr;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef module_methods[] = {
+    {
+        "decode_records",
+        reinterpret_cast<PyCFunction>(decode_records),
+        METH_VARARGS | METH_KEYWORDS,
+        "Decode Z80 bus records into preallocated event columns.",
+    },
+    {
+        "load_acquire",
+        load_acquire,
+        METH_VARARGS,
+        "Load a u64 word of a writable buffer with acquire ordering.",
+    },
+    {
+        "store_release",
+        store_release,
+        METH_VARARGS,
+        "Store a u64 word of a writable buffer with release ordering.",
+    },
+    {nullptr, nullptr, 0, nullptr},
+};
+
+static struct PyModuleDef module_def = {
+    PyModuleDef_HEAD_INIT,
+    "bus_parser_native",
+    "Native decoder for the PC-G850 Z80 bus record stream",
+    -1,
+    module_methods,
+};
+
+PyMODINIT_FUNC PyInit_bus_parser_native(void) {
+    return PyModule_Create(&module_def);
+}
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import time
+from collections.abc import Iterator
+from types import TracebackType
+from typing import Any
+
+import numpy as np
+
+from z80bus.batch_parser import BatchBusParser, EventColumns, iter_decode
+from z80bus.capture_index import DEFAULT_INTERVAL, CheckpointIndex
+from z80bus.event_store import EventStore
+
+# Layout: MAGIC, little-endian u32 JSON header length, JSON header, zero padding up
+# to HEADER_SIZE, then the raw 4-byte bus records exactly as received from the FT600.
+MAGIC = b"G850BUS\x01"
+HEADER_SIZE = 4096
+VERSION = 1
+
+
+def _encode_header(header: dict[str, Any]) -> bytes:
+    payload = json.dumps(header, sort_keys=True).encode()
+    if len(MAGIC) + 4 + len(payload) > HEADER_SIZE:
+        raise ValueError("Capture header does not fit, reduce metadata")
+    encoded = MAGIC + len(payload).to_bytes(4, "little") + payload
+    return encoded + bytes(HEADER_SIZE - len(encoded))
+
+
+def _decode_header(raw: bytes) -> dict[str, Any]:
+    if len(raw) < HEADER_SIZE or raw[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not a bus capture file")
+    size = int.from_bytes(raw[len(MAGIC) : len(MAGIC) + 4], "little")
+    return json.loads(raw[len(MAGIC) + 4 : len(MAGIC) + 4 + size])
+
+
+class CaptureWriter:
+    """Append raw bus data to a capture file.
+
+    ``write`` goes straight to an unbuffered file so it keeps up with the
+    FT600 read loop; statistics are kept in memory and the header is
+    rewritten on ``close``. The header written at open time already makes
+    the file readable if the capture is interrupted.
+    """
+
+    def __init__(self, path: str | os.PathLike, metadata: dict[str, Any] | None = None, rom_bank: int | None = None):
+        self.path = os.fspath(path)
+        self.metadata = dict(metadata or {})
+        self.rom_bank = rom_bank
+        self.created = datetime.datetime.now().isoformat()
+
+        self.num_bytes = 0
+        self.num_chunks = 0
+        self.start_time: float | None = None
+        self.last_time: float | None = None
+        self.peak_bytes_per_sec = 0.0
+        self._window_start = 0.0
+        self._window_bytes = 0
+
+        self._file = open(self.path, "wb", buffering=0)
+        self._file.write(_encode_header(self.header(complete=False)))
+
+    def header(self, complete: bool = True) -> dict[str, Any]:
+        duration = 0.0
+        if self.start_time is not None and self.last_time is not None:
+            duration = self.last_time - self.start_time
+        return {
+            "version": VERSION,
+            "created": self.created,
+            "complete": complete,
+            "metadata": self.metadata,
+            "rom_bank": self.rom_bank,
+            "num_bytes": self.num_bytes,
+            "num_chunks": self.num_chunks,
+            "duration_sec": duration,
+            "bytes_per_sec": self.num_bytes / duration if duration > 0 else 0.0,
+            "peak_bytes_per_sec": self.peak_bytes_per_sec,
+        }
+
+    def write(self, data) -> None:
+        now = time.monotonic()
+        if self.start_time is None:
+            self.start_time = now
+            self._window_start = now
+        self.last_time = now
+
+        view = memoryview(data).cast("B")
+        while len(view):
+            written = self._file.write(view)
+            view = view[written:]
+
+        size = memoryview(data).nbytes
+        self.num_bytes += size
+        self.num_chunks += 1
+
+        self._window_bytes += size
+        elapsed = now - self._window_start
+        if elapsed > 1:
+            self.peak_bytes_per_sec = max(self.peak_bytes_per_sec, self._window_bytes / elapsed)
+            self._window_start = now
+            self._window_bytes = 0
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(_encode_header(self.header()))
+        self._file.close()
+
+    def __enter__(self) -> CaptureWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class CaptureReader:
+    """Read a capture file without loading it into memory.
+
+    ``data`` is a read-only ``numpy.memmap`` over the raw records. The data
+    length comes from the file size, so interrupted captures are readable too.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        self._index: CheckpointIndex | None = None
+        with open(self.path, "rb") as f:
+            self.header = _decode_header(f.read(HEADER_SIZE))
+
+        size = os.path.getsize(self.path) - HEADER_SIZE
+        if size > 0:
+            self.data = np.memmap(self.path, dtype=np.uint8, mode="r", offset=HEADER_SIZE, shape=(size,))
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self.header["metadata"]
+
+    @property
+    def rom_bank(self) -> int | None:
+        return self.header["rom_bank"]
+
+    def parser(self) -> BatchBusParser:
+        parser = BatchBusParser()
+        # same assumption as PipelineBusParser when the starting bank wasn't recorded
+        parser.rom_bank = self.rom_bank if self.rom_bank is not None else 0
+        return parser
+
+    def iter_events(self, chunk_size: int = 1 << 26) -> Iterator[tuple[EventColumns, list[str]]]:
+        return iter_decode(self.parser(), self.data, chunk_size)
+
+    def events(self, chunk_size: int = 1 << 26) -> tuple[EventStore, list[str]]:
+        store = EventStore(capacity=len(self.data) // 4)
+        errors = []
+        for columns, chunk_errors in self.iter_events(chunk_size):
+            store.extend(columns)
+            errors.extend(chunk_errors)
+        return store, errors
+
+    def index(self, interval: int = DEFAULT_INTERVAL) -> CheckpointIndex:
+        """Checkpoint index, cached next to the capture as ``<path>.idx.npz``."""
+
+        if self._index is not None and self._index.interval == interval:
+            return self._index
+
+        index_path = self.path + ".idx.npz"
+        if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(self.path):
+            index = CheckpointIndex.load(index_path)
+            if index.interval != interval:
+                index = None
+        else:
+            index = None
+
+        if index is None:
+            index = CheckpointIndex.build(self.data, interval, self.parser().rom_bank)
+            index.save(index_path)
+        self._index = index
+        return index
+
+    def window(self, start: int, count: int) -> tuple[EventColumns, list[str]]:
+        """Decode ``count`` events starting at event number ``start``."""
+        return self.index().decode_window(self.data, start, count)
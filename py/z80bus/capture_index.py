@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from z80bus.batch_parser import NO_BANK, TYPE_CODE, BatchBusParser, EventColumns, iter_decode, rom_banks
+from z80bus.bus_parser import Type
+
+DEFAULT_INTERVAL = 4096
+
+
+@dataclass
+class Checkpoint:
+    event_index: int
+    offset: int  # byte offset of the record in the capture
+    rom_bank: int | None
+
+
+class CheckpointIndex:
+    """Sparse index of instruction boundaries in a capture.
+
+    Every ``interval`` real FETCH events the event index, byte offset and ROM
+    bank are recorded. A real FETCH resets ``InstructionState`` and sets
+    ``pc``, so the ROM bank is the only parser state needed to resume
+    decoding there. The first checkpoint is always the start of the capture.
+    """
+
+    def __init__(
+        self,
+        event_index: np.ndarray,
+        offset: np.ndarray,
+        rom_bank: np.ndarray,
+        num_events: int,
+        interval: int = DEFAULT_INTERVAL,
+    ):
+        self.event_index = event_index
+        self.offset = offset
+        self.rom_bank = rom_bank
+        self.num_events = num_events
+        self.interval = interval
+
+    def __len__(self) -> int:
+        return len(self.event_index)
+
+    @classmethod
+    def build(
+        cls,
+        data,
+        interval: int = DEFAULT_INTERVAL,
+        rom_bank: int | None = None,
+        chunk_size: int = 1 << 26,
+    ) -> CheckpointIndex:
+        """Index ``data`` by decoding it once with ``BatchBusParser``."""
+
+        current_bank = NO_BANK if rom_bank is None else rom_bank
+        event_index = [np.zeros(1, dtype=np.int64)]
+        offset = [np.zeros(1, dtype=np.int64)]
+        banks = [np.array([current_bank], dtype=np.int16)]
+
+        parser = BatchBusParser()
+        parser.rom_bank = rom_bank
+        num_events = 0
+        num_fetches = 0
+        for columns, _errors in iter_decode(parser, data, chunk_size):
+            fetches = np.flatnonzero(columns.type == TYPE_CODE[Type.FETCH])
+            # fetches are numbered across the whole capture, keep every interval-th one
+            selected = fetches[(num_fetches + np.arange(len(fetches))) % interval == 0]
+            selected = selected[selected + num_events > 0]
+            bank = rom_banks(columns, None if current_bank == NO_BANK else current_bank)
+
+            event_index.append(selected + num_events)
+            offset.append(columns.offset[selected])
+            banks.append(bank[selected].astype(np.int16))
+
+            if len(columns):
+                current_bank = int(bank[-1])
+            num_events += len(columns)
+            num_fetches += len(fetches)
+
+        return cls(np.concatenate(event_index), np.concatenate(offset), np.concatenate(banks), num_events, interval)
+
+    def checkpoint(self, i: int) -> Checkpoint:
+        bank = int(self.rom_bank[i])
+        return Checkpoint(
+            event_index=int(self.event_index[i]),
+            offset=int(self.offset[i]),
+            rom_bank=None if bank == NO_BANK else bank,
+        )
+
+    def find(self, event_index: int) -> int:
+        """Number of the last checkpoint at or before ``event_index``."""
+        return int(np.searchsorted(self.event_index, event_index, side="right")) - 1
+
+    def decode_window(self, data, start: int, count: int) -> tuple[EventColumns, list[str]]:
+        """Decode events ``start:start + count``, reading only the checkpoint intervals that cover them.
+
+        Only the parse errors at or after the window's first event and before
+        the event following it are returned.
+        """
+
+        start = max(0, min(start, self.num_events))
+        stop = max(start, min(start + count, self.num_events))
+
+        first = self.checkpoint(self.find(start))
+        last = self.find(max(stop - 1, start)) + 1
+        end_offset = int(self.offset[last]) if last < len(self) else len(data)
+
+        parser = BatchBusParser()
+        parser.rom_bank = first.rom_bank
+        # invalid bytes right before the next checkpoint only show up as errors
+        # with the start of its event behind them, 3 bytes can't decode to an event
+        decode_end = min(end_offset + 3, len(data))
+        columns, errors, end = parser.decode(data[first.offset : decode_end], first.offset)
+
+        skip = start - first.event_index
+        after = skip + stop - start
+        if start == stop:
+            return columns[skip:after], []
+        # an error belongs to the window of the last event before it (invalid
+        # bytes before the first event to the first window), so consecutive
+        # windows report every error once
+        lo = 0 if start == 0 else int(columns.offset[skip])
+        hi = int(columns.offset[after]) if after < len(columns) else end_offset
+        if stop == self.num_events:
+            hi = len(data)
+        messages = [message for offset, message in errors if lo <= offset < hi]
+        if stop == self.num_events and first.offset + end != len(data):
+            messages.append("Trailing data")
+
+        return columns[skip:after], messages
+
+    def save(self, path: str | os.PathLike) -> None:
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                event_index=self.event_index,
+                offset=self.offset,
+                rom_bank=self.rom_bank,
+                num_events=self.num_events,
+                interval=self.interval,
+            )
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> CheckpointIndex:
+        with np.load(path) as f:
+            return cls(
+                f["event_index"],
+                f["offset"],
+                f["rom_bank"],
+                int(f["num_events"]),
+                int(f["interval"]),
+            )
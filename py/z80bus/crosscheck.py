@@ -0,0 +1,312 @@
+"""Cross-check a bus capture against a Z80 emulator.
+
+Each instruction is replayed on the emulator with the reads seen on the bus,
+then its writes, port writes and the next fetched address are compared with
+the capture. Emulating every instruction is slow, but captures are dominated
+by loops that run with the same registers and the same bus inputs (key
+polling, waiting for the LCD), so results are memoized per instruction,
+keyed by ``(pc, bank, opcode bytes)`` and then by the register state and
+observed inputs. The register part of the key leaves out R, WZ and clock
+counters, which tick on every instruction without changing what it does; on
+a hit R and the clocks are advanced by as much as the memoized run advanced
+them. While instructions hit the memo the emulator isn't touched at all, its
+registers are only restored when the next miss has to run.
+
+The emulator is anything implementing ``Z80Core``. ``Pyz80Core`` wraps the
+pybind11 module in ``shared/pyz80``, which must be built separately.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import NoReturn, Protocol
+
+from z80bus.bus_parser import BANK_ADDR_START, BANK_SIZE, ROM_ADDR_START, STACK_SIZE, Event, IOPort, Type
+
+# after we get out of bootrom this is where the execution is expected to start
+START_ADDR = 0xC000
+HALT = 0x76
+# distinct (registers, inputs) combinations remembered per instruction
+MAX_MEMO_ENTRIES = 64
+# LD A,R and LD R,A move data between R and A, so R matters to them
+UNMEMOIZED_OPCODES = ((0xED, 0x5F), (0xED, 0x4F))
+
+
+class Z80Core(Protocol):
+    def state(self) -> Hashable:
+        """All registers, including PC."""
+
+    def set_state(self, state: Hashable) -> None: ...
+
+    def memo_key(self, state: Hashable) -> Hashable:
+        """``state`` without R, WZ and clock counters."""
+
+    def replay(self, state: Hashable, before: Hashable, after: Hashable) -> Hashable:
+        """``after`` with R and clock counters advanced from ``state`` as far as they went from ``before``."""
+
+    def pc(self) -> int: ...
+
+    def execute(
+        self,
+        pc: int,
+        read_byte: Callable[[int], int],
+        write_byte: Callable[[int, int], None],
+        in_port: Callable[[int], int],
+        out_port: Callable[[int, int], None],
+    ) -> None:
+        """Run the single instruction at ``pc``, doing all bus access through the callbacks."""
+
+
+def _outside_execute(*args: int) -> NoReturn:
+    raise RuntimeError("bus access outside of Z80Core.execute")
+
+
+class Pyz80Core:
+    def __init__(self):
+        import pyz80  # ty: ignore[unresolved-import]
+
+        # the bus callbacks of the instruction being executed
+        self._read_byte: Callable[[int], int] = _outside_execute
+        self._write_byte: Callable[[int, int], None] = _outside_execute
+        self._in_port: Callable[[int], int] = _outside_execute
+        self._out_port: Callable[[int, int], None] = _outside_execute
+        self.z80 = pyz80.Z80(
+            lambda addr: self._read_byte(addr),
+            lambda addr, value: self._write_byte(addr, value),
+            lambda port: self._in_port(port),
+            lambda port, value: self._out_port(port, value),
+            returnPortAs16Bits=False,
+        )
+
+    def state(self) -> bytes:
+        return self.z80.state()
+
+    def set_state(self, state: bytes) -> None:
+        self.z80.set_state(state)
+
+    def memo_key(self, state: bytes) -> bytes:
+        return self.z80.memo_key(state)
+
+    def replay(self, state: bytes, before: bytes, after: bytes) -> bytes:
+        return self.z80.replay(state, before, after)
+
+    def pc(self) -> int:
+        return self.z80.PC
+
+    def execute(self, pc, read_byte, write_byte, in_port, out_port) -> None:
+        self._read_byte, self._write_byte, self._in_port, self._out_port = read_byte, write_byte, in_port, out_port
+        self.z80.PC = pc
+        self.z80.execute(1)
+
+
+@dataclass
+class Divergence:
+    index: int  # event index of the instruction's FETCH
+    pc: int
+    bank: int | None
+    kind: str  # "write", "io", "pc" or "error"
+    expected: object
+    actual: object
+
+    def __str__(self):
+        return f"{self.index} {hex(self.pc)} (rom_bank: {self.bank}) {self.kind}: expected {self.expected}, got {self.actual}"
+
+
+@dataclass
+class _Instruction:
+    index: int
+    pc: int
+    bank: int | None
+    reads: dict[int, int] = field(default_factory=dict)
+    writes: dict[int, int] = field(default_factory=dict)
+    io_reads: dict[int, int] = field(default_factory=dict)
+    io_writes: dict[int, int] = field(default_factory=dict)
+
+    def opcode(self) -> tuple[int, ...]:
+        # the fetched byte and the operands read right after it
+        code = []
+        addr = self.pc
+        while addr in self.reads and len(code) < 4:
+            code.append(self.reads[addr])
+            addr += 1
+        return tuple(code)
+
+
+def _cpu_addr(addr: int, bank: int | None) -> int:
+    # undo bus_parser.extend_address
+    if bank is None or bank == 0 or addr < BANK_ADDR_START:
+        return addr
+    return addr - BANK_SIZE * (bank - 1)
+
+
+class CrossChecker:
+    """Replay parsed events on ``core`` and collect every ``Divergence``.
+
+    Execution starts at the first fetch from ``start_addr`` (``None`` to
+    start right away); earlier events are bootrom code and are skipped.
+    ``rom_banks`` maps bank numbers to their bytes (bank 0 is the fixed ROM),
+    it provides bytes the emulator reads that weren't on the bus.
+    """
+
+    def __init__(
+        self,
+        core: Z80Core,
+        rom_banks: Mapping[int, bytes] | None = None,
+        start_addr: int | None = START_ADDR,
+        max_memo_entries: int = MAX_MEMO_ENTRIES,
+    ):
+        self.core = core
+        self.rom_banks = rom_banks
+        self.start_addr = start_addr
+        self.max_memo_entries = max_memo_entries
+        self.rom_bank = 0
+
+        self.index = -1
+        self.divergences: list[Divergence] = []
+        self.memo: dict[tuple, dict[tuple, tuple]] = {}
+        self.num_instructions = 0
+        self.num_executed = 0
+        self.num_memo_hits = 0
+
+        self._instruction: _Instruction | None = None
+        self._state = core.state()
+        # registers of the core lag behind self._state while instructions hit the memo
+        self._core_stale = False
+        self._writes: dict[int, int] = {}
+        self._io_writes: dict[int, int] = {}
+
+    def process(self, events: Iterable[Event]) -> None:
+        for e in events:
+            self.index += 1
+            # every bus event has an address, ports included
+            assert e.addr is not None
+            if e.type == Type.FETCH:
+                if self._instruction is None and self.start_addr is not None and e.addr != self.start_addr:
+                    continue
+                pc = _cpu_addr(e.addr, e.bank)
+                if self._instruction is not None:
+                    self._check(self._instruction, pc)
+                self._instruction = _Instruction(index=self.index, pc=pc, bank=self.rom_bank)
+                self._instruction.reads[pc] = e.val
+                continue
+
+            if e.type == Type.OUT_PORT:
+                if e.port == IOPort.ROM_BANK:
+                    self.rom_bank = e.val
+                elif e.port == IOPort.ROM_EX_BANK:
+                    self.rom_bank = e.val & 0x0F
+
+            instruction = self._instruction
+            if instruction is None:
+                continue
+            if e.type in (Type.READ, Type.READ_STACK):
+                instruction.reads[_cpu_addr(e.addr, e.bank)] = e.val
+            elif e.type in (Type.WRITE, Type.WRITE_STACK):
+                instruction.writes[_cpu_addr(e.addr, e.bank)] = e.val
+            elif e.type == Type.IN_PORT:
+                instruction.io_reads[e.addr & 0xFF] = e.val
+            elif e.type == Type.OUT_PORT:
+                instruction.io_writes[e.addr & 0xFF] = e.val
+
+    def check(self, events: Iterable[Event]) -> list[Divergence]:
+        """Check a whole capture. The last instruction has no next fetch and is not checked."""
+        self.process(events)
+        return self.divergences
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "instructions": self.num_instructions,
+            "executed": self.num_executed,
+            "memo_hits": self.num_memo_hits,
+            "memo_keys": len(self.memo),
+            "divergences": len(self.divergences),
+        }
+
+    def _check(self, instruction: _Instruction, next_pc: int) -> None:
+        self.num_instructions += 1
+        # bytes from outside the bus reads depend on the bank, so it's part of the key
+        opcode = instruction.opcode()
+        key = (instruction.pc, instruction.bank, opcode)
+        inputs = (
+            self.core.memo_key(self._state),
+            tuple(instruction.reads.items()),
+            tuple(instruction.io_reads.items()),
+        )
+        entries = self.memo.setdefault(key, {})
+
+        memoized = entries.get(inputs)
+        if memoized is None:
+            before = self._state
+            state, writes, io_writes, pc, error = self._execute(instruction)
+            if len(entries) < self.max_memo_entries and opcode[:2] not in UNMEMOIZED_OPCODES:
+                entries[inputs] = (before, state, writes, io_writes, pc, error)
+        else:
+            self.num_memo_hits += 1
+            self._core_stale = True
+            before, after, writes, io_writes, pc, error = memoized
+            state = self.core.replay(self._state, before, after)
+
+        self._state = state
+        if error is not None:
+            self._diverge(instruction, "error", None, error)
+        if writes != instruction.writes:
+            self._diverge(instruction, "write", instruction.writes, writes)
+        if io_writes != instruction.io_writes:
+            self._diverge(instruction, "io", instruction.io_writes, io_writes)
+        # don't try to execute HALT, as it'll prevent further analysis
+        if pc != next_pc and instruction.reads[instruction.pc] != HALT:
+            self._diverge(instruction, "pc", next_pc, pc)
+
+    def _execute(self, instruction: _Instruction) -> tuple:
+        self.num_executed += 1
+        if self._core_stale:
+            self.core.set_state(self._state)
+            self._core_stale = False
+
+        writes: dict[int, int] = {}
+        io_writes: dict[int, int] = {}
+        error = None
+        if instruction.reads[instruction.pc] != HALT:
+
+            def read_byte(addr):
+                value = instruction.reads.get(addr)
+                return self._rom_byte(addr, instruction.bank) if value is None else value
+
+            try:
+                self.core.execute(
+                    instruction.pc,
+                    read_byte,
+                    writes.__setitem__,
+                    lambda port: instruction.io_reads.get(port, 0),
+                    io_writes.__setitem__,
+                )
+            except RuntimeError as e:
+                error = str(e)
+        return self.core.state(), writes, io_writes, self.core.pc(), error
+
+    def _rom_byte(self, addr: int, bank: int | None) -> int:
+        if self.rom_banks is None:
+            return 0
+        # FIXME: why stack could become misaligned?
+        if ROM_ADDR_START - STACK_SIZE <= addr < ROM_ADDR_START:
+            return 0
+        if ROM_ADDR_START <= addr < BANK_ADDR_START:
+            rom = self.rom_banks.get(0)
+            return 0 if rom is None else rom[addr - ROM_ADDR_START]
+        if addr >= BANK_ADDR_START and bank is not None:
+            rom = self.rom_banks.get(bank)
+            return 0 if rom is None else rom[addr - BANK_ADDR_START]
+        return 0
+
+    def _diverge(self, instruction: _Instruction, kind: str, expected, actual) -> None:
+        self.divergences.append(
+            Divergence(
+                index=instruction.index,
+                pc=instruction.pc,
+                bank=instruction.bank,
+                kind=kind,
+                expected=expected,
+                actual=actual,
+            )
+        )
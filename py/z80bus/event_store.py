@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+
+import numpy as np
+import pandas
+
+from z80bus.batch_parser import NO_BANK, NO_INSTR, NO_PC, NO_PORT, TYPE_CODE, EventColumns
+from z80bus.bus_parser import Event, InstructionType, IOPort, Type
+
+# records appended as Event objects don't know where they came from in the capture
+NO_OFFSET = -1
+
+_COLUMN_NAMES = [f.name for f in fields(EventColumns)]
+
+_TYPE_CATEGORIES = list(Type)
+_TYPE_CATEGORY_CODE = np.full(256, -1, dtype=np.int8)
+_TYPE_CATEGORY_CODE[[TYPE_CODE[t] for t in _TYPE_CATEGORIES]] = np.arange(len(_TYPE_CATEGORIES))
+
+# IOPort has aliases (RAM_BANK == RAM_CE_MODE), iteration yields canonical members only
+_PORT_CATEGORIES = list(IOPort)
+_PORT_CATEGORY_CODE = np.full(256, -1, dtype=np.int8)
+_PORT_CATEGORY_CODE[[p.value for p in _PORT_CATEGORIES]] = np.arange(len(_PORT_CATEGORIES))
+
+_INSTR_CATEGORIES = list(InstructionType)
+_INSTR_CATEGORY_CODE = np.full(256, -1, dtype=np.int8)
+_INSTR_CATEGORY_CODE[[i.value for i in _INSTR_CATEGORIES]] = np.arange(len(_INSTR_CATEGORIES))
+
+# Event objects are materialized this many at a time when iterating
+_ITER_CHUNK = 4096
+
+
+class EventStore:
+    """Growable columnar storage for bus events.
+
+    Holds the same columns as ``EventColumns`` (roughly 20 bytes per event
+    instead of a few hundred for an ``Event`` instance) and can be used in
+    place of ``list[Event]``, e.g. as ``PipelineBusParser.all_events``.
+    Indexing with an int returns an ``Event``, slicing returns an
+    ``EventStore`` view that shares memory with the original.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._data = EventColumns.empty(max(capacity, 1))
+        self._len = 0
+
+    @classmethod
+    def from_columns(cls, columns: EventColumns) -> EventStore:
+        store = cls.__new__(cls)
+        store._data = columns
+        store._len = len(columns)
+        return store
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self._data, name).nbytes for name in _COLUMN_NAMES)
+
+    def columns(self) -> EventColumns:
+        """Views of the filled part of the store."""
+        return self._data[: self._len]
+
+    def _reserve(self, size: int) -> None:
+        if size <= self.capacity:
+            return
+        capacity = max(size, 2 * self.capacity)
+        grown = EventColumns.empty(capacity)
+        for name in _COLUMN_NAMES:
+            getattr(grown, name)[: self._len] = getattr(self._data, name)[: self._len]
+        self._data = grown
+
+    def append(self, event: Event, offset: int = NO_OFFSET) -> None:
+        self._reserve(self._len + 1)
+        i = self._len
+        data = self._data
+        data.offset[i] = offset
+        data.type[i] = TYPE_CODE[event.type]
+        data.val[i] = event.val
+        data.addr[i] = event.addr or 0
+        data.pc[i] = NO_PC if event.pc is None else event.pc
+        data.bank[i] = NO_BANK if event.bank is None else event.bank
+        data.port[i] = NO_PORT if event.port is None else event.port.value
+        data.instr[i] = NO_INSTR if event.instr is None else event.instr.value
+        self._len += 1
+
+    def extend(self, events: EventColumns | Iterable[Event]) -> None:
+        if not isinstance(events, EventColumns):
+            for e in events:
+                self.append(e)
+            return
+
+        self._reserve(self._len + len(events))
+        end = self._len + len(events)
+        for name in _COLUMN_NAMES:
+            getattr(self._data, name)[self._len : end] = getattr(events, name)
+        self._len = end
+
+    def clear(self) -> None:
+        self._len = 0
+
+    def _event_at(self, i: int) -> Event:
+        return self._data[i : i + 1].to_events()[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return EventStore.from_columns(self.columns()[key])
+        if key < 0:
+            key += self._len
+        if not 0 <= key < self._len:
+            raise IndexError("EventStore index out of range")
+        return self._event_at(key)
+
+    def __iter__(self) -> Iterator[Event]:
+        for start in range(0, self._len, _ITER_CHUNK):
+            yield from self._data[start : min(start + _ITER_CHUNK, self._len)].to_events()
+
+    def to_events(self) -> list[Event]:
+        return self.columns().to_events()
+
+    def mask(self, types: Iterable[Type] | None = None, ports: Iterable[IOPort] | None = None) -> np.ndarray:
+        cols = self.columns()
+        selected = np.ones(len(cols), dtype=bool)
+        if types is not None:
+            selected &= np.isin(cols.type, [TYPE_CODE[t] for t in types])
+        if ports is not None:
+            selected &= np.isin(cols.port, [p.value for p in ports])
+        return selected
+
+    def filter(self, types: Iterable[Type] | None = None, ports: Iterable[IOPort] | None = None) -> EventStore:
+        """Copy of the events matching any of ``types`` and any of ``ports``."""
+        return EventStore.from_columns(self.columns()[self.mask(types, ports)])
+
+    def to_dataframe(self, enums: bool = True, offset: bool = False) -> pandas.DataFrame:
+        """Export to pandas without copying the numeric columns.
+
+        With ``enums`` the type/port/instr columns are categoricals of the
+        ``Type``/``IOPort``/``InstructionType`` members, so code written for
+        ``pandas.DataFrame(list[Event])`` keeps working. Otherwise they hold
+        the raw codes (ASCII type byte, port number, ``NO_*`` sentinels).
+        ``pc`` and ``bank`` are nullable integer columns in both modes.
+        """
+
+        cols = self.columns()
+        data: dict[str, object] = {}
+        if offset:
+            data["offset"] = cols.offset
+        if enums:
+            data["type"] = pandas.Categorical.from_codes(_TYPE_CATEGORY_CODE[cols.type], _TYPE_CATEGORIES)
+        else:
+            data["type"] = cols.type
+        data["val"] = cols.val
+        data["addr"] = cols.addr
+        data["pc"] = pandas.arrays.IntegerArray(cols.pc, cols.pc == NO_PC)
+        data["bank"] = pandas.arrays.IntegerArray(cols.bank, cols.bank == NO_BANK)
+        if enums:
+            port_codes = np.where(cols.port == NO_PORT, -1, _PORT_CATEGORY_CODE[cols.port & 0xFF])
+            data["port"] = pandas.Categorical.from_codes(port_codes, _PORT_CATEGORIES)
+            data["instr"] = pandas.Categorical.from_codes(_INSTR_CATEGORY_CODE[cols.instr], _INSTR_CATEGORIES)
+        else:
+            data["port"] = cols.port
+            data["instr"] = cols.instr
+        return pandas.DataFrame(data, copy=False)
@@ -0,0 +1,89 @@
+"""Binary LCD frames for the ``/lcd/stream`` websocket.
+
+A frame is a header, the pressed-keys text and a VRAM payload::
+
+    magic    4s   b"LCDF"
+    sequence u32  DisplaySnapshot.generation
+    kind     u8   FRAME_KEY or FRAME_DELTA
+    pages    u8
+    columns  u16
+    keys_len u16  followed by the UTF-8 keys text
+
+A key frame carries all ``pages * columns`` VRAM bytes, page-major. A delta
+frame carries runs of changed bytes against the previous frame, each as
+``offset: u16, length: u16`` followed by the bytes. A delta is only sent
+when it is smaller than a key frame.
+"""
+
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+
+FRAME_MAGIC = b"LCDF"
+FRAME_KEY = 0
+FRAME_DELTA = 1
+
+_HEADER = struct.Struct("<4sIBBHH")
+_RUN = struct.Struct("<HH")
+
+
+def _changed_runs(previous: np.ndarray, current: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    changed = np.concatenate(([False], previous != current, [False]))
+    edges = np.flatnonzero(changed[1:] != changed[:-1])
+    return edges[::2], edges[1::2]
+
+
+def encode_frame(sequence: int, vram, keys: str, previous: np.ndarray | None = None) -> tuple[bytes, np.ndarray]:
+    """Encode VRAM (any ``(pages, columns)`` array-like), delta against ``previous`` when given.
+
+    Returns the frame and the VRAM array to pass as ``previous`` next time.
+    """
+
+    current = np.array(vram, dtype=np.uint8)
+    pages, columns = current.shape
+    flat = current.reshape(-1)
+
+    kind = FRAME_KEY
+    payload = flat.tobytes()
+    if previous is not None and previous.shape == current.shape:
+        starts, stops = _changed_runs(previous.reshape(-1), flat)
+        parts = []
+        for start, stop in zip(starts.tolist(), stops.tolist(), strict=True):
+            parts.append(_RUN.pack(start, stop - start))
+            parts.append(flat[start:stop].tobytes())
+        delta = b"".join(parts)
+        if len(delta) < len(payload):
+            kind = FRAME_DELTA
+            payload = delta
+
+    keys_bytes = keys.encode()
+    header = _HEADER.pack(FRAME_MAGIC, sequence & 0xFFFFFFFF, kind, pages, columns, len(keys_bytes))
+    return header + keys_bytes + payload, current
+
+
+def decode_frame(frame: bytes, previous: np.ndarray | None = None) -> tuple[int, np.ndarray, str]:
+    """Inverse of ``encode_frame``, returns ``(sequence, vram, keys)``."""
+
+    magic, sequence, kind, pages, columns, keys_len = _HEADER.unpack_from(frame)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Not an LCD frame: {magic!r}")
+    offset = _HEADER.size
+    keys = bytes(frame[offset : offset + keys_len]).decode()
+    offset += keys_len
+
+    if kind == FRAME_KEY:
+        vram = np.frombuffer(frame, dtype=np.uint8, count=pages * columns, offset=offset).copy()
+    elif kind == FRAME_DELTA:
+        if previous is None or previous.size != pages * columns:
+            raise ValueError("Delta frame without a matching previous frame")
+        vram = previous.reshape(-1).copy()
+        while offset < len(frame):
+            start, length = _RUN.unpack_from(frame, offset)
+            offset += _RUN.size
+            vram[start : start + length] = np.frombuffer(frame, dtype=np.uint8, count=length, offset=offset)
+            offset += length
+    else:
+        raise ValueError(f"Unknown LCD frame kind: {kind}")
+    return sequence, vram.reshape(pages, columns), keys
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import subprocess
+import sys
+import sysconfig
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from z80bus.batch_parser import NO_PC, BatchBusParser, EventColumns
+
+MODULE_DIR = Path(__file__).resolve().parent
+NATIVE_MODULE_NAME = "bus_parser_native"
+NATIVE_CPP = MODULE_DIR / f"{NATIVE_MODULE_NAME}.cpp"
+NATIVE_SO = MODULE_DIR / f"{NATIVE_MODULE_NAME}{sysconfig.get_config_var('EXT_SUFFIX')}"
+
+_ERROR_INVALID_TYPE = 0
+
+
+def _build_native_module() -> None:
+    include_dir = sysconfig.get_paths()["include"]
+    # build next to the target and rename, other processes never load a half-written library
+    tmp_name = str(NATIVE_SO.with_name(f".{NATIVE_SO.name}.{os.getpid()}.tmp"))
+    command = [
+        "c++",
+        "-O3",
+        "-std=c++17",
+        "-shared",
+        "-fPIC",
+        "-I",
+        include_dir,
+        "-o",
+        tmp_name,
+        str(NATIVE_CPP),
+    ]
+    if sys.platform == "darwin":
+        command[1:1] = ["-undefined", "dynamic_lookup"]
+    try:
+        subprocess.run(command, check=True, cwd=MODULE_DIR, capture_output=True)
+        os.replace(tmp_name, NATIVE_SO)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+
+def _load_native_module():
+    if not NATIVE_SO.exists() or NATIVE_SO.stat().st_mtime < NATIVE_CPP.stat().st_mtime:
+        _build_native_module()
+    spec = importlib.util.spec_from_file_location(NATIVE_MODULE_NAME, NATIVE_SO)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed to load native module from {NATIVE_SO}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[NATIVE_MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# why the native module couldn't be built or loaded, None when AVAILABLE
+BUILD_ERROR: Exception | None = None
+try:
+    native = _load_native_module()
+except (OSError, RuntimeError, ImportError, subprocess.CalledProcessError) as exc:
+    # no compiler or read-only install, NativeBusParser falls back to the NumPy path
+    BUILD_ERROR = exc
+    native = None
+    warnings.warn(f"z80bus: native bus decoder unavailable ({exc}), using NumPy decoder", RuntimeWarning, stacklevel=2)
+AVAILABLE = native is not None
+
+
+class NativeBusParser(BatchBusParser):
+    """``BatchBusParser`` with the per-record state machine in C++.
+
+    Walks the buffer once, like ``BusParser``, writing straight into
+    preallocated ``EventColumns``. Without the native module this is just
+    ``BatchBusParser``.
+    """
+
+    def decode(self, data, base_offset: int = 0) -> tuple[EventColumns, list[tuple[int, str]], int]:
+        if native is None:
+            return super().decode(data, base_offset)
+
+        self._instruction_state.reset_all()
+
+        raw = np.frombuffer(data, dtype=np.uint8)
+        cols = EventColumns.empty(len(raw) // 4)
+        count, end, rom_bank, pc, native_errors = native.decode_records(
+            raw,
+            cols.offset,
+            cols.type,
+            cols.val,
+            cols.addr,
+            cols.pc,
+            cols.bank,
+            cols.port,
+            cols.instr,
+            base_offset=base_offset,
+            rom_bank=-1 if self.rom_bank is None else self.rom_bank,
+            initial_pc=-1 if self.pc is None else self.pc,
+        )
+
+        self.rom_bank = None if rom_bank < 0 else rom_bank
+        self.pc = None if pc < 0 or pc == NO_PC else pc
+
+        errors = []
+        for offset, kind, value in native_errors:
+            if kind == _ERROR_INVALID_TYPE:
+                errors.append((offset, f"Invalid type at offset {offset}: {value}"))
+            else:
+                errors.append((offset, f"Invalid port at offset {offset}: {hex(value)}"))
+        return cols[:count], errors, end
@@ -0,0 +1,584 @@
+"""Perfetto trace output for bus captures.
+
+``PerfettoTraceBuilder`` collects all packets in one in-memory ``Trace``.
+``PerfettoTraceWriter`` has the same interface for adding events but streams
+each ``TracePacket`` to a file as soon as it's complete, with event and
+annotation names interned per packet sequence, so memory use doesn't grow
+with the capture and repeated names are stored once. It keeps no trace in
+memory, so it has no ``serialize``.
+
+``PerfettoTraceCreator`` turns parsed bus events into call slices, port,
+stack and key events. Run it on a capture file with::
+
+    python -m z80bus.perfetto capture.bin -o trace.pb
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import BinaryIO, overload
+
+import perfetto_pb2 as perfetto
+from z80bus import key_matrix
+from z80bus.bus_parser import Event, InstructionType, Type
+from z80bus.symbols import DrawCharInterpreter, get_function_name
+
+# Trace.packet is field 1, length-delimited: a stream of these is a valid Trace
+_PACKET_TAG = b"\x0a"
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _set_name(message, name: str) -> None:
+    message.name = name
+
+
+class DebugAnnotation:
+    def __init__(self, ann, set_name=_set_name):
+        self.ann = ann
+        self.set_name = set_name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+    def entry(self, name):
+        entry = self.ann.dict_entries.add()
+        self.set_name(entry, name)
+        return entry
+
+    def pointer(self, name, value):
+        entry = self.entry(name)
+        entry.pointer_value = value
+
+    def string(self, name, value):
+        entry = self.entry(name)
+        entry.string_value = value
+
+    def bool(self, name, value):
+        entry = self.entry(name)
+        entry.bool_value = value
+
+    def int(self, name, value):
+        entry = self.entry(name)
+        entry.int_value = value
+
+
+class TrackEvent:
+    def __init__(self, event, set_name=_set_name):
+        self.event = event
+        self.set_name = set_name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+    def annotation(self, name):
+        ann = self.event.debug_annotations.add()
+        self.set_name(ann, name)
+        return DebugAnnotation(ann, self.set_name)
+
+
+class PerfettoTraceBuilder:
+    def __init__(self, process_name: str):
+        self.trace = perfetto.Trace()
+        self.last_track_uuid = 0
+        self.trusted_packet_sequence_id = 0x123
+        # self.process_uuid = 0x456
+        self.pid = 1234
+        self.last_tid = 1
+        # self.tid = 5678
+
+        self.process_uuid = self.add_process_descriptor(process_name)
+        # self.add_thread_descriptor(thread_descriptor)
+
+    def new_packet(self):
+        return self.trace.packet.add()
+
+    def set_event_name(self, event, name: str) -> None:
+        event.name = name
+
+    def set_annotation_name(self, ann, name: str) -> None:
+        ann.name = name
+
+    def add_process_descriptor(self, process_name: str):
+        self.last_track_uuid += 1
+        track_uuid = self.last_track_uuid
+
+        packet = self.new_packet()
+        packet.track_descriptor.uuid = track_uuid  # self.process_uuid
+        packet.track_descriptor.process.pid = self.pid
+        packet.track_descriptor.process.process_name = process_name
+        return track_uuid
+
+    def add_thread_descriptor(self, process_uuid: int, thread_name: str):
+        self.last_track_uuid += 1
+        track_uuid = self.last_track_uuid
+
+        packet = self.new_packet()
+        packet.track_descriptor.uuid = track_uuid
+        packet.track_descriptor.parent_uuid = process_uuid
+        packet.track_descriptor.thread.pid = self.pid
+        packet.track_descriptor.thread.tid = self.last_tid
+        self.last_tid += 1
+        packet.track_descriptor.thread.thread_name = thread_name
+        return track_uuid
+
+    def add_slice_event(self, track_uuid, timestamp: int, event_type: str, name: str | None = None):
+        packet = self.new_packet()
+        packet.timestamp = timestamp
+
+        if event_type == "begin":
+            packet.track_event.type = perfetto.TrackEvent.TYPE_SLICE_BEGIN
+            if name is not None:
+                self.set_event_name(packet.track_event, name)
+        elif event_type == "end":
+            packet.track_event.type = perfetto.TrackEvent.TYPE_SLICE_END
+        else:
+            raise ValueError("event_type must be either 'begin' or 'end'.")
+
+        packet.track_event.track_uuid = track_uuid
+        packet.trusted_packet_sequence_id = self.trusted_packet_sequence_id
+        return TrackEvent(packet.track_event, self.set_annotation_name)
+
+    def add_instant_event(self, track_uuid, timestamp: int, name: str):
+        packet = self.new_packet()
+        packet.timestamp = timestamp
+        packet.track_event.type = perfetto.TrackEvent.TYPE_INSTANT
+        packet.track_event.track_uuid = track_uuid
+        self.set_event_name(packet.track_event, name)
+        packet.trusted_packet_sequence_id = self.trusted_packet_sequence_id
+        return TrackEvent(packet.track_event, self.set_annotation_name)
+
+    def serialize(self) -> bytes:
+        return self.trace.SerializeToString()
+
+
+class StreamedTrackEvent(TrackEvent):
+    """``TrackEvent`` of a ``PerfettoTraceWriter``.
+
+    Annotations go into the event while its packet is the latest one. Once
+    the packet has been written, annotations of a slice begin are kept and
+    attached to the matching slice end, Perfetto merges both on import.
+    """
+
+    def __init__(self, packet, set_name):
+        super().__init__(packet.track_event, set_name)
+        self.packet = packet
+        self.deferred: list = []
+
+    def annotation(self, name):
+        if self.packet is not None:
+            return super().annotation(name)
+        ann = perfetto.DebugAnnotation()
+        self.set_name(ann, name)
+        self.deferred.append(ann)
+        return DebugAnnotation(ann, self.set_name)
+
+
+class PerfettoTraceWriter(PerfettoTraceBuilder):
+    """Streaming ``PerfettoTraceBuilder``, call ``close()`` (or use ``with``) to write the last packet.
+
+    The trace only exists in ``out``, ``serialize`` raises ``TypeError``.
+    """
+
+    def __init__(self, out: BinaryIO, process_name: str, intern: bool = True):
+        self.out = out
+        self.intern = intern
+        self.event_names: dict[str, int] = {}
+        self.annotation_names: dict[str, int] = {}
+        self.num_packets = 0
+        self.num_bytes = 0
+        self._pending: StreamedTrackEvent | None = None
+        # open slices per track, innermost last
+        self._open_slices: dict[int, list[StreamedTrackEvent]] = {}
+        super().__init__(process_name)
+
+    def new_packet(self):
+        self._flush_pending()
+        self._pending = StreamedTrackEvent(perfetto.TracePacket(), self.set_annotation_name)
+        return self._pending.packet
+
+    def add_slice_event(self, track_uuid, timestamp: int, event_type: str, name: str | None = None):
+        super().add_slice_event(track_uuid, timestamp, event_type, name)
+        assert self._pending is not None
+        stack = self._open_slices.setdefault(track_uuid, [])
+        if event_type == "begin":
+            stack.append(self._pending)
+        elif stack:
+            self._pending.packet.track_event.debug_annotations.extend(stack.pop().deferred)
+        return self._pending
+
+    def add_instant_event(self, track_uuid, timestamp: int, name: str):
+        super().add_instant_event(track_uuid, timestamp, name)
+        return self._pending
+
+    def _intern(self, index: dict[str, int], name: str, entries: str) -> int:
+        iid = index.get(name)
+        if iid is None:
+            # new names go out with the next packet written, before any packet using them
+            assert self._pending is not None
+            iid = index[name] = len(index) + 1
+            entry = getattr(self._pending.packet.interned_data, entries).add()
+            entry.iid = iid
+            entry.name = name
+        return iid
+
+    def set_event_name(self, event, name: str) -> None:
+        if self.intern:
+            event.name_iid = self._intern(self.event_names, name, "event_names")
+        else:
+            event.name = name
+
+    def set_annotation_name(self, ann, name: str) -> None:
+        if self.intern:
+            ann.name_iid = self._intern(self.annotation_names, name, "debug_annotation_names")
+        else:
+            ann.name = name
+
+    def _flush_pending(self) -> None:
+        if self._pending is None:
+            return
+        packet = self._pending.packet
+        self._pending.packet = self._pending.event = None
+        self._pending = None
+
+        packet.trusted_packet_sequence_id = self.trusted_packet_sequence_id
+        if self.intern:
+            if self.num_packets == 0:
+                packet.sequence_flags = perfetto.TracePacket.SEQ_INCREMENTAL_STATE_CLEARED
+            elif packet.HasField("track_event"):
+                packet.sequence_flags = perfetto.TracePacket.SEQ_NEEDS_INCREMENTAL_STATE
+
+        data = packet.SerializeToString()
+        header = _PACKET_TAG + _varint(len(data))
+        self.out.write(header)
+        self.out.write(data)
+        self.num_packets += 1
+        self.num_bytes += len(header) + len(data)
+
+    def serialize(self) -> bytes:
+        raise TypeError("PerfettoTraceWriter streams to its file, there is no trace in memory to serialize")
+
+    def close(self) -> None:
+        self._flush_pending()
+        self.out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+@dataclass
+class PerfettoStack:
+    begin_event: TrackEvent
+    begin_ts: int
+    # pyz80.RegisterPair at the first instruction of the call, needs a runner
+    reg: object | None
+
+    caller: int
+    pc: int
+    expected_return_addr: int
+
+
+class PerfettoTraceCreator:
+    """Reconstruct calls, returns, port, stack and key events as Perfetto slices.
+
+    Feed parsed events with ``process`` (in as many pieces as convenient)
+    between ``start`` and ``finish``, or use ``create_perfetto_trace`` for a
+    complete list. ``runner`` is an optional ``Pyz80Runner`` replaying the
+    instructions: with it calls of interesting functions are annotated with
+    their register arguments and ``draw_char`` calls get their own track.
+    """
+
+    def __init__(self, runner=None):
+        self.pc: int | None = None
+        self.last_stack_event: Event | None = None
+        self.last_stack_event_index = None
+        self.stack: list[PerfettoStack] = []
+        self.ts = 0
+        self.index = -1
+        # set by start()
+        self.builder: PerfettoTraceBuilder
+
+        self.main_thread = None
+        self.keys_thread = None
+        self.draw_char_thread = None
+        self.draw_char_addr = {0x8440, 0xBE62, 0xBE5F}
+
+        self.runner = runner
+        self.key_matrix = key_matrix.KeyMatrixInterpreter()
+        self.last_pressed_keys: list = []
+
+        self.enrichment = {
+            # draw_char
+            0x8440: {"A": "char", "D": "y", "E": "x"},
+            0xBE5F: {"A": "char", "D": "y", "E": "x"},
+            0xBE62: {"A": "char", "D": "y", "E": "x"},
+            # draw_char_continuous
+            0x8738: {"A": "char", "B": "num_char", "D": "y", "E": "x"},
+            0xBFEE: {"A": "char", "B": "num_char", "D": "y", "E": "x"},
+            # draw_string
+            0x84BF: {"B": "num_char", "D": "y", "E": "x", "HL": "str_ptr"},
+            0xBFF1: {"B": "num_char", "D": "y", "E": "x", "HL": "str_ptr"},
+        }
+
+        self.interesting_functions = set(self.enrichment.keys())
+        self.interesting_functions.add(0x14000)  # alternative string draw?
+
+    @overload
+    def start(self, out: None = None) -> PerfettoTraceBuilder: ...
+
+    @overload
+    def start(self, out: BinaryIO) -> PerfettoTraceWriter: ...
+
+    def start(self, out: BinaryIO | None = None) -> PerfettoTraceBuilder | PerfettoTraceWriter:
+        """Begin a trace, streamed to ``out`` when given, in memory otherwise."""
+
+        current_date_time_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        process_name = f"SHARP PC-G850 {current_date_time_str}"
+        if out is None:
+            self.builder = PerfettoTraceBuilder(process_name)
+        else:
+            self.builder = PerfettoTraceWriter(out, process_name)
+
+        self.main_thread = self.builder.add_thread_descriptor(self.builder.process_uuid, "main")
+        self.keys_thread = self.builder.add_thread_descriptor(self.builder.process_uuid, "keys")
+        self.draw_char_thread = self.builder.add_thread_descriptor(self.builder.process_uuid, "draw_char")
+        return self.builder
+
+    def process(self, data: Iterable[Event]) -> None:
+        for e in data:
+            self.index += 1
+            self.ts += 1
+            index = self.index
+
+            if self.runner is not None:
+                self.runner.eval(e)
+
+            if e.type == Type.FETCH:
+                self.pc = e.addr
+
+                if self.runner is not None:
+                    # it might be useful later
+                    if len(self.stack) > 0 and not self.stack[-1].reg:
+                        self.stack[-1].reg = self.runner.reg()
+
+                    # self.runner.eval(e) will move the pc to the last_pc
+                    if self.runner.last_pc_full in self.interesting_functions:
+                        self.enrich_interesting_function(self.runner.last_pc_full)
+
+                if self.last_stack_event is not None:
+                    if self.last_stack_event.instr == InstructionType.CALL:
+                        self._handle_call_event(e)
+                    else:
+                        self._handle_ret_event(e)
+                self.last_stack_event = None
+                self.last_stack_event_index = None
+            elif e.type in [Type.IN_PORT, Type.OUT_PORT]:
+                self._handle_port_event(e)
+
+                self.key_matrix.eval(e)
+                if self.last_pressed_keys != self.key_matrix.pressed_keys():
+                    self._handle_pressed_keys(self.last_pressed_keys, self.key_matrix.pressed_keys())
+                    self.last_pressed_keys = self.key_matrix.pressed_keys()
+            elif e.type in [Type.READ_STACK, Type.WRITE_STACK]:
+                self._handle_stack_event(e)
+
+            # next FETCH instruction will be the destination of the CALL/RET
+            if e.instr in [InstructionType.CALL, InstructionType.RET]:
+                self.last_stack_event = e
+                self.last_stack_event_index = index
+
+    def finish(self) -> PerfettoTraceBuilder | PerfettoTraceWriter:
+        """Close the trace, a ``PerfettoTraceWriter`` when ``start`` was given ``out``."""
+        if isinstance(self.builder, PerfettoTraceWriter):
+            self.builder.close()
+        return self.builder
+
+    @overload
+    def create_perfetto_trace(self, data: Iterable[Event], out: None = None) -> PerfettoTraceBuilder: ...
+
+    @overload
+    def create_perfetto_trace(self, data: Iterable[Event], out: BinaryIO) -> PerfettoTraceWriter: ...
+
+    def create_perfetto_trace(
+        self, data: Iterable[Event], out: BinaryIO | None = None
+    ) -> PerfettoTraceBuilder | PerfettoTraceWriter:
+        # with `out` the packets are streamed to that file instead of kept in memory
+        builder = self.start(out)
+        self.process(data)
+        self.finish()
+        return builder
+
+    def _caller_addr(self) -> int:
+        # address of the CALL/RET whose destination is being fetched
+        assert self.last_stack_event is not None and self.last_stack_event.addr is not None
+        return self.last_stack_event.addr
+
+    # FIXME: ideally want separate tracks for the items, as they're independent and not nested
+    def _handle_pressed_keys(self, last, curr):
+        # first need to close the slices for the keys that are no longer pressed
+        stop_pressed = set(last) - set(curr)
+        for _k in stop_pressed:
+            self.builder.add_slice_event(self.keys_thread, self.ts, "end")
+
+        # then open slices for keys that weren't pressed before and are pressed now
+        start_pressed = set(curr) - set(last)
+        for k in start_pressed:
+            self.builder.add_slice_event(self.keys_thread, self.ts, "begin", f"key {k}")
+
+    def _annotate_common(self, be, e, name):
+        with be.annotation(name) as ann:
+            ann.int("index", self.last_stack_event_index)
+            ann.pointer("pc", self.pc)
+            ann.pointer("caller", self._caller_addr())
+            if e.bank:
+                ann.int("bank", e.bank)
+
+    def _handle_call_event(self, e):
+        assert self.pc is not None
+        caller = self._caller_addr()
+        function_name = get_function_name(self.pc)
+        with self.builder.add_slice_event(self.main_thread, self.ts, "begin", function_name) as begin_event:
+            expected_return_addr = caller + 3
+            self.stack.append(
+                PerfettoStack(
+                    begin_event=begin_event,
+                    begin_ts=self.ts,
+                    reg=None,
+                    caller=caller,
+                    pc=self.pc,
+                    expected_return_addr=expected_return_addr,
+                )
+            )
+            self._annotate_common(begin_event, e, "call")
+
+    def enrich_interesting_function(self, addr):
+        assert len(self.stack) > 0
+        assert self.runner is not None
+        s = self.stack[-1]
+        if addr in self.enrichment:
+            with s.begin_event.annotation("enrich") as ann:
+                for reg, field in self.enrichment[addr].items():
+                    if len(reg) == 2:
+                        high = getattr(self.runner.reg(), reg[0])
+                        low = getattr(self.runner.reg(), reg[1])
+                        ann.pointer(field, (high << 8) | low)
+                    else:
+                        ann.int(field, getattr(self.runner.reg(), reg))
+        else:
+            with s.begin_event.annotation("reg") as ann:
+                reg = self.runner.reg()
+                # iterate over all fields in RegisterPair and add them to the annotation as pointers
+                for field in dataclasses.fields(reg):
+                    ann.pointer(field.name, getattr(reg, field.name))
+
+    def create_draw_char_slice(self, s, e):
+        char = DrawCharInterpreter.char_name(s.reg.A, s.pc)
+        begin = self.builder.add_slice_event(self.draw_char_thread, s.begin_ts, "begin", char)
+        with begin.annotation("draw_char") as ann:
+            ann.pointer("char", s.reg.A)
+            ann.pointer("x", s.reg.E)
+            ann.pointer("y", s.reg.D)
+        self.builder.add_slice_event(self.draw_char_thread, self.ts, "end")
+
+    def _handle_mismatched_ret_event(self, e, s):
+        # sub_93cd hacks the return address after switching rom bank
+        if self._caller_addr() == 0x93F2:
+            self._handle_call_event(e)
+            self.stack[-1].expected_return_addr = 0x93F3
+            return
+
+        with self.builder.add_instant_event(self.main_thread, self.ts, "BAD_RET").annotation("ret") as ann:
+            ann.int("index", self.index)
+            ann.pointer("pc", self.pc)
+            ann.pointer("expected_return_addr", s.expected_return_addr)
+
+    def _handle_ret_event(self, e):
+        if self.stack:
+            s = self.stack.pop()
+
+            # register values are only known with a runner
+            if s.pc in self.draw_char_addr and s.reg is not None:
+                self.create_draw_char_slice(s, e)
+
+            # annotate before the end event, a streamed begin event passes them on to it
+            self._annotate_common(s.begin_event, e, "ret")
+            self.builder.add_slice_event(self.main_thread, self.ts, "end")
+
+            if self.pc != s.expected_return_addr:
+                self._handle_mismatched_ret_event(e, s)
+        else:
+            underflow = self.builder.add_instant_event(self.main_thread, self.ts, "UNDERFLOW")
+            self._annotate_common(underflow, e, "ret")
+
+    def _handle_port_event(self, e):
+        direction = "in" if e.type == Type.IN_PORT else "out"
+        name = f"{e.port.name} {direction} {hex(e.val)}"
+        with self.builder.add_instant_event(self.main_thread, self.ts, name).annotation("call") as ann:
+            ann.int("index", self.index)
+            ann.pointer("pc", self.pc)
+            ann.pointer("port", e.port.value)
+            ann.pointer("val", e.val)
+
+    def _handle_stack_event(self, e):
+        direction = "POP" if e.type == Type.READ_STACK else "PUSH"
+        name = f"{direction} {hex(e.val)}"
+        with self.builder.add_instant_event(self.main_thread, self.ts, name).annotation("stack") as ann:
+            ann.int("index", self.index)
+            ann.pointer("pc", self.pc)
+            ann.pointer("addr", e.addr)
+            ann.pointer("val", e.val)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from z80bus.capture_file import CaptureReader
+
+    arg_parser = argparse.ArgumentParser(description="Export a bus capture as a Perfetto trace.")
+    arg_parser.add_argument("capture", help="capture file written by CaptureWriter")
+    arg_parser.add_argument("-o", "--output", help="trace file, defaults to <capture>.pb")
+    arg_parser.add_argument("--chunk-size", type=int, default=1 << 24, help="raw bytes decoded at a time")
+    args = arg_parser.parse_args(argv)
+
+    reader = CaptureReader(args.capture)
+    output = args.output or args.capture + ".pb"
+    creator = PerfettoTraceCreator()
+    num_errors = 0
+    start_time = time.perf_counter()
+    with open(output, "wb") as out:
+        writer = creator.start(out)
+        for columns, errors in reader.iter_events(args.chunk_size):
+            num_errors += len(errors)
+            creator.process(columns.to_events())
+        creator.finish()
+
+    print(
+        f"{output}: {creator.index + 1} events, {writer.num_packets} packets, {writer.num_bytes} bytes, "
+        f"{num_errors} parse errors in {time.perf_counter() - start_time:.1f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Check ROM reads in a capture against dumped ROM banks.
+
+The bank in effect at each event is forward-filled from the bank port
+writes, the expected byte is gathered from all banks concatenated into one
+image, so a whole capture is compared in a few array operations.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas
+
+from z80bus.batch_parser import TYPE_CODE, EventColumns, rom_banks
+from z80bus.bus_parser import BANK_ADDR_START, BANK_SIZE, ROM_ADDR_START, Type
+
+
+@dataclass
+class RomImage:
+    """ROM banks laid out as ``bus_parser.extend_address`` numbers them.
+
+    Bank 0 (``0x8000-0xBFFF``) starts at offset 0 and bank ``n`` at
+    ``n * BANK_SIZE``. ``known`` is False for bytes of missing banks.
+    """
+
+    data: np.ndarray  # uint8
+    known: np.ndarray  # bool
+
+    @classmethod
+    def from_banks(cls, banks: Mapping[int, bytes]) -> RomImage:
+        size = (max(banks, default=-1) + 1) * BANK_SIZE
+        data = np.zeros(size, dtype=np.uint8)
+        known = np.zeros(size, dtype=bool)
+        for bank, rom in banks.items():
+            rom = np.frombuffer(rom, dtype=np.uint8)[:BANK_SIZE]
+            data[bank * BANK_SIZE : bank * BANK_SIZE + len(rom)] = rom
+            known[bank * BANK_SIZE : bank * BANK_SIZE + len(rom)] = True
+        return cls(data=data, known=known)
+
+    def offsets(self, addr: np.ndarray, bank: np.ndarray) -> np.ndarray:
+        """Image offset of CPU addresses ``>= ROM_ADDR_START``, -1 where it isn't in the image."""
+        banked = addr >= BANK_ADDR_START
+        offset = np.where(banked, bank * BANK_SIZE + (addr - BANK_ADDR_START), addr - ROM_ADDR_START)
+        offset[(banked & (bank < 0)) | (offset >= len(self.data))] = -1
+        return offset
+
+
+@dataclass
+class RomMismatches:
+    """Events whose value differs from the ROM dump, as parallel arrays."""
+
+    index: np.ndarray  # event index
+    addr: np.ndarray  # CPU address
+    bank: np.ndarray
+    expected: np.ndarray
+    actual: np.ndarray
+
+    num_checked: int
+    # ROM reads that couldn't be checked: unknown bank or missing dump
+    num_unchecked: int
+    # event indices of writes to the ROM address range
+    rom_writes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def to_dataframe(self) -> pandas.DataFrame:
+        return pandas.DataFrame(
+            {
+                "index": self.index,
+                "addr": self.addr,
+                "bank": self.bank,
+                "expected": self.expected,
+                "actual": self.actual,
+            }
+        )
+
+
+def cpu_addresses(addr: np.ndarray) -> np.ndarray:
+    """Undo ``bus_parser.extend_address``, works on raw 16-bit addresses too."""
+    addr = addr.astype(np.int64)
+    return np.where(addr >= BANK_ADDR_START, BANK_ADDR_START + ((addr - BANK_ADDR_START) % BANK_SIZE), addr)
+
+
+def verify_rom(columns: EventColumns, banks: Mapping[int, bytes] | RomImage, initial_bank: int | None = 0) -> RomMismatches:
+    """Compare every FETCH/READ from the ROM address range with ``banks``.
+
+    ``initial_bank`` is the bank selected before the first bank port write,
+    ``None`` leaves banked reads before it unchecked.
+    """
+
+    image = banks if isinstance(banks, RomImage) else RomImage.from_banks(banks)
+    addr = cpu_addresses(columns.addr)
+    in_rom = addr >= ROM_ADDR_START
+    is_read = (columns.type == TYPE_CODE[Type.FETCH]) | (columns.type == TYPE_CODE[Type.READ])
+    is_write = columns.type == TYPE_CODE[Type.WRITE]
+
+    index = np.flatnonzero(is_read & in_rom)
+    bank = rom_banks(columns, initial_bank)[index]
+    addr = addr[index]
+    offset = image.offsets(addr, bank)
+    checked = offset >= 0
+    checked[checked] = image.known[offset[checked]]
+
+    index, addr, bank, offset = index[checked], addr[checked], bank[checked], offset[checked]
+    expected = image.data[offset]
+    actual = columns.val[index]
+    mismatch = expected != actual
+
+    return RomMismatches(
+        index=index[mismatch],
+        addr=addr[mismatch],
+        bank=bank[mismatch],
+        expected=expected[mismatch],
+        actual=actual[mismatch].astype(np.uint8),
+        num_checked=len(index),
+        num_unchecked=len(checked) - len(index),
+        rom_writes=np.flatnonzero(is_write & in_rom),
+    )
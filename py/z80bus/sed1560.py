@@ -1,14 +1,16 @@
 # SED1560 is an LCD controller from SHARP PC-G850.
 
-import copy
 import datetime
 import multiprocessing as mp
+import queue
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, IntEnum
 
+import numpy as np
 import pandas
 from PIL import Image, ImageDraw
 
+from shared.lcd_vram import PageVRAM, unpack_pages
 from z80bus.bus_parser import IOPort
 
 
@@ -71,6 +73,29 @@ class SED1560:
         addr: int
         value: int
 
+    class Op(IntEnum):
+        """Opcodes of a command table row, ``arg`` holds the decoded operand."""
+
+        UNKNOWN = 0  # any other port, arg: value
+        INITIAL_DISPLAY_LINE = 1  # arg: com0
+        CONTRAST = 2  # arg: contrast
+        POWER_ON = 3  # arg: on
+        POWER_ON_COMPLETE = 4
+        SET_PAGE_ADDRESS = 5  # arg: page
+        CMD_A = 6  # arg: CmdAType | value
+        SET_COMMON_SEGMENT_OUTPUT = 7  # arg: scanning_direction << 3 | case
+        SET_COLUMN_LOW = 8  # arg: low nibble
+        SET_COLUMN_HIGH = 9  # arg: high nibble, already shifted by 4 bits
+        VRAM_WRITE = 10  # arg: value
+        INVALID = 0xFF
+
+
+# port events interpret_lcd_thread decodes and replays at once
+LCD_BATCH_SIZE = 65536
+
+# one row per port event, see SED1560.Op
+COMMAND_DTYPE = np.dtype([("op", np.uint8), ("arg", np.uint8)])
+
 
 class SED1560Parser:
     # Disabling it is better to match the LCD command by index with all the
@@ -182,6 +207,39 @@ class SED1560Parser:
                     i += 1
         return processed
 
+    @staticmethod
+    def decode_commands(ports, values) -> np.ndarray:
+        """Decode arrays of port numbers and values into a ``COMMAND_DTYPE`` table in one pass.
+
+        Each row comes from a lookup table indexed by port and value, built
+        from ``parse_out40``/``parse_out41``; ports other than 0x40 and 0x41
+        become ``Op.UNKNOWN``. Raises ``ValueError`` for the first 0x40
+        value ``parse_out40`` rejects.
+        """
+
+        ports = np.asarray(ports, dtype=np.uint8)
+        values = np.asarray(values, dtype=np.uint8)
+
+        table = _COMMAND_TABLE[ports, values]
+
+        invalid = np.flatnonzero(table["op"] == SED1560.Op.INVALID)
+        if invalid.size:
+            i = int(invalid[0])
+            raise ValueError(f"Command {i}: {SED1560.Unknown(addr=0x40, value=int(values[i]))}")
+        return table
+
+    @staticmethod
+    def decode_bus_commands(events) -> np.ndarray:
+        """``decode_commands`` for a ``List[Event]`` or a dataframe of port events."""
+
+        if isinstance(events, pandas.DataFrame):
+            ports = events["port"].map(lambda port: port.value).to_numpy()
+            values = events["val"].to_numpy()
+        else:
+            ports = np.fromiter((e.port.value for e in events), dtype=np.uint8, count=len(events))
+            values = np.fromiter((e.val for e in events), dtype=np.uint8, count=len(events))
+        return SED1560Parser.decode_commands(ports, values)
+
     @staticmethod
     def parsed_commands_to_df(processed):
         result = []
@@ -197,6 +255,46 @@ class SED1560Parser:
         return pandas.DataFrame(result)
 
 
+def _command_row(cmd) -> tuple[int, int]:
+    Op = SED1560.Op
+    match cmd:
+        case SED1560.InitialDisplayLine(value=com0):
+            return Op.INITIAL_DISPLAY_LINE, com0
+        case SED1560.Contrast(contrast=contrast):
+            return Op.CONTRAST, contrast
+        case SED1560.PowerOn(on=on):
+            return Op.POWER_ON, int(on)
+        case SED1560.PowerOnComplete():
+            return Op.POWER_ON_COMPLETE, 0
+        case SED1560.SetPageAddress(value=page):
+            return Op.SET_PAGE_ADDRESS, page
+        case SED1560.CmdA(cmd=cmd_a, value=value):
+            return Op.CMD_A, cmd_a.value | value
+        case SED1560.SetCommonSegmentOutput(scanning_direction=direction, case=case):
+            return Op.SET_COMMON_SEGMENT_OUTPUT, direction << 3 | case
+        case SED1560.SetColumnPart(is_high=is_high, value=value):
+            return Op.SET_COLUMN_HIGH if is_high else Op.SET_COLUMN_LOW, value
+    raise ValueError(f"No table row for {cmd}")
+
+
+def _build_command_table() -> np.ndarray:
+    values = np.arange(256, dtype=np.uint8)
+    table = np.zeros((256, 256), dtype=COMMAND_DTYPE)
+    table["op"] = SED1560.Op.UNKNOWN
+    table["arg"] = values
+    table["op"][IOPort.LCD_OUT.value] = SED1560.Op.VRAM_WRITE
+    for x in range(256):
+        try:
+            table[IOPort.LCD_COMMAND.value, x] = _command_row(SED1560Parser.parse_out40(x))
+        except ValueError:
+            table[IOPort.LCD_COMMAND.value, x] = (SED1560.Op.INVALID, 0)
+    return table
+
+
+# decoded row for every port and value
+_COMMAND_TABLE = _build_command_table()
+
+
 # TODO: use info from https://www.akiyan.com/pc-g850_technical_data
 # to implement the remaining commands.
 class SED1560Interpreter:
@@ -223,8 +321,22 @@ class SED1560Interpreter:
         self.scanning_direction = None
         self.segments_display_mode = None
 
-        # Initialize VRAM as a 2D array of bytes (each row is a list of LCD_WIDTH bytes)
-        self.vram = [[0 for _ in range(self.LCD_WIDTH)] for _ in range(self.LCD_HEIGHT)]
+        # LCD_HEIGHT pages of LCD_WIDTH bytes, vram[page][col]
+        self.vram = PageVRAM(self.LCD_HEIGHT, self.LCD_WIDTH)
+
+        # per page column range [lo, hi) changed since the last vram_image(), empty when lo >= hi
+        self.dirty_lo = [0] * self.LCD_HEIGHT
+        self.dirty_hi = [self.LCD_WIDTH] * self.LCD_HEIGHT
+        self._frame = None
+        self._frame_zoom = None
+
+    def mark_dirty(self):
+        """Re-rasterize everything on the next ``vram_image``, for code that writes ``vram`` directly."""
+        self.dirty_lo = [0] * self.LCD_HEIGHT
+        self.dirty_hi = [self.LCD_WIDTH] * self.LCD_HEIGHT
+
+    def is_dirty(self):
+        return any(lo < hi for lo, hi in zip(self.dirty_lo, self.dirty_hi, strict=True))
 
     def eval(self, cmd):
         match cmd:
@@ -235,7 +347,13 @@ class SED1560Interpreter:
             case SED1560.SetPageAddress(value=page):
                 self.page = page
             case SED1560.VRAMWrite(value=x):
-                self.vram[self.page][self.col] = x
+                if self.vram.write(self.page, self.col, x):
+                    if self.dirty_lo[self.page] >= self.dirty_hi[self.page]:
+                        self.dirty_lo[self.page] = self.col
+                        self.dirty_hi[self.page] = self.col + 1
+                    else:
+                        self.dirty_lo[self.page] = min(self.dirty_lo[self.page], self.col)
+                        self.dirty_hi[self.page] = max(self.dirty_hi[self.page], self.col + 1)
                 # The counter automatically stops at the highest address, A6H.
                 self.col = min(self.col + 1, self.LCD_WIDTH - 1)
             case SED1560.SetCommonSegmentOutput(
@@ -262,67 +380,340 @@ class SED1560Interpreter:
             case _:
                 raise ValueError(f"Unhandled command: {cmd}")
 
+    def replay(self, table: np.ndarray) -> None:
+        """Apply a ``COMMAND_DTYPE`` table, same end state as ``eval`` of each command.
+
+        Page and column of every VRAM write are worked out with array
+        operations. Only column commands that depend on the column reached
+        so far are walked in Python, a low/high nibble pair sets the whole
+        column. Unlike ``eval`` one by one, nothing is applied when a
+        command would be rejected.
+        """
+
+        Op = SED1560.Op
+        op = table["op"]
+        arg = table["arg"]
+        last_col = self.LCD_WIDTH - 1
+
+        cmd_a = np.flatnonzero(op == Op.CMD_A)
+        cmd_a_type = arg[cmd_a] & 0b1110
+        handled = (cmd_a_type == SED1560.CmdAType.DISPLAY_ON.value) | (
+            cmd_a_type == SED1560.CmdAType.SEGMENTS_DISPLAY_MODE.value
+        )
+        rejected = np.concatenate((cmd_a[~handled], np.flatnonzero(op > Op.VRAM_WRITE)))
+        if rejected.size:
+            i = int(rejected.min())
+            raise ValueError(f"Unhandled command {i}: {SED1560.Op(op[i]).name} {arg[i]:#x}")
+
+        writes = np.flatnonzero(op == Op.VRAM_WRITE)
+
+        # page of each write: the last SetPageAddress before it
+        is_page_cmd = op == Op.SET_PAGE_ADDRESS
+        page_values = np.concatenate(([self.page], arg[is_page_cmd])).astype(np.intp)
+        write_pages = page_values[np.cumsum(is_page_cmd)[writes]]
+
+        is_col_cmd = (op == Op.SET_COLUMN_LOW) | (op == Op.SET_COLUMN_HIGH)
+        col_cmds = np.flatnonzero(is_col_cmd)
+        is_high = op[col_cmds] == Op.SET_COLUMN_HIGH
+        nibbles = arg[col_cmds].astype(np.intp)
+        # writes before each column command and since the previous one
+        writes_before = np.searchsorted(writes, col_cmds)
+        gaps = np.diff(writes_before, prepend=0)
+
+        # column after each command, right after the other nibble it is known outright
+        cols = np.zeros(len(col_cmds), dtype=np.intp)
+        pair = np.zeros(len(col_cmds), dtype=bool)
+        pair[1:] = (is_high[1:] != is_high[:-1]) & (gaps[1:] == 0)
+        cols[1:][pair[1:]] = (nibbles[1:] | nibbles[:-1])[pair[1:]]
+        # the rest build on the previous column, skipping those a pair overrides
+        walk = ~pair & ~np.append(pair[1:], False)
+        cols_list = cols.tolist()
+        for j in np.flatnonzero(walk).tolist():
+            col = cols_list[j - 1] if j else self.col
+            if gaps[j]:
+                col = min(col + int(gaps[j]), last_col)
+            if is_high[j]:
+                cols_list[j] = (col & 0x0F) | int(nibbles[j])
+            else:
+                cols_list[j] = (col & 0xF0) | int(nibbles[j])
+        cols = np.asarray(cols_list, dtype=np.intp)
+
+        # the column counter stops at the last column; a run starting past it
+        # fails on its first write, like in eval()
+        run = np.cumsum(is_col_cmd)[writes]
+        start = np.concatenate(([self.col], cols))[run]
+        offset = np.arange(len(writes)) - np.concatenate(([0], writes_before))[run]
+        write_cols = np.minimum(start + offset, np.maximum(start, last_col))
+        outside = np.flatnonzero((write_cols >= self.LCD_WIDTH) | (write_pages >= self.LCD_HEIGHT))
+        if outside.size:
+            i = int(outside[0])
+            raise IndexError(
+                f"VRAM write {int(writes[i])} outside of VRAM: page {write_pages[i]}, column {write_cols[i]}"
+            )
+
+        # the last write to each address wins
+        cells = write_pages * self.LCD_WIDTH + write_cols
+        last = np.full(self.LCD_HEIGHT * self.LCD_WIDTH, -1, dtype=np.intp)
+        np.maximum.at(last, cells, np.arange(len(writes)))
+        written = np.flatnonzero(last >= 0)
+        vram = self.vram.data.reshape(-1)
+        new_values = arg[writes[last[written]]]
+        changed = written[vram[written] != new_values]
+        vram[written] = new_values
+        for page, col in zip(*(x.tolist() for x in np.divmod(changed, self.LCD_WIDTH)), strict=True):
+            if self.dirty_lo[page] >= self.dirty_hi[page]:
+                self.dirty_lo[page], self.dirty_hi[page] = col, col + 1
+            else:
+                self.dirty_lo[page] = min(self.dirty_lo[page], col)
+                self.dirty_hi[page] = max(self.dirty_hi[page], col + 1)
+
+        col = int(cols[-1]) if len(cols) else self.col
+        if remaining := len(writes) - (int(writes_before[-1]) if len(cols) else 0):
+            col = min(col + remaining, last_col)
+        self.col = col
+        self.page = int(page_values[-1])
+
+        def last_arg(mask):
+            found = np.flatnonzero(mask)
+            return int(arg[found[-1]]) if found.size else None
+
+        if (value := last_arg(op == Op.INITIAL_DISPLAY_LINE)) is not None:
+            self.com0 = value
+        if (value := last_arg(op == Op.CONTRAST)) is not None:
+            self.contrast = value
+        if (value := last_arg(op == Op.POWER_ON)) is not None:
+            self.power_on = bool(value)
+        if (value := last_arg(op == Op.SET_COMMON_SEGMENT_OUTPUT)) is not None:
+            self.scanning_direction = value >> 3
+        for cmd_a_type, attr in [
+            (SED1560.CmdAType.DISPLAY_ON, "display_on"),
+            (SED1560.CmdAType.SEGMENTS_DISPLAY_MODE, "segments_display_mode"),
+        ]:
+            found = cmd_a[(arg[cmd_a] & 0b1110) == cmd_a_type.value]
+            if found.size:
+                setattr(self, attr, int(arg[found[-1]]) & 0b1)
+
     def vram_image(self, zoom=4):
-        off_color = (0, 0, 0)
-        on_color = (0, 255, 0)
-
-        img_width = len(self.vram[0]) * zoom
-        img_height = len(self.vram) * 6 * zoom
-        image = Image.new("RGB", (img_width, img_height), off_color)
-        draw = ImageDraw.Draw(image)
-
-        for row_index, row in enumerate(self.vram):
-            for col, byte in enumerate(row):
-                for bit in range(8):
-                    pixel_state = (byte >> bit) & 1
-                    color = on_color if pixel_state else off_color
-
-                    dy = row_index * 8 + bit
-                    draw.rectangle(
-                        [
-                            col * zoom,
-                            dy * zoom,
-                            col * zoom + zoom - 1,
-                            dy * zoom + zoom - 1,
-                        ],
-                        fill=color,
-                    )
-
-        return image, draw
+        """Image of the VRAM, only the columns written since the last call are rasterized again."""
+
+        if self._frame is None or self._frame_zoom != zoom:
+            self._frame = np.zeros((self.LCD_HEIGHT * 6 * zoom, self.LCD_WIDTH * zoom, 3), dtype=np.uint8)
+            self._frame_zoom = zoom
+            self.mark_dirty()
+
+        # the image is 6 lines per page high, which shows the first 6 pages in full
+        for page in range(self.LCD_HEIGHT * 6 // self.PAGE_HEIGHT):
+            lo, hi = self.dirty_lo[page], self.dirty_hi[page]
+            if lo < hi:
+                pixels = self.vram.to_bitmap(slice(page, page + 1), slice(lo, hi))
+                top = page * self.PAGE_HEIGHT * zoom
+                self._frame[top : top + self.PAGE_HEIGHT * zoom, lo * zoom : hi * zoom] = _rasterize(pixels, zoom)
+        self.dirty_lo = [0] * self.LCD_HEIGHT
+        self.dirty_hi = [0] * self.LCD_HEIGHT
+
+        image = Image.fromarray(self._frame, "RGB")
+        return image, ImageDraw.Draw(image)
+
+
+_PALETTE = np.array([(0, 0, 0), (0, 255, 0)], dtype=np.uint8)  # off, on
+
+
+def _rasterize(pixels, zoom):
+    """Colour and nearest-neighbour upscale a pixel block."""
+    return _PALETTE[pixels].repeat(zoom, axis=0).repeat(zoom, axis=1)
+
+
+def render_vram(vram, zoom=4):
+    """Draw rows of VRAM bytes (one byte per 8 vertical pixels), ``vram`` may be a snapshot copy.
+
+    Like ``vram_image`` the image is ``6 * len(vram)`` lines high.
+    """
+
+    pixels = unpack_pages(vram)[: len(vram) * 6]
+    image = Image.fromarray(np.ascontiguousarray(_rasterize(pixels, zoom)), "RGB")
+    return image, ImageDraw.Draw(image)
+
+
+# commands between two VRAM copies of an SED1560History
+HISTORY_INTERVAL = 1024
+
+
+class SED1560History:
+    """Index to jump to the display state after any number of commands.
+
+    ``record`` evaluates the commands once and keeps a VRAM copy and the
+    registers every ``interval`` commands, plus every VRAM byte change as
+    a delta ``(command index, page * LCD_WIDTH + col, value)``. The VRAM at
+    any index is then the closest earlier copy with at most ``interval``
+    commands worth of deltas applied.
+
+    Commands the interpreter rejects are skipped, like ``interpret_lcd_thread``
+    does, and listed in ``errors`` as ``(command index, message)``.
+    """
+
+    REGISTERS = (
+        "page",
+        "col",
+        "com0",
+        "display_on",
+        "power_on",
+        "contrast",
+        "scanning_direction",
+        "segments_display_mode",
+    )
+
+    def __init__(self, commands, interval, snapshots, delta_index, delta_cell, delta_value, errors=()):
+        self.commands = commands
+        self.interval = interval
+        # (registers, VRAM copy) before command i * interval
+        self.snapshots = snapshots
+        self.delta_index = delta_index
+        self.delta_cell = delta_cell
+        self.delta_value = delta_value
+        self.errors = list(errors)
+        self._skipped = {i for i, _ in self.errors}
+
+    @classmethod
+    def record(cls, commands, interval=HISTORY_INTERVAL, display=None) -> "SED1560History":
+        commands = list(commands)
+        display = display or SED1560Interpreter()
+        width = display.LCD_WIDTH
+        vram = display.vram.data.reshape(-1)
+        snapshots = []
+        delta_index, delta_cell, delta_value = [], [], []
+        errors = []
+        for i, cmd in enumerate(commands):
+            if i % interval == 0:
+                snapshots.append(cls._snapshot(display))
+            try:
+                if isinstance(cmd, SED1560.VRAMWrite):
+                    cell = display.page * width + display.col
+                    old = vram[cell]
+                    display.eval(cmd)
+                    if old != cmd.value:
+                        delta_index.append(i)
+                        delta_cell.append(cell)
+                        delta_value.append(cmd.value)
+                else:
+                    display.eval(cmd)
+            except (ValueError, IndexError) as e:
+                errors.append((i, str(e)))
+        if len(commands) % interval == 0:
+            snapshots.append(cls._snapshot(display))
+
+        return cls(
+            commands,
+            interval,
+            snapshots,
+            np.array(delta_index, dtype=np.intp),
+            np.array(delta_cell, dtype=np.intp),
+            np.array(delta_value, dtype=np.uint8),
+            errors,
+        )
+
+    @classmethod
+    def _snapshot(cls, display):
+        return {name: getattr(display, name) for name in cls.REGISTERS}, display.vram.data.copy()
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def _base(self, index: int) -> tuple[int, dict, np.ndarray]:
+        if not 0 <= index <= len(self.commands):
+            raise IndexError(f"Command index {index} outside of 0..{len(self.commands)}")
+        i = min(index // self.interval, len(self.snapshots) - 1)
+        registers, vram = self.snapshots[i]
+        return i * self.interval, registers, vram.copy()
+
+    def vram_at(self, index: int) -> np.ndarray:
+        """``(pages, columns)`` VRAM after the first ``index`` commands."""
+
+        start, _registers, vram = self._base(index)
+        lo, hi = np.searchsorted(self.delta_index, [start, index])
+        # the last change to each byte wins
+        cells = self.delta_cell[lo:hi][::-1]
+        cells, last = np.unique(cells, return_index=True)
+        vram.reshape(-1)[cells] = self.delta_value[lo:hi][::-1][last]
+        return vram
+
+    def interpreter_at(self, index: int) -> SED1560Interpreter:
+        """Interpreter with the full state after the first ``index`` commands."""
+
+        start, registers, vram = self._base(index)
+        display = SED1560Interpreter()
+        display.vram = PageVRAM.from_rows(vram)
+        for name, value in registers.items():
+            setattr(display, name, value)
+        for i in range(start, index):
+            if i not in self._skipped:
+                display.eval(self.commands[i])
+        return display
+
+    def image_at(self, index: int, zoom=4):
+        return render_vram(self.vram_at(index), zoom)
+
+
+def eval_events(display, events):
+    """Evaluate port ``events`` on ``display`` one command at a time, return the number of commands.
+
+    The fallback for a batch ``replay`` rejected, skips only the bad events.
+    """
+    num_evals = 0
+    for event in events:
+        try:
+            for cmd in SED1560Parser.parse_bus_commands([event]):
+                num_evals += 1
+                display.eval(cmd)
+        except Exception as e:
+            print(e)
+    return num_evals
 
 
 def interpret_lcd_thread(input_queue, display_queue, status_queue):
-    last_output = None
+    drawn = False
     display = SED1560Interpreter()
 
     status_num_evals = 0
     status_num_empty_queue = 0
     status_num_draws = 0
     status_num_display_not_ready = 0
-
-    while True:
-        data = input_queue.get()
-        # print(f'LCD: got {data}')
-        if data is None:
+    status_num_batches = 0
+
+    done = False
+    while not done:
+        # decode and replay whatever is queued in one go
+        events = [input_queue.get()]
+        while events[-1] is not None and len(events) < LCD_BATCH_SIZE:
+            try:
+                events.append(input_queue.get_nowait())
+            except queue.Empty:
+                status_num_empty_queue += 1
+                break
+        if events[-1] is None:
+            done = True
+            events.pop()
+        if not events:
             break
 
+        status_num_batches += 1
         try:
-            for e in SED1560Parser.parse_bus_commands([data]):
-                # print(e)
-                status_num_evals += 1
-                display.eval(e)
+            table = SED1560Parser.decode_bus_commands(events)
+            display.replay(table)
+            status_num_evals += len(table)
         except Exception as e:
             print(e)
-            continue
+            status_num_evals += eval_events(display, events)
 
         # print(f'LCD: {display.col} {display.page}')
-        # print(f'last_output is None: {last_output is None} or last_output != display.vram: {last_output != display.vram}')
-        if last_output is None or last_output != display.vram:
+        # vram_image() clears the dirty ranges, so this is "changed since the last draw"
+        if not drawn or display.is_dirty():
             if display_queue.empty():
                 print("LCD: putting")
                 status_num_draws += 1
-                last_output = copy.deepcopy(display.vram)
-                display_queue.put(display.vram_image())
+                drawn = True
+                # the ImageDraw half can't be pickled into an mp.Queue
+                image, _ = display.vram_image()
+                display_queue.put(image)
             else:
                 status_num_display_not_ready += 1
 
@@ -330,6 +721,7 @@ def interpret_lcd_thread(input_queue, display_queue, status_queue):
     status_queue.put(
         {
             "num_evals": status_num_evals,
+            "num_batches": status_num_batches,
             "num_draws": status_num_draws,
             "num_display_not_ready": status_num_display_not_ready,
             "num_empty_queue": status_num_empty_queue,
@@ -339,7 +731,22 @@ def interpret_lcd_thread(input_queue, display_queue, status_queue):
 
 
 class DrawLCDContext:
-    def __init__(self, input_queue, display_queue):
+    """Runs ``interpret_lcd_thread`` in its own process.
+
+    Without an ``input_queue`` port events arrive through a ``PortEventRing``
+    the context creates and closes on exit, pass ``self.input_queue`` as the
+    ``ports_output`` of ``bus_parser.ParseContext``.
+    """
+
+    def __init__(self, input_queue=None, display_queue=None):
+        self._owned_input = input_queue is None
+        if input_queue is None:
+            # shm_ring loads the native module, only pay for it when the ring is used
+            from z80bus.shm_ring import PortEventRing
+
+            input_queue = PortEventRing.create()
+        if display_queue is None:
+            display_queue = mp.Queue()
         self.input_queue = input_queue
         self.display_queue = display_queue
         self.status_queue = mp.Queue()
@@ -364,3 +771,5 @@ class DrawLCDContext:
 
         self.display_queue.put(None)
         print(self.status_queue.get())
+        if self._owned_input:
+            self.input_queue.close()
@@ -1,18 +1,34 @@
 # pypy server.py -m z80bus
 
+import asyncio
 import io
 import queue
 import threading
+from dataclasses import dataclass
 from typing import Any
 
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse
 from PIL import ImageFont
 
 from .bus_parser import PipelineBusParser
 from .key_matrix import KeyMatrixInterpreter
-from .sed1560 import SED1560Interpreter, SED1560Parser
+from .lcd_frames import encode_frame
+from .sed1560 import SED1560Interpreter, SED1560Parser, eval_events, render_vram
+
+# raw websocket chunks waiting to be parsed before the websocket stops being read
+INGEST_QUEUE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class DisplaySnapshot:
+    """LCD and key state as of the last parsed chunk, replaced as a whole."""
+
+    epoch: int
+    generation: int
+    vram: tuple[tuple[int, ...], ...]
+    keys: str
 
 
 class ParseRenderManager:
@@ -28,6 +44,13 @@ class ParseRenderManager:
         return cls._instance
 
     def reset(self):
+        # part of the ETag, generations restart from 0 after a reset
+        self.epoch = getattr(self, "epoch", 0) + 1
+        self.png_lock = threading.Lock()
+        self.png_cache: tuple[DisplaySnapshot, bytes] | None = None
+        self.status_png_hits = 0
+        self.status_png_renders = 0
+
         self.lcd = SED1560Interpreter()
         self.key_matrix = KeyMatrixInterpreter()
         self.font = ImageFont.load_default()
@@ -42,7 +65,50 @@ class ParseRenderManager:
         self.buf = bytearray()
         self.status_num_out_ports = 0
         self.status_num_lcd_commands = 0
+        self.status_num_lcd_errors = 0
         self.status_num_errors = 0
+        self.snapshot = DisplaySnapshot(self.epoch, 0, self._copy_vram(), "")
+        # (loop, event) of every wait_for_snapshot call, kept across resets
+        self._waiters_lock = getattr(self, "_waiters_lock", threading.Lock())
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = getattr(self, "_waiters", set())
+        self._notify_waiters()
+
+    def _copy_vram(self) -> tuple[tuple[int, ...], ...]:
+        return tuple(map(tuple, self.lcd.vram.tolist()))
+
+    def publish_snapshot(self) -> None:
+        vram = self._copy_vram()
+        keys = str(self.key_matrix)
+        if vram == self.snapshot.vram and keys == self.snapshot.keys:
+            return
+        # a single attribute store, readers see either the old or the new snapshot
+        self.snapshot = DisplaySnapshot(self.epoch, self.snapshot.generation + 1, vram, keys)
+        self._notify_waiters()
+
+    def _notify_waiters(self) -> None:
+        # publish_snapshot runs on the parser thread, the waiters' events belong to their loops
+        with self._waiters_lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # the loop is closed, its waiter is gone
+
+    async def wait_for_snapshot(self, epoch: int, generation: int) -> DisplaySnapshot:
+        """Wait until the published snapshot differs from ``generation`` of ``epoch``."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._waiters_lock:
+            self._waiters.add(waiter)
+        try:
+            # checked after registering, so a snapshot published in between isn't missed
+            while (self.snapshot.epoch, self.snapshot.generation) == (epoch, generation):
+                await waiter[1].wait()
+                waiter[1].clear()
+        finally:
+            with self._waiters_lock:
+                self._waiters.discard(waiter)
+        return self.snapshot
 
     def process_queues(self):
         while not self.errors_queue.empty():
@@ -55,10 +121,17 @@ class ParseRenderManager:
             self.status_num_out_ports += 1
         for e in events:
             self.key_matrix.eval(e)
-        commands = SED1560Parser.parse_bus_commands(events)
-        for c in commands:
-            self.status_num_lcd_commands += 1
-            self.lcd.eval(c)
+        try:
+            commands = SED1560Parser.decode_bus_commands(events)
+            self.lcd.replay(commands)
+            self.status_num_lcd_commands += len(commands)
+        except (ValueError, IndexError) as e:
+            # like interpret_lcd_thread: only the bad events are dropped, not the whole chunk
+            print(e)
+            self.status_num_lcd_errors += 1
+            self.status_num_lcd_commands += eval_events(self.lcd, events)
+        if events:
+            self.publish_snapshot()
 
     def process_raw_data(self, data: bytes) -> None:
         self.buf.extend(data)
@@ -77,25 +150,117 @@ class ParseRenderManager:
         return self.parser.stats() | {
             "2num_out_ports": self.status_num_out_ports,
             "2num_lcd_commands": self.status_num_lcd_commands,
+            "2num_lcd_errors": self.status_num_lcd_errors,
             "2num_errors": self.status_num_errors,
             "2out_ports_queue_size": self.out_ports_queue.qsize(),
             "2errors_queue_size": self.errors_queue.qsize(),
             "2out_ports_queue_size_before": out_ports_queue_size_before,
             "2out_ports_queue_size_after": out_ports_queue_size_after,
+            "2png_hits": self.status_png_hits,
+            "2png_renders": self.status_png_renders,
         }
 
     def get_accumulated_events(self) -> list[Any]:
         return self.parser.all_events  # type: ignore[no-any-return]
 
+    def lcd_etag(self, snapshot: DisplaySnapshot | None = None) -> str:
+        snapshot = snapshot or self.snapshot
+        return f'"{snapshot.epoch}-{snapshot.generation}"'
+
+    def get_lcd_png(self) -> tuple[str, bytes]:
+        """PNG of the current snapshot and its ETag, encoded once per snapshot generation."""
+
+        with self.png_lock:
+            snapshot = self.snapshot
+            if self.png_cache is not None and self.png_cache[0] is snapshot:
+                self.status_png_hits += 1
+                return self.lcd_etag(snapshot), self.png_cache[1]
+
+            img, draw = render_vram(snapshot.vram)
+            pos = (0, img.height - 30)
+            draw.text(pos, snapshot.keys, font=self.font, fill="white")
+
+            img_bytes_io = io.BytesIO()
+            img.save(img_bytes_io, format="PNG")
+            self.png_cache = (snapshot, img_bytes_io.getvalue())
+            self.status_png_renders += 1
+            return self.lcd_etag(snapshot), self.png_cache[1]
+
     def get_lcd_image_bytes(self) -> bytes:
-        img, draw = self.lcd.vram_image()
-        pos = (0, img.height - 30)
-        draw.text(pos, str(self.key_matrix), font=self.font, fill="white")
+        return self.get_lcd_png()[1]
+
+
+class IngestPipeline:
+    """Feeds websocket chunks to ``ParseRenderManager`` off the event loop.
+
+    Chunks go through a bounded ``asyncio.Queue``; when it is full ``put``
+    waits, so the websocket stops being read instead of memory growing. The
+    worker task takes everything queued so far and parses it in one
+    ``asyncio.to_thread`` call, which keeps ``/lcd`` and ``/events``
+    responsive during bursts. HTTP handlers only read the published
+    ``DisplaySnapshot``.
+    """
+
+    def __init__(self, manager: ParseRenderManager, maxsize: int = INGEST_QUEUE_SIZE):
+        self.manager = manager
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize)
+        self.task: asyncio.Task[None] | None = None
+        self.num_batches = 0
+        self.num_bytes = 0
+        self.num_full_waits = 0
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run())
 
-        img_bytes_io = io.BytesIO()
-        img.save(img_bytes_io, format="PNG")
-        img_bytes_io.seek(0)
-        return img_bytes_io.getvalue()
+    async def put(self, data: bytes) -> None:
+        assert self.task is not None
+        if self.task.done():
+            self._raise_stopped()
+        if not self.queue.full():
+            self.queue.put_nowait(data)
+            return
+        self.num_full_waits += 1
+        # the worker may fail while we wait for room, don't block on a queue nobody drains
+        put = asyncio.ensure_future(self.queue.put(data))
+        await asyncio.wait((put, self.task), return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            self._raise_stopped()
+
+    def _raise_stopped(self) -> None:
+        assert self.task is not None
+        # re-raises a parser error
+        self.task.result()
+        raise RuntimeError("ingest pipeline is closed")
+
+    async def close(self) -> None:
+        assert self.task is not None
+        if not self.task.done():
+            await self.queue.put(None)
+        await self.task
+
+    async def _run(self) -> None:
+        done = False
+        while not done:
+            batch = [await self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            if batch[-1] is None:
+                done = True
+                batch.pop()
+            if batch:
+                data = b"".join(batch)  # type: ignore[arg-type]
+                self.num_batches += 1
+                self.num_bytes += len(data)
+                await asyncio.to_thread(self.manager.process_raw_data, data)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "ingest_batches": self.num_batches,
+            "ingest_bytes": self.num_bytes,
+            "ingest_full_waits": self.num_full_waits,
+            "ingest_queue_size": self.queue.qsize(),
+        }
 
 
 manager = ParseRenderManager()
@@ -113,10 +278,97 @@ async def get_events():
     return JSONResponse(content={"events": events})
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @app.get("/lcd")
-async def get_lcd():
-    img_bytes = manager.get_lcd_image_bytes()
-    return StreamingResponse(io.BytesIO(img_bytes), media_type="image/png")
+async def get_lcd(request: Request):
+    # unchanged since the client's copy: no rendering and no thread hop
+    etag = manager.lcd_etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    etag, img_bytes = await asyncio.to_thread(manager.get_lcd_png)
+    headers["ETag"] = etag
+    return Response(img_bytes, media_type="image/png", headers=headers)
+
+
+@app.websocket("/lcd/stream")
+async def lcd_stream(websocket: WebSocket, delta: bool = True):
+    """Push an ``lcd_frames`` frame for every new LCD/key snapshot, deltas unless ``?delta=false``."""
+    await websocket.accept()
+    previous = None
+    epoch = generation = -1
+    try:
+        while True:
+            snapshot = await manager.wait_for_snapshot(epoch, generation)
+            if snapshot.epoch != epoch:
+                # first frame or the manager was reset, start over with a key frame
+                previous = None
+            epoch, generation = snapshot.epoch, snapshot.generation
+            frame, current = encode_frame(generation, snapshot.vram, snapshot.keys, previous)
+            previous = current if delta else None
+            await websocket.send_bytes(frame)
+    except WebSocketDisconnect:
+        pass
+
+
+LCD_VIEW_HTML = """<!doctype html>
+<html><body style="margin:0;background:#000">
+<canvas id="lcd" style="image-rendering:pixelated;width:664px;height:192px"></canvas>
+<pre id="keys" style="color:#fff;margin:4px"></pre>
+<script>
+const canvas = document.getElementById("lcd");
+const ctx = canvas.getContext("2d");
+let vram = null;
+const scheme = location.protocol === "https:" ? "wss:" : "ws:";
+const ws = new WebSocket(`${scheme}//${location.host}/lcd/stream`);
+ws.binaryType = "arraybuffer";
+ws.onmessage = (msg) => {
+  const view = new DataView(msg.data);
+  const kind = view.getUint8(8), pages = view.getUint8(9), columns = view.getUint16(10, true);
+  const keysLen = view.getUint16(12, true);
+  let offset = 14;
+  document.getElementById("keys").textContent =
+    new TextDecoder().decode(new Uint8Array(msg.data, offset, keysLen));
+  offset += keysLen;
+  if (kind === 0 || vram === null) {
+    vram = new Uint8Array(msg.data.slice(offset, offset + pages * columns));
+  } else {
+    while (offset < msg.data.byteLength) {
+      const start = view.getUint16(offset, true), length = view.getUint16(offset + 2, true);
+      vram.set(new Uint8Array(msg.data, offset + 4, length), start);
+      offset += 4 + length;
+    }
+  }
+  // 6 lines per page are shown, like /lcd
+  const height = pages * 6;
+  canvas.width = columns;
+  canvas.height = height;
+  const image = ctx.createImageData(columns, height);
+  for (let y = 0; y < height; y++) {
+    for (let x = 0; x < columns; x++) {
+      const on = (vram[(y >> 3) * columns + x] >> (y & 7)) & 1;
+      const i = (y * columns + x) * 4;
+      image.data[i + 1] = on ? 255 : 0;
+      image.data[i + 3] = 255;
+    }
+  }
+  ctx.putImageData(image, 0, 0);
+};
+</script>
+</body></html>
+"""
+
+
+@app.get("/lcd/view")
+async def lcd_view():
+    return HTMLResponse(LCD_VIEW_HTML)
 
 
 @app.websocket("/ws")
@@ -124,23 +376,28 @@ async def websocket_endpoint(websocket: WebSocket):
     manager.reset()
     status_num_packets_get = 0
     status_num_bytes_get = 0
+    ingest = IngestPipeline(manager)
+    ingest.start()
     await websocket.accept()
     try:
         while True:
             data = await websocket.receive_bytes()
             status_num_packets_get += 1
             status_num_bytes_get += len(data)
-            manager.process_raw_data(data)
+            await ingest.put(data)
 
     except WebSocketDisconnect:
         print("WebSocket client disconnected.")
+    finally:
+        await ingest.close()
 
-    print(manager.stats())
+    print(await asyncio.to_thread(manager.stats))
     print(
         {
             "status_num_packets_get": status_num_packets_get,
             "status_num_bytes_get": status_num_bytes_get,
         }
+        | ingest.stats()
     )
 
 
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from z80bus.batch_parser import TYPE_CODE, EventColumns, find_record_offsets
+from z80bus.bus_parser import OPCODE_MULTI_PREFIX, IOPort, Type
+from z80bus.capture_file import CaptureReader
+from z80bus.event_store import EventStore
+from z80bus.native_parser import NativeBusParser
+
+PRESCAN_BLOCK_SIZE = 1 << 24
+MIN_SHARD_SIZE = 1 << 20
+
+_PREFIX_OPCODE = np.zeros(256, dtype=bool)
+_PREFIX_OPCODE[list(OPCODE_MULTI_PREFIX)] = True
+
+
+@dataclass
+class Shard:
+    start: int
+    stop: int
+    rom_bank: int | None
+
+
+@dataclass
+class _Prescan:
+    # byte offsets of records that change the ROM bank and the resulting bank
+    bank_offset: np.ndarray
+    bank_value: np.ndarray
+    # byte offsets of FETCH records that are guaranteed to start an instruction
+    boundary: np.ndarray
+
+
+def _prescan(raw: np.ndarray, block_size: int = PRESCAN_BLOCK_SIZE) -> _Prescan:
+    """Find ROM bank writes and safe split points without running the parser.
+
+    Only record alignment (same resync as ``BusParser``), type bytes, port
+    numbers and opcodes are looked at. A FETCH is a safe split point when the
+    previous FETCH wasn't a prefix opcode, so it can't be the second M1 of a
+    prefixed instruction.
+    """
+
+    bank_offset = []
+    bank_value = []
+    boundary = []
+    previous_fetch_is_prefix = True
+    base = 0
+    while base + 4 <= len(raw):
+        block = raw[base : min(base + block_size + 3, len(raw))]
+        offsets, _skipped, end = find_record_offsets(block)
+        types = block[offsets]
+
+        is_port = (types == TYPE_CODE[Type.IN_PORT]) | (types == TYPE_CODE[Type.OUT_PORT])
+        port = block[offsets + 2]
+        rom_bank = is_port & (port == IOPort.ROM_BANK.value)
+        rom_ex_bank = is_port & (port == IOPort.ROM_EX_BANK.value)
+        sets_bank = rom_bank | rom_ex_bank
+        values = block[offsets + 1][sets_bank]
+        bank_offset.append(offsets[sets_bank] + base)
+        bank_value.append(np.where(rom_ex_bank[sets_bank], values & 0x0F, values))
+
+        fetches = offsets[types == TYPE_CODE[Type.FETCH]]
+        prefix = _PREFIX_OPCODE[block[fetches + 1]]
+        after_non_prefix = np.concatenate([[not previous_fetch_is_prefix], ~prefix[:-1]]) if len(fetches) else prefix
+        boundary.append(fetches[after_non_prefix] + base)
+        if len(fetches):
+            previous_fetch_is_prefix = bool(prefix[-1])
+
+        base += end
+
+    return _Prescan(
+        np.concatenate(bank_offset) if bank_offset else np.zeros(0, dtype=np.int64),
+        np.concatenate(bank_value) if bank_value else np.zeros(0, dtype=np.uint8),
+        np.concatenate(boundary) if boundary else np.zeros(0, dtype=np.int64),
+    )
+
+
+def plan_shards(data, num_shards: int, rom_bank: int | None = None) -> list[Shard]:
+    """Split ``data`` into up to ``num_shards`` ranges that start at instruction boundaries."""
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    size = len(raw)
+    if num_shards <= 1 or size < 2 * MIN_SHARD_SIZE:
+        return [Shard(0, size, rom_bank)]
+
+    scan = _prescan(raw)
+    if len(scan.boundary) == 0:
+        return [Shard(0, size, rom_bank)]
+
+    targets = np.arange(1, num_shards) * (size // num_shards)
+    starts = np.unique(scan.boundary[np.minimum(np.searchsorted(scan.boundary, targets), len(scan.boundary) - 1)])
+    starts = starts[(starts >= MIN_SHARD_SIZE) & (starts <= size - MIN_SHARD_SIZE)]
+
+    bounds = [0, *starts.tolist(), size]
+    shards = []
+    for start, stop in zip(bounds[:-1], bounds[1:], strict=True):
+        # bank set by the last ROM_BANK/ROM_EX_BANK write before the shard
+        i = int(np.searchsorted(scan.bank_offset, start)) - 1
+        shards.append(Shard(start, stop, int(scan.bank_value[i]) if i >= 0 else rom_bank))
+    return shards
+
+
+def _decode_shard(source, shard: Shard) -> tuple[EventColumns, list[tuple[int, str]], int]:
+    # source is a capture file path or the shard's own bytes
+    data = CaptureReader(source).data[shard.start : shard.stop] if isinstance(source, str) else source
+    parser = NativeBusParser()
+    parser.rom_bank = shard.rom_bank
+    return parser.decode(data, shard.start)
+
+
+def parse_sharded(
+    source,
+    rom_bank: int | None = None,
+    max_workers: int | None = None,
+    num_shards: int | None = None,
+) -> tuple[EventStore, list[str]]:
+    """Parse a recorded capture on all cores.
+
+    ``source`` is either a capture file path (workers memory-map it
+    themselves) or a bytes-like buffer (each worker gets a copy of its
+    shard). The result equals ``BusParser.parse`` with the same starting
+    ``rom_bank``; for capture files the header's ROM bank is the default.
+    """
+
+    path = None
+    if isinstance(source, (str, os.PathLike)):
+        reader = CaptureReader(source)
+        path = reader.path
+        data = reader.data
+        if rom_bank is None:
+            rom_bank = reader.parser().rom_bank
+    else:
+        data = source
+
+    max_workers = max_workers or os.cpu_count() or 1
+    shards = plan_shards(data, num_shards or max_workers, rom_bank)
+
+    if len(shards) == 1:
+        results = [_decode_shard(data, shards[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_decode_shard, path if path is not None else bytes(data[s.start : s.stop]), s)
+                for s in shards
+            ]
+            results = [f.result() for f in futures]
+
+    store = EventStore(capacity=sum(len(columns) for columns, _, _ in results))
+    errors = []
+    for shard, (columns, shard_errors, end) in zip(shards, results, strict=True):
+        store.extend(columns)
+        errors.extend(message for _, message in shard_errors)
+        if shard is not shards[-1]:
+            # bytes too close to the shard end to be looked at are skipped bytes in the full parse
+            errors.extend(f"Invalid type at offset {o}: {int(data[o])}" for o in range(shard.start + end, shard.stop))
+
+    last_shard = shards[-1]
+    if last_shard.start + results[-1][2] != last_shard.stop:
+        errors.append("Trailing data")
+    return store, errors
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import queue
+import struct
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from z80bus.bus_parser import Event, IOPort, Type
+from z80bus.native_parser import native
+
+# Header of u64 words. Producer and consumer fields live on separate cache lines.
+_CAPACITY = 0
+_HEAD = 8  # total bytes ever written, only the producer stores it
+_BYTES_WRITTEN = 9
+_CHUNKS_WRITTEN = 10
+_DROPPED_CHUNKS = 11
+_DROPPED_BYTES = 12
+_PRODUCER_WAITS = 13
+_CLOSED = 14
+_TAIL = 16  # total bytes ever read, only the consumer stores it
+_CONSUMER_WAITS = 17
+HEADER_SIZE = 24 * 8
+
+DEFAULT_CAPACITY = 64 * 1024 * 1024
+WAIT_INTERVAL_S = 0.0005
+
+
+if native is not None:
+    _atomics = native
+
+    def _load_acquire(header: np.ndarray, index: int) -> int:
+        return _atomics.load_acquire(header, index)
+
+    def _store_release(header: np.ndarray, index: int, value: int) -> None:
+        _atomics.store_release(header, index, value)
+
+else:
+    # plain loads and stores are only ordered on x86 (TSO), without the native
+    # module the ring isn't safe on weakly ordered CPUs like arm64
+
+    def _load_acquire(header: np.ndarray, index: int) -> int:
+        return int(header[index])
+
+    def _store_release(header: np.ndarray, index: int, value: int) -> None:
+        header[index] = value
+
+
+class ShmRingBuffer:
+    """Single-producer/single-consumer byte ring over ``multiprocessing.shared_memory``.
+
+    No locks and no pickling: the producer only advances ``head``, the
+    consumer only advances ``tail``, both are free-running u64 counters in
+    the shared header. They are published with release stores and read with
+    acquire loads (see ``bus_parser_native.cpp``), so the bytes before
+    ``head`` are visible to the consumer and the bytes before ``tail`` are
+    free for the producer. ``put``/``get`` mimic ``mp.Queue`` so the ring can be
+    passed to ``parse_data_thread`` in place of the raw data queue;
+    ``put(None)`` marks the end of the stream.
+
+    A full ring blocks the producer (back-pressure) unless ``block=False``
+    or the ``timeout`` runs out, in which case the chunk is dropped and
+    counted in ``stats()``.
+    """
+
+    record_size = 1
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._closed = False
+        self._header = np.ndarray((HEADER_SIZE // 8,), dtype=np.uint64, buffer=shm.buf)
+        self.capacity = int(self._header[_CAPACITY])
+        self._data = np.ndarray((self.capacity,), dtype=np.uint8, buffer=shm.buf, offset=HEADER_SIZE)
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_CAPACITY, name: str | None = None):
+        capacity -= capacity % cls.record_size
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity)
+        header = np.ndarray((HEADER_SIZE // 8,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __reduce__(self):
+        return (self.__class__.attach, (self.name,))
+
+    def _wait(self, deadline: float | None) -> bool:
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(WAIT_INTERVAL_S)
+        return True
+
+    def put(self, data, block: bool = True, timeout: float | None = None) -> bool:
+        header = self._header
+        if data is None:
+            _store_release(header, _CLOSED, 1)
+            return True
+
+        view = memoryview(data).cast("B")
+        size = len(view)
+        if size > self.capacity:
+            raise ValueError(f"Chunk of {size} bytes does not fit into a {self.capacity} byte ring")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        head = int(header[_HEAD])
+        while self.capacity - (head - _load_acquire(header, _TAIL)) < size:
+            if not waited:
+                header[_PRODUCER_WAITS] += 1
+                waited = True
+            if not block or not self._wait(deadline):
+                header[_DROPPED_CHUNKS] += 1
+                header[_DROPPED_BYTES] += size
+                return False
+
+        start = head % self.capacity
+        first = min(size, self.capacity - start)
+        src = np.frombuffer(view, dtype=np.uint8)
+        self._data[start : start + first] = src[:first]
+        self._data[: size - first] = src[first:]
+
+        header[_BYTES_WRITTEN] += size
+        header[_CHUNKS_WRITTEN] += 1
+        _store_release(header, _HEAD, head + size)
+        return True
+
+    def put_nowait(self, data) -> bool:
+        return self.put(data, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None, max_bytes: int | None = None) -> bytes | None:
+        """Return whatever is available (at least one record), ``None`` once closed and drained."""
+
+        header = self._header
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        tail = int(header[_TAIL])
+        while True:
+            # closed is set after the last head update, so read it first
+            closed = bool(_load_acquire(header, _CLOSED))
+            available = _load_acquire(header, _HEAD) - tail
+            available -= available % self.record_size
+            if available:
+                break
+            if closed:
+                return None
+            if not waited:
+                header[_CONSUMER_WAITS] += 1
+                waited = True
+            if not block or not self._wait(deadline):
+                raise queue.Empty
+
+        if max_bytes is not None:
+            available = min(available, max(max_bytes - max_bytes % self.record_size, self.record_size))
+        start = tail % self.capacity
+        first = min(available, self.capacity - start)
+        out = self._data[start : start + first].tobytes()
+        if first < available:
+            out += self._data[: available - first].tobytes()
+
+        _store_release(header, _TAIL, tail + available)
+        return out
+
+    def get_nowait(self) -> bytes | None:
+        return self.get(block=False)
+
+    def qsize(self) -> int:
+        return int(self._header[_HEAD]) - int(self._header[_TAIL])
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def stats(self) -> dict[str, int]:
+        header = self._header
+        return {
+            "capacity": self.capacity,
+            "used": self.qsize(),
+            "bytes_written": int(header[_BYTES_WRITTEN]),
+            "chunks_written": int(header[_CHUNKS_WRITTEN]),
+            "dropped_chunks": int(header[_DROPPED_CHUNKS]),
+            "dropped_bytes": int(header[_DROPPED_BYTES]),
+            "producer_waits": int(header[_PRODUCER_WAITS]),
+            "consumer_waits": int(header[_CONSUMER_WAITS]),
+        }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        # numpy views must go before the mapping can be closed
+        self._header = np.zeros(0, dtype=np.uint64)
+        self._data = np.zeros(0, dtype=np.uint8)
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+# type, value, port, pc (NO_PC when unknown)
+_PORT_EVENT = struct.Struct("<cBBxI")
+_NO_PC = 0xFFFFFFFF
+
+
+class _PortEventBytes(ShmRingBuffer):
+    record_size = _PORT_EVENT.size
+
+
+class PortEventRing:
+    """``ShmRingBuffer`` carrying IN/OUT port ``Event``\\ s as 8-byte records.
+
+    Drop-in for the ``out_ports_queue`` of ``PipelineBusParser`` and the
+    input queue of ``interpret_lcd_thread``: ``put`` takes an ``Event`` and
+    ``get`` returns one. ``addr``, ``port``, ``val`` and ``pc`` survive the
+    round trip; port events carry no bank or instruction type.
+    """
+
+    def __init__(self, ring: ShmRingBuffer):
+        self._ring = ring
+        self._pending: deque[Event] = deque()
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_CAPACITY, name: str | None = None) -> PortEventRing:
+        return cls(_PortEventBytes.create(capacity, name))
+
+    @classmethod
+    def attach(cls, name: str) -> PortEventRing:
+        return cls(_PortEventBytes.attach(name))
+
+    @property
+    def name(self) -> str:
+        return self._ring.name
+
+    @property
+    def capacity(self) -> int:
+        return self._ring.capacity
+
+    def __reduce__(self):
+        return (self.__class__.attach, (self.name,))
+
+    def put(self, event: Event | None, block: bool = True, timeout: float | None = None) -> bool:
+        if event is None:
+            return self._ring.put(None)
+        assert event.port is not None
+        record = _PORT_EVENT.pack(
+            event.type.value.encode(),
+            event.val,
+            event.port.value,
+            _NO_PC if event.pc is None else event.pc,
+        )
+        return self._ring.put(record, block, timeout)
+
+    def put_nowait(self, event: Event | None) -> bool:
+        return self.put(event, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Event | None:
+        if not self._pending:
+            data = self._ring.get(block, timeout)
+            if data is None:
+                return None
+            for type_code, val, port, pc in _PORT_EVENT.iter_unpack(data):
+                self._pending.append(
+                    Event(
+                        type=Type(type_code.decode()),
+                        val=val,
+                        addr=port,
+                        pc=None if pc == _NO_PC else pc,
+                        port=IOPort(port),
+                    )
+                )
+        return self._pending.popleft()
+
+    def get_nowait(self) -> Event | None:
+        return self.get(block=False)
+
+    def qsize(self) -> int:
+        return len(self._pending) + self._ring.qsize() // _PORT_EVENT.size
+
+    def empty(self) -> bool:
+        return not self._pending and self._ring.empty()
+
+    def stats(self) -> dict[str, int]:
+        return self._ring.stats()
+
+    def close(self) -> None:
+        self._ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,165 @@
+"""Names of PC-G850 ROM functions and characters, for traces and listings."""
+
+# PC-G850
+FUNCTIONS = {
+    0xBA36: "set_rom_bank",
+    # modifies stack
+    0x93CD: "jump_after_set_rom_bank",
+    0x93F3: "jump_after_set_rom_bank_cleanup",
+    # https://www.akiyan.com/pc-g850_technical_data
+    0x8440: "draw_char",  # BE62h
+    0x8738: "draw_char_continuous",  # BFEEh
+    0x84BF: "draw_string",  # BFF1h
+    0x89BE: "is_key_down",  # BE53h
+    0x88C1: "wait_for_key_down",  # BCFDh
+}
+
+BNIDA_NAMES_RAW = {
+    "33856": "draw_char",
+    "33983": "draw_string",
+    "34027": "scroll_display_one_line_up",
+    "34091": "read_lcd_command_until_something?",
+    "34616": "draw_char_continuous",
+    "35009": "wait_for_key_down",
+    "35262": "is_key_down",
+    "35304": "scan_key_down?_wrap",
+    "35309": "scan_key_down?",
+    "35419": "key_something_halt?",
+    "35501": "wait_80",
+    "35510": "wait_332",
+    "35516": "wait",
+    "36431": "do_halt?",
+    "37610": "delay?",
+    "37893": "draw_after_reset?",
+    "41317": "draw_run_program_mode",
+    "42796": "error_in?",
+    "43005": "break_in?",
+    "43114": "get_lcd_row_to_draw_possibly_scroll",
+    "47117": "draw_string2?",
+    "47670": "set_rom_bank",
+    "48381": "wait_for_key_down_wrap",
+    "48441": "draw_after_reset_wrap",
+    "48723": "is_key_down_wrap",
+    "49131": "scroll_display_one_line_up_wrap",
+    "49134": "draw_char_continuous_wrap",
+    "49137": "draw_string_wrap",
+    "49152": "main?",
+    "65321": "do_reset_memory?",
+}
+
+BNIDA_NAMES = {int(k, 10): v for k, v in BNIDA_NAMES_RAW.items()}
+
+
+def get_function_name(addr: int):
+    if addr in BNIDA_NAMES:
+        return BNIDA_NAMES[addr]
+    if addr in FUNCTIONS:
+        return FUNCTIONS[addr]
+    return f"sub_{hex(addr)[2:]}"
+
+
+class DrawCharInterpreter:
+    CHAR_NAMES = {
+        0: "␣",
+        33: "A",
+        34: "B",
+        35: "C",
+        36: "D",
+        37: "E",
+        38: "F",
+        39: "G",
+        40: "H",
+        41: "I",
+        42: "J",
+        43: "K",
+        44: "L",
+        45: "M",
+        46: "N",
+        47: "O",
+        48: "P",
+        49: "Q",
+        50: "R",
+        51: "S",
+        52: "T",
+        53: "U",
+        54: "V",
+        55: "W",
+        56: "X",
+        57: "Y",
+        58: "Z",
+        0x1E: ">",
+    }
+
+    CHAR_NAMES_BE5F = {
+        0x20: "␣",
+        0x2A: "*",
+        0x41: "A",
+        0x42: "B",
+        0x43: "C",
+        0x44: "D",
+        0x45: "E",
+        0x46: "F",
+        0x47: "G",
+        0x48: "H",
+        0x49: "I",
+        0x4A: "J",
+        0x4B: "K",
+        0x4C: "L",
+        0x4D: "M",
+        0x4E: "N",
+        0x4F: "O",
+        0x50: "P",
+        0x51: "Q",
+        0x52: "R",
+        0x53: "S",
+        0x54: "T",
+        0x55: "U",
+        0x56: "V",
+        0x57: "W",
+        0x58: "X",
+        0x59: "Y",
+        0x5A: "Z",
+        0x61: "a",
+        0x62: "b",
+        0x63: "c",
+        0x64: "d",
+        0x65: "e",
+        0x66: "f",
+        0x67: "g",
+        0x68: "h",
+        0x69: "i",
+        0x6A: "j",
+        0x6B: "k",
+        0x6C: "l",
+        0x6D: "m",
+        0x6E: "n",
+        0x6F: "o",
+        0x70: "p",
+        0x71: "q",
+        0x72: "r",
+        0x73: "s",
+        0x74: "t",
+        0x75: "u",
+        0x76: "v",
+        0x77: "w",
+        0x78: "x",
+        0x79: "y",
+        0x7A: "z",
+    }
+
+    @staticmethod
+    def char_num(char, func_addr):
+        if func_addr == 0xBE5F:
+            char += 0x10
+        return char
+
+    @staticmethod
+    def char_name(char, func_addr):
+        if func_addr == 0xBE5F:
+            if char in DrawCharInterpreter.CHAR_NAMES_BE5F:
+                return DrawCharInterpreter.CHAR_NAMES_BE5F[char]
+            return hex(char)
+
+        if char in DrawCharInterpreter.CHAR_NAMES:
+            return DrawCharInterpreter.CHAR_NAMES[char]
+        return hex(char)
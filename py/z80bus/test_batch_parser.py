@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from z80bus.batch_parser import NO_PC, BatchBusParser, find_record_offsets
+from z80bus.bus_parser import BusParser, IOPort
+from z80bus.test_bus_parser import fetch, in_port, out_port, read, write
+
+
+def random_capture(rng: random.Random, num_records: int) -> bytes:
+    data = bytearray(out_port(0x02, IOPort.ROM_BANK))
+    for _ in range(num_records):
+        kind = rng.random()
+        if kind < 0.3:
+            opcode = rng.choice([0xCB, 0xDD, 0xED, 0xFD, 0xCD, 0xC4, 0xC9, 0xC0, 0x3E, 0x00])
+            data += fetch(opcode, rng.randrange(0x10000))
+        elif kind < 0.55:
+            data += read(rng.randrange(256), rng.choice([0x7FF0, 0x7C00, 0x8100, 0xC123, rng.randrange(0x10000)]))
+        elif kind < 0.75:
+            data += write(rng.randrange(256), rng.choice([0x7FEE, 0x1234, rng.randrange(0x10000)]))
+        elif kind < 0.85:
+            data += out_port(rng.randrange(16), rng.choice([IOPort.ROM_BANK, IOPort.ROM_EX_BANK, IOPort.LCD_OUT]))
+        elif kind < 0.9:
+            data += in_port(rng.randrange(256), IOPort.KEY_INPUT)
+        elif kind < 0.95:
+            # unknown port
+            data += b"w" + bytes([rng.randrange(256), 0x03, 0x00])
+        else:
+            # corrupted bytes force a resync
+            data += bytes(rng.choice(b"XYZ\x00\xff") for _ in range(rng.randrange(1, 6)))
+    return bytes(data)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_bus_parser(seed: int) -> None:
+    data = random_capture(random.Random(seed), 500)
+    expected_events, expected_errors = BusParser().parse(data)
+    columns, errors = BatchBusParser().parse(data)
+    assert columns.to_events() == expected_events
+    assert errors == expected_errors
+
+
+def test_state_carries_over_between_buffers() -> None:
+    first = out_port(0x03, IOPort.ROM_BANK) + fetch(0x00, 0xC000)
+    second = read(0x12, 0xC001)
+
+    bus = BusParser()
+    batch = BatchBusParser()
+    bus.parse(first)
+    batch.parse(first)
+    expected, _ = bus.parse(second)
+    columns, _ = batch.parse(second)
+
+    assert columns.to_events() == expected
+    assert (batch.rom_bank, batch.pc) == (bus.rom_bank, bus.pc)
+
+
+def test_banked_address_without_rom_bank() -> None:
+    with pytest.raises(ValueError):
+        BatchBusParser().parse(fetch(0x00, 0xC000))
+
+
+def test_columns() -> None:
+    columns, errors = BatchBusParser().parse(b"X" + read(0x12, 0x1234) + fetch(0xCD, 0x1000))
+    assert errors == ["Invalid type at offset 0: 88"]
+    assert len(columns) == 2
+    assert columns.offset.tolist() == [1, 5]
+    assert columns.type.tobytes() == b"RM"
+    assert columns.pc.tolist() == [NO_PC, 0x1000]
+    assert len(columns[1:]) == 1
+
+
+def test_find_record_offsets() -> None:
+    raw = np.frombuffer(b"RxyzQRabcW", dtype=np.uint8)
+    offsets, skipped, end = find_record_offsets(raw)
+    assert offsets.tolist() == [0, 5]
+    assert skipped.tolist() == [4]
+    assert end == 9
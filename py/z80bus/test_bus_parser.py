@@ -2,6 +2,7 @@ import queue
 import struct
 
 from z80bus import bus_parser
+from z80bus.batch_parser import BatchBusParser
 from z80bus.bus_parser import (
     BusParser,
     ErrorType,
@@ -10,6 +11,7 @@ from z80bus.bus_parser import (
     PipelineBusParser,
     Type,
 )
+from z80bus.native_parser import NativeBusParser
 
 
 def pipeline_parse(input: bytes):
@@ -41,6 +43,10 @@ def normal_parse(b: bytes) -> tuple[list[Event], list[str]]:
     assert normal_events == pipe_events
     assert len(normal_errors) == len(pipe_errors)
     assert normal_errors == pipe_errors
+    for batch_parser in (BatchBusParser(), NativeBusParser()):
+        batch_columns, batch_errors = batch_parser.parse(b)
+        assert batch_columns.to_events() == normal_events
+        assert batch_errors == normal_errors
     return normal_events, normal_errors
 
 
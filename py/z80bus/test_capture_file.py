@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from z80bus.batch_parser import BatchBusParser, iter_decode
+from z80bus.bus_parser import BusParser, IOPort
+from z80bus.capture_file import HEADER_SIZE, CaptureReader, CaptureWriter
+from z80bus.test_batch_parser import random_capture
+from z80bus.test_bus_parser import fetch, out_port, read
+
+
+def test_round_trip(tmp_path) -> None:
+    data = random_capture(random.Random(0), 1000)
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path, metadata={"model": "PC-G850V"}, rom_bank=2) as writer:
+        for i in range(0, len(data), 333):
+            writer.write(data[i : i + 333])
+
+    reader = CaptureReader(path)
+    assert isinstance(reader.data, np.memmap)
+    assert reader.data.tobytes() == data
+    assert reader.metadata == {"model": "PC-G850V"}
+    assert reader.rom_bank == 2
+    assert reader.header["complete"]
+    assert reader.header["num_bytes"] == len(data)
+    assert reader.header["num_chunks"] == (len(data) + 332) // 333
+
+
+def test_interrupted_capture_is_readable(tmp_path) -> None:
+    path = tmp_path / "capture.bin"
+    writer = CaptureWriter(path)
+    writer.write(fetch(0x00, 0x1000))
+    writer._file.close()
+
+    reader = CaptureReader(path)
+    assert not reader.header["complete"]
+    assert reader.data.tobytes() == fetch(0x00, 0x1000)
+
+
+def test_not_a_capture(tmp_path) -> None:
+    path = tmp_path / "capture.bin"
+    path.write_bytes(bytes(HEADER_SIZE))
+    with pytest.raises(ValueError):
+        CaptureReader(path)
+
+
+def test_events(tmp_path) -> None:
+    data = random_capture(random.Random(1), 2000)
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path) as writer:
+        writer.write(data)
+
+    store, errors = CaptureReader(path).events(chunk_size=512)
+    expected_events, expected_errors = BusParser().parse(data)
+    assert store.to_events() == expected_events
+    assert errors == expected_errors
+
+
+@pytest.mark.parametrize("chunk_size", [4, 7, 64, 1000])
+def test_iter_decode_matches_parse(chunk_size: int) -> None:
+    # prefixed and conditional instructions right at potential chunk boundaries
+    data = out_port(0x01, IOPort.ROM_BANK)
+    for i in range(50):
+        data += fetch(0xCB, 0xC000 + i) + fetch(0x11, 0xC001 + i) + read(0x22, 0x7FF0)
+        data += fetch(0xC0, 0x1000) + read(0x12, 0x7FF0) + b"X"
+    data += b"R\x00"
+
+    expected_events, expected_errors = BusParser().parse(data)
+    parser = BatchBusParser()
+    events = []
+    errors = []
+    for columns, chunk_errors in iter_decode(parser, data, chunk_size):
+        events.extend(columns.to_events())
+        errors.extend(chunk_errors)
+    assert events == expected_events
+    assert errors == expected_errors
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from z80bus.bus_parser import BusParser, IOPort
+from z80bus.capture_file import CaptureReader, CaptureWriter
+from z80bus.capture_index import CheckpointIndex
+from z80bus.test_batch_parser import random_capture
+from z80bus.test_bus_parser import fetch, out_port, read
+
+
+@pytest.fixture
+def capture() -> bytes:
+    return random_capture(random.Random(3), 3000)
+
+
+@pytest.mark.parametrize("chunk_size", [256, 1 << 20])
+def test_build(capture: bytes, chunk_size: int) -> None:
+    index = CheckpointIndex.build(capture, interval=16, rom_bank=0, chunk_size=chunk_size)
+    events, _ = BusParser().parse(capture)
+
+    assert index.num_events == len(events)
+    assert index.checkpoint(0).event_index == 0
+    assert index.checkpoint(0).offset == 0
+    # every checkpoint after the first one is an instruction boundary
+    for i in range(1, len(index)):
+        assert events[index.checkpoint(i).event_index].type.name == "FETCH"
+    assert index.find(0) == 0
+    assert index.find(index.num_events) == len(index) - 1
+
+
+def test_checkpoint_rom_bank() -> None:
+    data = fetch(0x00, 0x1000) + out_port(0x05, IOPort.ROM_BANK) + fetch(0x00, 0xC000) + read(0x00, 0xC001)
+    index = CheckpointIndex.build(data, interval=1)
+    assert [index.checkpoint(i).rom_bank for i in range(len(index))] == [None, 5]
+    assert [index.checkpoint(i).offset for i in range(len(index))] == [0, 8]
+
+
+@pytest.mark.parametrize("start,count", [(0, 10), (5, 100), (1234, 500), (2900, 1000), (0, 10**6)])
+def test_decode_window(capture: bytes, start: int, count: int) -> None:
+    index = CheckpointIndex.build(capture, interval=8, rom_bank=0)
+    parser = BusParser()
+    parser.rom_bank = 0
+    events, _ = parser.parse(capture)
+
+    columns, _ = index.decode_window(capture, start, count)
+    assert columns.to_events() == events[start : start + count]
+
+
+def test_decode_window_errors_are_limited_to_the_window() -> None:
+    data = bytearray()
+    for i in range(40):
+        data += fetch(0x00, 0x1000 + i) + out_port(i, IOPort.LCD_OUT)
+        if i % 5 == 0:
+            data += b"X"  # invalid type
+        if i % 7 == 0:
+            data += b"w\x00\x33\x00"  # invalid port
+    data += b"XY"
+    data = bytes(data)
+    index = CheckpointIndex.build(data, interval=4, rom_bank=0)
+    _, all_errors = index.decode_window(data, 0, index.num_events)
+    assert len(all_errors) == 8 + 6 + 1
+    assert all_errors[-1] == "Trailing data"
+
+    # consecutive windows report each error exactly once
+    tiled = []
+    for start in range(0, index.num_events, 7):
+        tiled += index.decode_window(data, start, 7)[1]
+    assert tiled == all_errors
+
+    assert index.decode_window(data, 0, 2)[1] == ["Invalid type at offset 8: 88"]
+    assert index.decode_window(data, 3, 2)[1] == []
+
+
+def test_reader_window(tmp_path, capture: bytes) -> None:
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path, rom_bank=0) as writer:
+        writer.write(capture)
+
+    reader = CaptureReader(path)
+    events, _ = reader.events()
+    columns, _ = reader.window(100, 50)
+    assert columns.to_events() == events[100:150].to_events()
+
+    index = reader.index()
+    assert (tmp_path / "capture.bin.idx.npz").exists()
+    loaded = CaptureReader(path).index()
+    assert loaded.event_index.tolist() == index.event_index.tolist()
+    assert loaded.rom_bank.tolist() == index.rom_bank.tolist()
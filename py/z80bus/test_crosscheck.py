@@ -0,0 +1,140 @@
+from z80bus.bus_parser import Event, IOPort, Type
+from z80bus.crosscheck import CrossChecker, Divergence
+
+
+class ToyCore:
+    """Just enough of a Z80 for the test program: NOP, IN A,(n), LD (nn),A, JP nn, LD A,R.
+
+    Like the real R register, ``r`` counts M1 cycles: one per opcode fetch, two for ED-prefixed opcodes.
+    """
+
+    def __init__(self):
+        self.a = 0
+        self.r = 0
+        self._pc = 0
+        self.num_executed = 0
+
+    def state(self):
+        return (self._pc, self.a, self.r)
+
+    def set_state(self, state):
+        self._pc, self.a, self.r = state
+
+    def memo_key(self, state):
+        return state[:2]
+
+    def replay(self, state, before, after):
+        return (*after[:2], (state[2] + after[2] - before[2]) & 0x7F)
+
+    def pc(self):
+        return self._pc
+
+    def execute(self, pc, read_byte, write_byte, in_port, out_port):
+        self.num_executed += 1
+        opcode = read_byte(pc)
+        self.r = (self.r + (2 if opcode == 0xED else 1)) & 0x7F
+        if opcode == 0x00:
+            self._pc = pc + 1
+        elif opcode == 0xDB:
+            self.a = in_port(read_byte(pc + 1))
+            self._pc = pc + 2
+        elif opcode == 0x32:
+            write_byte(read_byte(pc + 1) | read_byte(pc + 2) << 8, self.a)
+            self._pc = pc + 3
+        elif opcode == 0xC3:
+            self._pc = read_byte(pc + 1) | read_byte(pc + 2) << 8
+        elif opcode == 0xED and read_byte(pc + 1) == 0x5F:
+            self.a = self.r
+            self._pc = pc + 2
+        else:
+            raise RuntimeError(f"unknown opcode {hex(opcode)}")
+
+
+def poll_loop(key: int, stored: int | None = None) -> list[Event]:
+    # 1000: IN A,(10h); LD (2000h),A; JP 1000h
+    return [
+        Event(type=Type.FETCH, val=0xDB, addr=0x1000),
+        Event(type=Type.READ, val=0x10, addr=0x1001),
+        Event(type=Type.IN_PORT, val=key, addr=0x10, port=IOPort.KEY_INPUT),
+        Event(type=Type.FETCH, val=0x32, addr=0x1002),
+        Event(type=Type.READ, val=0x00, addr=0x1003),
+        Event(type=Type.READ, val=0x20, addr=0x1004),
+        Event(type=Type.WRITE, val=key if stored is None else stored, addr=0x2000),
+        Event(type=Type.FETCH, val=0xC3, addr=0x1005),
+        Event(type=Type.READ, val=0x00, addr=0x1006),
+        Event(type=Type.READ, val=0x10, addr=0x1007),
+    ]
+
+
+def test_memoized_loop_matches():
+    core = ToyCore()
+    checker = CrossChecker(core, start_addr=None)
+    events = []
+    for _ in range(10):
+        events += poll_loop(0)
+    events += poll_loop(5)
+    events.append(Event(type=Type.FETCH, val=0x00, addr=0x1000))
+
+    assert checker.check(events) == []
+    assert checker.num_instructions == 33
+    # the first two loops start from different registers, after that only the new key runs again
+    assert core.num_executed == checker.num_executed == 3 + 1 + 3
+    assert checker.num_memo_hits == 33 - 7
+    # R kept counting through the memo hits
+    assert core.state() == (0x1000, 5, 33)
+
+
+def test_ld_a_r_is_not_memoized():
+    # 1000: IN A,(10h); LD A,R; LD (2000h),A; JP 1000h
+    core = ToyCore()
+    checker = CrossChecker(core, start_addr=None)
+    events = []
+    for loop in range(3):
+        events += [
+            Event(type=Type.FETCH, val=0xDB, addr=0x1000),
+            Event(type=Type.READ, val=0x10, addr=0x1001),
+            Event(type=Type.IN_PORT, val=0, addr=0x10, port=IOPort.KEY_INPUT),
+            Event(type=Type.FETCH, val=0xED, addr=0x1002),
+            Event(type=Type.READ, val=0x5F, addr=0x1003),
+            Event(type=Type.FETCH, val=0x32, addr=0x1004),
+            Event(type=Type.READ, val=0x00, addr=0x1005),
+            Event(type=Type.READ, val=0x20, addr=0x1006),
+            Event(type=Type.WRITE, val=loop * 5 + 3, addr=0x2000),
+            Event(type=Type.FETCH, val=0xC3, addr=0x1007),
+            Event(type=Type.READ, val=0x00, addr=0x1008),
+            Event(type=Type.READ, val=0x10, addr=0x1009),
+        ]
+    events.append(Event(type=Type.FETCH, val=0x00, addr=0x1000))
+
+    # LD A,R runs with the same A every time, but reads a different R
+    assert checker.check(events) == []
+    assert checker.num_executed == 12
+
+
+def test_divergences_are_reported_with_indices():
+    core = ToyCore()
+    checker = CrossChecker(core, start_addr=None)
+    events = poll_loop(1) + poll_loop(1, stored=2) + [Event(type=Type.FETCH, val=0x00, addr=0x1001)]
+    checker.process(events[:5])
+    checker.process(events[5:])
+
+    assert checker.divergences == [
+        Divergence(index=13, pc=0x1002, bank=0, kind="write", expected={0x2000: 2}, actual={0x2000: 1}),
+        Divergence(index=17, pc=0x1005, bank=0, kind="pc", expected=0x1001, actual=0x1000),
+    ]
+    assert checker.stats()["divergences"] == 2
+
+
+def test_waits_for_start_addr():
+    core = ToyCore()
+    checker = CrossChecker(core, start_addr=0x1002)
+    checker.check(poll_loop(0) + [Event(type=Type.FETCH, val=0x00, addr=0x1000)])
+    assert checker.num_instructions == 2
+
+
+def test_rom_bytes_from_sparse_banks():
+    checker = CrossChecker(ToyCore(), rom_banks={0: b"\x11" * 0x4000, 3: b"\x33" * 0x4000})
+    assert checker._rom_byte(0x8000, None) == 0x11
+    assert checker._rom_byte(0xC000, 3) == 0x33
+    # banks missing from the dump read as zero
+    assert checker._rom_byte(0xC000, 2) == 0
@@ -0,0 +1,92 @@
+import queue
+import random
+
+import numpy as np
+import pandas
+
+from z80bus.batch_parser import BatchBusParser
+from z80bus.bus_parser import BusParser, Event, IOPort, PipelineBusParser, Type
+from z80bus.event_store import EventStore
+from z80bus.test_batch_parser import random_capture
+from z80bus.test_bus_parser import fetch, out_port, read
+
+
+def test_append_and_index() -> None:
+    events, _ = BusParser().parse(random_capture(random.Random(0), 300))
+    store = EventStore(capacity=4)
+    for e in events:
+        store.append(e)
+
+    assert len(store) == len(events)
+    assert store.capacity >= len(events)
+    assert store[0] == events[0]
+    assert store[-1] == events[-1]
+    assert list(store) == events
+    assert store[10:20].to_events() == events[10:20]
+
+
+def test_extend_from_batch_columns() -> None:
+    data = random_capture(random.Random(1), 300)
+    expected, _ = BusParser().parse(data)
+    columns, _ = BatchBusParser().parse(data)
+
+    store = EventStore()
+    store.extend(columns[:100])
+    store.extend(columns[100:])
+    assert store.to_events() == expected
+    assert store.columns().offset.tolist() == columns.offset.tolist()
+
+
+def test_filter() -> None:
+    store = EventStore()
+    store.extend(
+        BusParser().parse(
+            out_port(0x01, IOPort.ROM_BANK)
+            + fetch(0x00, 0x1000)
+            + out_port(0x12, IOPort.LCD_OUT)
+            + read(0x34, 0x2000)
+            + out_port(0x56, IOPort.LCD_COMMAND)
+        )[0]
+    )
+
+    lcd = store.filter(ports=[IOPort.LCD_OUT, IOPort.LCD_COMMAND])
+    assert [e.val for e in lcd] == [0x12, 0x56]
+    assert [e.type for e in store.filter(types=[Type.FETCH, Type.READ])] == [Type.FETCH, Type.READ]
+    assert len(store.filter(types=[Type.IN_PORT], ports=[IOPort.LCD_OUT])) == 0
+
+
+def test_pipeline_sink() -> None:
+    data = random_capture(random.Random(2), 300)
+    store = EventStore()
+    parser = PipelineBusParser(queue.Queue(), None, save_all_events=True, all_events=store)
+    parser.parse(data)
+    parser.flush()
+
+    reference = PipelineBusParser(queue.Queue(), None, save_all_events=True)
+    reference.parse(data)
+    reference.flush()
+
+    assert parser.all_events is store
+    assert store.to_events() == reference.all_events
+
+
+def test_to_dataframe() -> None:
+    events = [
+        Event(type=Type.FETCH, val=0xCD, addr=0x1000, pc=0x1000, instr=None),
+        Event(type=Type.OUT_PORT, val=0x01, addr=0x41, pc=0x1000, port=IOPort.LCD_OUT),
+        Event(type=Type.READ, val=0x12, addr=0x8000, pc=0x1000, bank=0),
+    ]
+    store = EventStore()
+    store.extend(events)
+
+    df = store.to_dataframe()
+    assert np.shares_memory(df["val"].to_numpy(), store.columns().val)
+    assert df["type"].tolist() == [Type.FETCH, Type.OUT_PORT, Type.READ]
+    assert df[df["port"].isin([IOPort.LCD_OUT])].index.tolist() == [1]
+    assert df["bank"].isna().tolist() == [True, True, False]
+
+    expected = pandas.DataFrame(events)
+    assert df["addr"].tolist() == expected["addr"].tolist()
+
+    raw = store.to_dataframe(enums=False)
+    assert raw["type"].tolist() == [ord("M"), ord("w"), ord("R")]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from z80bus.lcd_frames import FRAME_DELTA, FRAME_KEY, decode_frame, encode_frame
+
+
+def frame_kind(frame: bytes) -> int:
+    return frame[8]
+
+
+def test_key_frame_round_trip():
+    vram = np.arange(8 * 166, dtype=np.uint32).reshape(8, 166) % 256
+    frame, current = encode_frame(3, vram.tolist(), "SHIFT, A")
+
+    assert frame_kind(frame) == FRAME_KEY
+    sequence, decoded, keys = decode_frame(frame)
+    assert sequence == 3
+    assert keys == "SHIFT, A"
+    assert np.array_equal(decoded, vram)
+    assert np.array_equal(current, vram)
+
+
+def test_delta_frames():
+    rng = np.random.default_rng(5)
+    vram = np.zeros((8, 166), dtype=np.uint8)
+    frame, previous = encode_frame(0, vram, "")
+    _, client, _ = decode_frame(frame)
+
+    for sequence in range(1, 20):
+        for _ in range(int(rng.integers(0, 10))):
+            vram[rng.integers(0, 8), rng.integers(0, 166)] = rng.integers(0, 256)
+        frame, previous = encode_frame(sequence, vram, "", previous)
+        assert frame_kind(frame) == FRAME_DELTA
+        assert len(frame) < 200
+        decoded_sequence, client, _ = decode_frame(frame, client)
+        assert decoded_sequence == sequence
+        assert np.array_equal(client, vram)
+
+
+def test_delta_falls_back_to_key_frame():
+    previous = np.zeros((2, 8), dtype=np.uint8)
+    vram = np.arange(16, dtype=np.uint8).reshape(2, 8) * 2 + 1
+    frame, _ = encode_frame(1, vram, "", previous)
+    assert frame_kind(frame) == FRAME_KEY
+
+    with pytest.raises(ValueError):
+        decode_frame(b"XXXX" + frame[4:])
+
+
+def test_delta_needs_previous_frame():
+    previous = np.zeros((2, 8), dtype=np.uint8)
+    vram = previous.copy()
+    vram[1, 3] = 7
+    frame, _ = encode_frame(1, vram, "", previous)
+    assert frame_kind(frame) == FRAME_DELTA
+    with pytest.raises(ValueError):
+        decode_frame(frame)
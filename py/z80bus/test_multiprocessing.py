@@ -1,7 +1,7 @@
 import multiprocessing as mp
 import queue
 
-import PIL
+import PIL.Image
 
 from z80bus import bus_parser, sed1560
 from z80bus.bus_parser import Event, IOPort, Type
@@ -85,3 +85,14 @@ def test_draw_lcd_context():
             assert isinstance(display_queue.get(), PIL.Image.Image)
             assert_display_queue_empty()
     # assert False
+
+
+def test_contexts_connected_by_rings():
+    display_queue = mp.Queue()
+    with sed1560.DrawLCDContext(display_queue=display_queue) as lcd:
+        with bus_parser.ParseContext(ports_output=lcd.input_queue) as parser:
+            parser.input_queue.put(out_port(0x01, IOPort.LCD_OUT) + fetch(0x00, 0x1234))
+            assert isinstance(display_queue.get(timeout=10), PIL.Image.Image)
+            stats = parser.input_queue.stats()
+    assert stats["bytes_written"] == 8
+    assert display_queue.get(timeout=10) is None
@@ -0,0 +1,62 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from z80bus import native_parser
+from z80bus.batch_parser import iter_decode
+from z80bus.bus_parser import BusParser, IOPort
+from z80bus.native_parser import NativeBusParser
+from z80bus.test_batch_parser import random_capture
+from z80bus.test_bus_parser import fetch, out_port
+
+pytestmark = pytest.mark.skipif(
+    not native_parser.AVAILABLE, reason=f"native bus decoder not built: {native_parser.BUILD_ERROR}"
+)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_bus_parser(seed: int) -> None:
+    data = random_capture(random.Random(seed), 500)
+    expected_events, expected_errors = BusParser().parse(data)
+    columns, errors = NativeBusParser().parse(data)
+    assert columns.to_events() == expected_events
+    assert errors == expected_errors
+
+
+def test_state_carries_over_between_buffers() -> None:
+    bus = BusParser()
+    parser = NativeBusParser()
+    for data in (out_port(0x03, IOPort.ROM_EX_BANK) + fetch(0x00, 0xC000), fetch(0x00, 0xC010)):
+        expected, _ = bus.parse(data)
+        columns, _ = parser.parse(data)
+        assert columns.to_events() == expected
+        assert (parser.rom_bank, parser.pc) == (bus.rom_bank, bus.pc)
+
+
+def test_banked_address_without_rom_bank() -> None:
+    with pytest.raises(ValueError):
+        NativeBusParser().parse(fetch(0x00, 0xC000))
+
+
+def test_iter_decode() -> None:
+    data = random_capture(random.Random(100), 2000)
+    expected_events, expected_errors = BusParser().parse(data)
+    events = []
+    errors = []
+    for columns, chunk_errors in iter_decode(NativeBusParser(), data, 300):
+        events.extend(columns.to_events())
+        errors.extend(chunk_errors)
+    assert events == expected_events
+    assert errors == expected_errors
+
+
+def test_decodes_in_parallel_threads() -> None:
+    # the decode loop runs without the GIL
+    captures = [random_capture(random.Random(200 + seed), 2000) for seed in range(8)]
+    expected = [BusParser().parse(data) for data in captures]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda data: NativeBusParser().parse(data), captures))
+    for (columns, errors), (expected_events, expected_errors) in zip(results, expected, strict=True):
+        assert columns.to_events() == expected_events
+        assert errors == expected_errors
@@ -0,0 +1,152 @@
+import io
+
+import pytest
+
+import perfetto_pb2 as perfetto
+from z80bus import perfetto as z80perfetto
+from z80bus.bus_parser import Event, InstructionType, IOPort, Type
+from z80bus.capture_file import CaptureWriter
+from z80bus.perfetto import PerfettoTraceBuilder, PerfettoTraceCreator, PerfettoTraceWriter
+from z80bus.test_bus_parser import fetch, out_port, read
+
+
+def emit(builder):
+    thread = builder.add_thread_descriptor(builder.process_uuid, "main")
+    for ts in range(3):
+        with builder.add_slice_event(thread, 2 * ts, "begin", "sub_1234") as begin:
+            with begin.annotation("call") as ann:
+                ann.pointer("pc", 0x1234)
+        with builder.add_instant_event(thread, 2 * ts, "LCD_OUT out 0x12").annotation("port") as ann:
+            ann.int("index", ts)
+        # annotations of an already written begin event
+        with begin.annotation("ret") as ann:
+            ann.pointer("pc", 0x5678)
+        builder.add_slice_event(thread, 2 * ts + 1, "end")
+
+
+def resolve(trace):
+    """Replace interned names by strings, as the trace processor does."""
+    event_names = {}
+    annotation_names = {}
+
+    def resolve_annotations(annotations):
+        for ann in annotations:
+            if ann.HasField("name_iid"):
+                ann.name = annotation_names[ann.name_iid]
+            resolve_annotations(ann.dict_entries)
+
+    for packet in trace.packet:
+        for entry in packet.interned_data.event_names:
+            event_names[entry.iid] = entry.name
+        for entry in packet.interned_data.debug_annotation_names:
+            annotation_names[entry.iid] = entry.name
+        event = packet.track_event
+        if event.HasField("name_iid"):
+            event.name = event_names[event.name_iid]
+        resolve_annotations(event.debug_annotations)
+    return trace
+
+
+def annotations_by_type(trace):
+    result = []
+    for packet in trace.packet:
+        if packet.HasField("track_event"):
+            event = packet.track_event
+            result.append((event.type, event.name, [ann.name for ann in event.debug_annotations]))
+    return result
+
+
+def test_writer_streams_interned_trace():
+    out = io.BytesIO()
+    with PerfettoTraceWriter(out, "test") as writer:
+        emit(writer)
+
+    data = out.getvalue()
+    assert writer.num_bytes == len(data)
+    trace = perfetto.Trace.FromString(data)
+    assert len(trace.packet) == writer.num_packets == 2 + 3 * 3
+
+    first = trace.packet[0]
+    assert first.sequence_flags == perfetto.TracePacket.SEQ_INCREMENTAL_STATE_CLEARED
+    assert first.track_descriptor.process.process_name == "test"
+    # each name is interned once, in the first packet using it
+    assert sum(len(p.interned_data.event_names) for p in trace.packet) == 2
+    assert all(not p.track_event.HasField("name") for p in trace.packet)
+
+    builder = PerfettoTraceBuilder("test")
+    emit(builder)
+    in_memory = annotations_by_type(builder.trace)
+    streamed = annotations_by_type(resolve(trace))
+    # the late "ret" annotation moves from the slice begin to its end
+    assert in_memory[0] == (perfetto.TrackEvent.TYPE_SLICE_BEGIN, "sub_1234", ["call", "ret"])
+    assert streamed[0] == (perfetto.TrackEvent.TYPE_SLICE_BEGIN, "sub_1234", ["call"])
+    assert streamed[2] == (perfetto.TrackEvent.TYPE_SLICE_END, "", ["ret"])
+    assert streamed[1] == in_memory[1]
+    assert streamed[1][2] == ["port"]
+    assert trace.packet[2].track_event.debug_annotations[0].dict_entries[0].pointer_value == 0x1234
+
+    assert len(data) < len(builder.serialize())
+    with pytest.raises(TypeError):
+        writer.serialize()
+
+
+def call_ret_events():
+    return [
+        Event(type=Type.FETCH, val=0xCD, addr=0x1000, instr=InstructionType.CALL),
+        Event(type=Type.FETCH, val=0x00, addr=0x2000),
+        Event(type=Type.OUT_PORT, val=0x12, port=IOPort.LCD_OUT),
+        Event(type=Type.FETCH, val=0xC9, addr=0x2001, instr=InstructionType.RET),
+        Event(type=Type.FETCH, val=0x00, addr=0x1003),
+        # unbalanced return
+        Event(type=Type.FETCH, val=0xC9, addr=0x1004, instr=InstructionType.RET),
+        Event(type=Type.FETCH, val=0x00, addr=0x3000),
+    ]
+
+
+def main_thread_events(trace):
+    return [
+        (packet.track_event.type, packet.track_event.name)
+        for packet in trace.packet
+        if packet.HasField("track_event") and packet.track_event.track_uuid == trace.packet[1].track_descriptor.uuid
+    ]
+
+
+def test_creator_call_ret_slices():
+    builder = PerfettoTraceCreator().create_perfetto_trace(call_ret_events())
+    assert main_thread_events(builder.trace) == [
+        (perfetto.TrackEvent.TYPE_SLICE_BEGIN, "sub_2000"),
+        (perfetto.TrackEvent.TYPE_INSTANT, "LCD_OUT out 0x12"),
+        (perfetto.TrackEvent.TYPE_SLICE_END, ""),
+        (perfetto.TrackEvent.TYPE_INSTANT, "UNDERFLOW"),
+    ]
+
+    # feeding the events in pieces streams the same slices
+    out = io.BytesIO()
+    creator = PerfettoTraceCreator()
+    creator.start(out)
+    events = call_ret_events()
+    creator.process(events[:2])
+    creator.process(events[2:])
+    creator.finish()
+    streamed = resolve(perfetto.Trace.FromString(out.getvalue()))
+    assert main_thread_events(streamed) == main_thread_events(builder.trace)
+
+
+def test_cli_exports_capture(tmp_path, capsys):
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path, rom_bank=0) as writer:
+        writer.write(
+            fetch(0xCD, 0x1000)
+            + read(0x00, 0x1001)
+            + read(0x20, 0x1002)
+            + fetch(0x00, 0x2000)
+            + out_port(0x12, IOPort.LCD_OUT)
+            + fetch(0xC9, 0x2001)
+            + fetch(0x00, 0x1003)
+        )
+
+    assert z80perfetto.main([str(path), "--chunk-size", "8"]) == 0
+    trace = resolve(perfetto.Trace.FromString((tmp_path / "capture.bin.pb").read_bytes()))
+    names = [name for _, name in main_thread_events(trace)]
+    assert names == ["sub_2000", "LCD_OUT out 0x12", ""]
+    assert "7 events" in capsys.readouterr().err
@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+
+from z80bus.batch_parser import BatchBusParser
+from z80bus.bus_parser import BANK_ADDR_START, BANK_SIZE, ROM_ADDR_START, BusParser, IOPort, Type
+from z80bus.rom_verify import RomImage, cpu_addresses, verify_rom
+from z80bus.test_batch_parser import random_capture
+from z80bus.test_bus_parser import fetch, out_port, read, write
+
+
+def make_banks(rng: random.Random) -> dict[int, bytes]:
+    # bank 4 is missing from the dump
+    return {bank: bytes(rng.randrange(256) for _ in range(BANK_SIZE)) for bank in (0, 1, 2, 3)}
+
+
+def verify_reference(events, banks):
+    # one event at a time, like the notebook's RomVerifier
+    rom_bank = 0
+    mismatches = []
+    for i, e in enumerate(events):
+        if e.type in (Type.IN_PORT, Type.OUT_PORT):
+            if e.port == IOPort.ROM_BANK:
+                rom_bank = e.val
+            elif e.port == IOPort.ROM_EX_BANK:
+                rom_bank = e.val & 0x0F
+        if e.type not in (Type.FETCH, Type.READ):
+            continue
+        addr = int(cpu_addresses(np.array([e.addr]))[0])
+        if addr < ROM_ADDR_START:
+            continue
+        if addr < BANK_ADDR_START:
+            expected = banks[0][addr - ROM_ADDR_START]
+        elif rom_bank in banks:
+            expected = banks[rom_bank][addr - BANK_ADDR_START]
+        else:
+            continue
+        if expected != e.val:
+            mismatches.append((i, addr, rom_bank, expected, e.val))
+    return mismatches
+
+
+def test_matches_reference():
+    rng = random.Random(0)
+    banks = make_banks(rng)
+    image = RomImage.from_banks(banks)
+    for seed in range(5):
+        data = random_capture(random.Random(seed), 2000)
+        columns, _ = BatchBusParser().parse(data)
+        events, _ = BusParser().parse(data)
+
+        result = verify_rom(columns, image)
+        assert len(result) > 0
+        got = list(
+            zip(
+                result.index.tolist(),
+                result.addr.tolist(),
+                result.bank.tolist(),
+                result.expected.tolist(),
+                result.actual.tolist(),
+                strict=True,
+            )
+        )
+        assert got == verify_reference(events, banks)
+
+
+def test_reports_only_mismatches():
+    banks = make_banks(random.Random(1))
+    data = (
+        fetch(banks[0][0x10], ROM_ADDR_START + 0x10)
+        + out_port(0x02, IOPort.ROM_BANK)
+        + read(banks[2][0x20], BANK_ADDR_START + 0x20)
+        + read(banks[2][0x21] ^ 0xFF, BANK_ADDR_START + 0x21)
+        + write(0x00, ROM_ADDR_START)
+        + out_port(0x04, IOPort.ROM_BANK)
+        + read(0x00, BANK_ADDR_START)
+    )
+    columns, _ = BatchBusParser().parse(data)
+    result = verify_rom(columns, banks)
+
+    assert result.index.tolist() == [3]
+    assert result.addr.tolist() == [BANK_ADDR_START + 0x21]
+    assert result.bank.tolist() == [2]
+    assert result.num_checked == 3
+    assert result.num_unchecked == 1
+    assert result.rom_writes.tolist() == [4]
+    assert result.to_dataframe()["expected"].tolist() == [banks[2][0x21]]
@@ -1,8 +1,21 @@
 
 from __future__ import annotations
 
+import queue
+
+import numpy as np
+import pytest
+
+from shared.lcd_vram import PageVRAM
 from z80bus.bus_parser import IOPort
-from z80bus.sed1560 import SED1560, SED1560Interpreter, SED1560Parser
+from z80bus.sed1560 import (
+    SED1560,
+    SED1560History,
+    SED1560Interpreter,
+    SED1560Parser,
+    interpret_lcd_thread,
+    render_vram,
+)
 from z80bus.test_bus_parser import normal_parse, out_port
 
 # Type alias for all possible SED1560 command types
@@ -83,3 +96,196 @@ def test_interpret_columns():
     assert interpret(out_cmd(0x02)).col == 0x02
     assert interpret(out_cmd(0x13)).col == 0x30
 
+
+
+def expected_pixels(vram: PageVRAM) -> np.ndarray:
+    height = len(vram) * 6
+    return np.array(
+        [[(vram[y // 8][x] >> (y % 8)) & 1 for x in range(len(vram[0]))] for y in range(height)],
+        dtype=bool,
+    )
+
+
+def image_pixels(image, zoom: int) -> np.ndarray:
+    rgb = np.asarray(image)
+    return rgb[::zoom, ::zoom, 1] == 255
+
+
+def test_vram_image_incremental():
+    rng = np.random.default_rng(1)
+    display = SED1560Interpreter()
+    zoom = 2
+
+    image, _ = display.vram_image(zoom)
+    assert image.size == (166 * zoom, 48 * zoom)
+    assert not display.is_dirty()
+
+    for _ in range(5):
+        for _ in range(40):
+            display.eval(SED1560.SetPageAddress(value=int(rng.integers(0, 8))))
+            display.eval(SED1560.SetColumn(value=int(rng.integers(0, 166))))
+            display.eval(SED1560.VRAMWrite(value=int(rng.integers(0, 256))))
+        image, _ = display.vram_image(zoom)
+        assert np.array_equal(image_pixels(image, zoom), expected_pixels(display.vram))
+        assert np.array_equal(np.asarray(image), np.asarray(render_vram(display.vram, zoom)[0]))
+
+    # rewriting the same value doesn't dirty the column
+    display.eval(SED1560.VRAMWrite(value=display.vram[display.page][display.col]))
+    assert not display.is_dirty()
+
+    # a different zoom starts from a full frame
+    image, _ = display.vram_image(1)
+    assert np.array_equal(image_pixels(image, 1), expected_pixels(display.vram))
+
+
+def test_vram_image_mark_dirty():
+    display = SED1560Interpreter()
+    display.vram_image()
+    display.vram[1][3] = 0xFF
+    display.mark_dirty()
+    image, _ = display.vram_image(1)
+    assert image_pixels(image, 1)[8:16, 3].all()
+
+
+def test_decode_commands_matches_parser():
+    values = np.arange(256, dtype=np.uint8)
+    data = np.tile(values, 3)
+    ports = np.repeat([IOPort.LCD_COMMAND.value, IOPort.LCD_OUT.value, IOPort.KEY_INPUT.value], 256)
+    valid = ports != IOPort.LCD_COMMAND.value
+    for x in values.tolist():
+        try:
+            SED1560Parser.parse_out40(x)
+            valid[x] = True
+        except ValueError:
+            pass
+
+    table = SED1560Parser.decode_commands(ports[valid], data[valid])
+    for row, port, x in zip(table.tolist(), ports[valid].tolist(), data[valid].tolist(), strict=True):
+        interpreter = SED1560Interpreter()
+        replayed = SED1560Interpreter()
+        if port == IOPort.LCD_COMMAND.value:
+            cmd = parse40(x)
+        elif port == IOPort.LCD_OUT.value:
+            cmd = parse41(x)
+        else:
+            assert row == (SED1560.Op.UNKNOWN, x)
+            continue
+        try:
+            interpreter.eval(cmd)
+        except ValueError:
+            continue
+        replayed.replay(np.array([row], dtype=table.dtype))
+        assert vars(replayed) == vars(interpreter) | {"vram": replayed.vram}
+        assert replayed.vram == interpreter.vram
+
+    with pytest.raises(ValueError):
+        SED1560Parser.decode_commands([IOPort.LCD_OUT.value, IOPort.LCD_COMMAND.value], [0x00, 0xC0])
+
+
+def test_replay_matches_eval():
+    rng = np.random.default_rng(2)
+    data = b""
+    for _ in range(300):
+        data += out_cmd(0xB0 | int(rng.integers(0, 8)))
+        if rng.random() < 0.7:
+            # usually both nibbles, sometimes just one of them
+            column = int(rng.integers(0, 166))
+            data += out_cmd(column & 0x0F) + out_cmd(0x10 | column >> 4)
+        else:
+            data += out_cmd(0x10 | int(rng.integers(0, 0xA)))
+        for _ in range(int(rng.integers(0, 12))):
+            data += out_data(int(rng.integers(0, 256)))
+        data += out_cmd(int(rng.choice([0x40, 0x85, 0x25, 0xAF, 0xA4, 0xCF])))
+
+    expected = interpret(data)
+    events, _ = normal_parse(data)
+    replayed = SED1560Interpreter()
+    replayed.vram_image()
+    replayed.replay(SED1560Parser.decode_bus_commands(events))
+
+    assert replayed.vram == expected.vram
+    for name in ["page", "col", "com0", "contrast", "power_on", "display_on", "segments_display_mode"]:
+        assert getattr(replayed, name) == getattr(expected, name), name
+    # only what the replay changed is rasterized again
+    image, _ = replayed.vram_image(1)
+    assert np.array_equal(image_pixels(image, 1), expected_pixels(replayed.vram))
+
+
+def test_replay_rejects_before_applying():
+    display = SED1560Interpreter()
+    events, _ = normal_parse(out_data(0x12) + out_cmd(0xA6))  # DISPLAY_MODE isn't interpreted
+    with pytest.raises(ValueError):
+        display.replay(SED1560Parser.decode_bus_commands(events))
+    assert display.vram[0][0] == 0
+
+    events, _ = normal_parse(out_cmd(0x1F) + out_data(0x12))
+    with pytest.raises(IndexError):
+        display.replay(SED1560Parser.decode_bus_commands(events))
+
+
+def test_interpret_lcd_thread_batches():
+    events, _ = normal_parse(out_cmd(0xB1) + out_data(0x12) + out_cmd(0xA6) + out_data(0x34))
+    input_queue: queue.Queue = queue.Queue()
+    display_queue: queue.Queue = queue.Queue()
+    status_queue: queue.Queue = queue.Queue()
+    for e in events:
+        input_queue.put(e)
+    input_queue.put(None)
+
+    interpret_lcd_thread(input_queue, display_queue, status_queue)
+
+    status = status_queue.get_nowait()
+    assert status["num_batches"] == 1
+    # the unsupported command falls back to eval one by one and only drops itself
+    assert status["num_evals"] == 4
+    image = display_queue.get_nowait()
+    assert image_pixels(image, 4)[8:16, :2].any()
+
+
+def test_history_matches_eval():
+    rng = np.random.default_rng(3)
+    commands: list[SED1560Command] = []
+    for _ in range(200):
+        commands.append(SED1560.SetPageAddress(value=int(rng.integers(0, 8))))
+        commands.append(SED1560.SetColumn(value=int(rng.integers(0, 160))))
+        commands += [SED1560.VRAMWrite(value=int(v)) for v in rng.integers(0, 4, size=int(rng.integers(0, 6)))]
+        commands.append(SED1560.InitialDisplayLine(value=int(rng.integers(0, 64))))
+
+    history = SED1560History.record(commands, interval=16)
+    assert len(history) == len(commands)
+    assert len(history.snapshots) == len(commands) // 16 + 1
+
+    display = SED1560Interpreter()
+    for index in range(len(commands) + 1):
+        if index:
+            display.eval(commands[index - 1])
+        assert np.array_equal(history.vram_at(index), display.vram.data)
+        if index % 7 == 0:
+            restored = history.interpreter_at(index)
+            assert restored.vram == display.vram
+            assert (restored.page, restored.col, restored.com0) == (display.page, display.col, display.com0)
+
+    image, _ = history.image_at(len(commands), zoom=1)
+    assert np.array_equal(image_pixels(image, 1), expected_pixels(display.vram))
+    with pytest.raises(IndexError):
+        history.vram_at(len(commands) + 1)
+
+
+def test_history_skips_rejected_commands():
+    commands = [
+        SED1560.SetPageAddress(value=1),
+        SED1560.VRAMWrite(value=0x12),
+        SED1560.CmdA(cmd=SED1560.CmdAType.DISPLAY_MODE, value=1),  # not interpreted
+        SED1560.VRAMWrite(value=0x34),
+        SED1560.SetPageAddress(value=15),
+        SED1560.VRAMWrite(value=0x56),  # page out of range
+        SED1560.SetPageAddress(value=2),
+        SED1560.VRAMWrite(value=0x78),
+    ]
+    history = SED1560History.record(commands, interval=4)
+
+    assert [index for index, _ in history.errors] == [2, 5]
+    vram = history.vram_at(len(commands))
+    assert vram[1][:2].tolist() == [0x12, 0x34]
+    assert vram[2][2] == 0x78
+    assert history.interpreter_at(len(commands)).vram.data.tolist() == vram.tolist()
@@ -1,9 +1,17 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, cast
+
 import pytest
 
 pytest.importorskip("fastapi")
 pytest.importorskip("uvicorn")
 
-from z80bus.server import ParseRenderManager
+from z80bus.bus_parser import IOPort
+from z80bus.lcd_frames import FRAME_DELTA, decode_frame
+from z80bus.server import IngestPipeline, ParseRenderManager, app, manager
+from z80bus.test_bus_parser import fetch, out_port
 
 
 def test_parse_render_manager_initializes_on_construction():
@@ -21,3 +29,214 @@ def test_parse_render_manager_initializes_on_construction():
 
     # Leave the singleton in a clean state for other tests.
     manager.reset()
+
+
+def lcd_writes(values: bytes) -> bytes:
+    # buffered port events are flushed by the next instruction fetch
+    return b"".join(out_port(v, IOPort.LCD_OUT) for v in values) + fetch(0x00, 0x0000)
+
+
+def test_ingest_pipeline_publishes_snapshots():
+    manager = ParseRenderManager()
+    manager.reset()
+    data = lcd_writes(bytes([0xFF, 0x81, 0x01]))
+
+    async def feed():
+        ingest = IngestPipeline(manager, maxsize=2)
+        ingest.start()
+        # split records across chunks, the parser keeps the remainder
+        for i in range(0, len(data), 3):
+            await ingest.put(data[i : i + 3])
+        await ingest.close()
+        return ingest.stats()
+
+    stats = asyncio.run(feed())
+
+    assert stats["ingest_bytes"] == len(data)
+    assert stats["ingest_queue_size"] == 0
+    snapshot = manager.snapshot
+    assert snapshot.generation > 0
+    assert snapshot.vram[0][:4] == (0xFF, 0x81, 0x01, 0x00)
+    assert manager.get_lcd_image_bytes()
+
+    manager.reset()
+    assert manager.snapshot.generation == 0
+
+
+def test_ingest_pipeline_raises_parser_errors():
+    manager = ParseRenderManager()
+    manager.reset()
+
+    async def feed():
+        ingest = IngestPipeline(manager)
+        ingest.start()
+        await ingest.put(b"M\x00\x00\x00")
+        await ingest.put(cast(Any, "not bytes"))
+        await ingest.close()
+
+    with pytest.raises(TypeError):
+        asyncio.run(feed())
+    manager.reset()
+
+
+def test_ingest_pipeline_raises_parser_errors_while_full():
+    manager = ParseRenderManager()
+    manager.reset()
+    release = threading.Event()
+
+    def fail(data):
+        release.wait(5)
+        raise ValueError("bad chunk")
+
+    async def feed():
+        ingest = IngestPipeline(manager, maxsize=1)
+        ingest.manager = SimpleNamespace(process_raw_data=fail)
+        ingest.start()
+        await ingest.put(b"a")
+        await asyncio.sleep(0)  # the worker takes the first chunk
+        await ingest.put(b"b")
+        blocked = asyncio.ensure_future(ingest.put(b"c"))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        release.set()
+        await asyncio.wait_for(blocked, 5)
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        asyncio.run(feed())
+    manager.reset()
+
+
+def test_unsupported_lcd_command_only_drops_itself():
+    manager = ParseRenderManager()
+    manager.reset()
+    # DISPLAY_MODE (0xA6) isn't interpreted, the writes around it still land
+    manager.process_raw_data(
+        out_port(0x12, IOPort.LCD_OUT) + out_port(0xA6, IOPort.LCD_COMMAND) + lcd_writes(bytes([0x34]))
+    )
+
+    assert manager.snapshot.vram[0][:2] == (0x12, 0x34)
+    stats = manager.stats()
+    assert stats["2num_lcd_errors"] == 1
+    assert stats["2num_lcd_commands"] == 3
+    manager.reset()
+
+
+def test_wait_for_snapshot_is_woken_by_another_thread():
+    manager = ParseRenderManager()
+    manager.reset()
+
+    async def wait():
+        waiter = asyncio.ensure_future(manager.wait_for_snapshot(manager.epoch, 0))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        # the ingest worker publishes from its thread
+        await asyncio.to_thread(manager.process_raw_data, lcd_writes(bytes([0x42])))
+        return await asyncio.wait_for(waiter, 1)
+
+    snapshot = asyncio.run(wait())
+    assert snapshot.generation == 1
+    assert snapshot.vram[0][0] == 0x42
+    assert not manager._waiters
+    manager.reset()
+
+
+def test_websocket_stream_updates_lcd():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_bytes(lcd_writes(bytes([0xAA] * 8)))
+
+    assert manager.snapshot.vram[0][:8] == (0xAA,) * 8
+    response = client.get("/lcd")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    manager.reset()
+
+
+def test_wait_for_snapshot_is_woken_by_a_reset():
+    manager = ParseRenderManager()
+    manager.reset()
+    epoch = manager.epoch
+
+    async def wait():
+        waiter = asyncio.ensure_future(manager.wait_for_snapshot(epoch, 0))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        # the new epoch starts over at the same generation
+        await asyncio.to_thread(manager.reset)
+        return await asyncio.wait_for(waiter, 1)
+
+    snapshot = asyncio.run(wait())
+    assert (snapshot.epoch, snapshot.generation) == (epoch + 1, 0)
+    manager.reset()
+
+
+def test_lcd_stream_sends_frames_on_change():
+    from fastapi.testclient import TestClient
+
+    manager.reset()
+    client = TestClient(app)
+    with client.websocket_connect("/lcd/stream") as websocket:
+        sequence, vram, keys = decode_frame(websocket.receive_bytes())
+        assert sequence == 0
+        assert not vram.any()
+
+        manager.process_raw_data(lcd_writes(bytes([0x11, 0x22])))
+        frame = websocket.receive_bytes()
+        assert frame[8] == FRAME_DELTA
+        sequence, vram, keys = decode_frame(frame, vram)
+        assert sequence == manager.snapshot.generation
+        assert vram[0, :3].tolist() == [0x11, 0x22, 0x00]
+
+    assert client.get("/lcd/view").status_code == 200
+    manager.reset()
+
+
+def test_unchanged_lcd_publishes_no_snapshot():
+    manager.reset()
+    manager.process_raw_data(lcd_writes(bytes([0x11])))
+    generation = manager.snapshot.generation
+    # moves the column without changing any pixel
+    manager.process_raw_data(out_port(0x00, IOPort.LCD_COMMAND) + fetch(0x00, 0x0000))
+    assert manager.snapshot.generation == generation
+    manager.reset()
+
+
+def test_lcd_png_is_cached_per_snapshot():
+    manager = ParseRenderManager()
+    etag, png = manager.get_lcd_png()
+    assert manager.get_lcd_png() == (etag, png)
+    assert manager.stats()["2png_renders"] == 1
+    assert manager.stats()["2png_hits"] == 1
+
+    manager.process_raw_data(lcd_writes(bytes([0x55])))
+    new_etag, new_png = manager.get_lcd_png()
+    assert new_etag != etag
+    assert new_png != png
+    assert manager.stats()["2png_renders"] == 2
+
+    # generations restart after a reset, the epoch keeps ETags unique
+    manager.reset()
+    assert manager.get_lcd_png()[0] not in (etag, new_etag)
+
+
+def test_lcd_etag_not_modified():
+    from fastapi.testclient import TestClient
+
+    manager.reset()
+    client = TestClient(app)
+    response = client.get("/lcd")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    response = client.get("/lcd", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert not response.content
+
+    manager.process_raw_data(lcd_writes(bytes([0x33])))
+    response = client.get("/lcd", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    manager.reset()
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from z80bus import sharded_parser
+from z80bus.bus_parser import BusParser, IOPort
+from z80bus.capture_file import CaptureWriter
+from z80bus.sharded_parser import parse_sharded, plan_shards
+from z80bus.test_batch_parser import random_capture
+from z80bus.test_bus_parser import fetch, out_port, read
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    monkeypatch.setattr(sharded_parser, "MIN_SHARD_SIZE", 64)
+    monkeypatch.setattr(sharded_parser, "PRESCAN_BLOCK_SIZE", 256)
+
+
+def expected(data: bytes, rom_bank: int | None = 0):
+    parser = BusParser()
+    parser.rom_bank = rom_bank
+    return parser.parse(data)
+
+
+def test_plan_shards(small_shards) -> None:
+    data = random_capture(random.Random(0), 4000)
+    shards = plan_shards(data, 8, rom_bank=0)
+    assert len(shards) > 1
+    assert shards[0].start == 0
+    assert shards[-1].stop == len(data)
+    for a, b in zip(shards[:-1], shards[1:], strict=True):
+        assert a.stop == b.start
+        assert data[b.start : b.start + 1] == b"M"
+
+
+def test_shard_rom_bank(small_shards) -> None:
+    data = out_port(0x13, IOPort.ROM_EX_BANK) + (fetch(0x00, 0xC000) + read(0x00, 0xC001)) * 100
+    data += out_port(0x05, IOPort.ROM_BANK) + (fetch(0x00, 0xC000) + read(0x00, 0xC001)) * 100
+    shards = plan_shards(data, 4)
+    assert [s.rom_bank for s in shards] == [None, 3, 5, 5]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_bus_parser(small_shards, seed: int) -> None:
+    data = random_capture(random.Random(seed), 3000)
+    store, errors = parse_sharded(data, rom_bank=0, max_workers=2, num_shards=6)
+    expected_events, expected_errors = expected(data)
+    assert store.to_events() == expected_events
+    assert errors == expected_errors
+
+
+def test_capture_file(small_shards, tmp_path) -> None:
+    data = random_capture(random.Random(10), 3000) + b"R\x00"
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path, rom_bank=0) as writer:
+        writer.write(data)
+
+    store, errors = parse_sharded(path, max_workers=2, num_shards=4)
+    expected_events, expected_errors = expected(data)
+    assert store.to_events() == expected_events
+    assert errors == expected_errors
@@ -0,0 +1,104 @@
+import multiprocessing as mp
+import pickle
+import queue
+
+import pytest
+
+from z80bus import bus_parser
+from z80bus.bus_parser import Event, IOPort, Type
+from z80bus.shm_ring import PortEventRing, ShmRingBuffer
+from z80bus.test_bus_parser import fetch, out_port
+
+
+def test_round_trip_with_wrap_around() -> None:
+    with ShmRingBuffer.create(capacity=10) as ring:
+        assert ring.put(b"abcdefg")
+        assert ring.get(max_bytes=5) == b"abcde"
+        assert ring.put(b"hijkl")
+        assert ring.qsize() == 7
+        assert ring.get() == b"fghijkl"
+        assert ring.empty()
+
+        ring.put(None)
+        assert ring.get() is None
+        stats = ring.stats()
+        assert stats["bytes_written"] == 12
+        assert stats["chunks_written"] == 2
+
+
+def test_overflow_and_back_pressure() -> None:
+    with ShmRingBuffer.create(capacity=8) as ring:
+        assert ring.put(b"12345678")
+        assert not ring.put(b"9", block=False)
+        assert not ring.put(b"9", timeout=0.01)
+        assert ring.get() == b"12345678"
+        with pytest.raises(queue.Empty):
+            ring.get(block=False)
+        with pytest.raises(ValueError):
+            ring.put(b"123456789")
+
+        stats = ring.stats()
+        assert stats["dropped_chunks"] == 2
+        assert stats["dropped_bytes"] == 2
+        assert stats["producer_waits"] == 2
+        assert stats["consumer_waits"] == 1
+
+
+def test_port_event_ring() -> None:
+    events = [
+        Event(type=Type.OUT_PORT, val=0x12, addr=0x40, pc=0x1234, port=IOPort.LCD_COMMAND),
+        Event(type=Type.IN_PORT, val=0xFF, addr=0x10, port=IOPort.KEY_INPUT),
+    ]
+    with PortEventRing.create(capacity=20) as ring:
+        assert ring.capacity == 16
+        for e in events:
+            ring.put(e)
+        assert not ring.empty()
+        assert [ring.get(), ring.get()] == events
+        assert ring.empty()
+
+
+def _produce(ring: ShmRingBuffer, chunks: int) -> None:
+    for i in range(chunks):
+        ring.put(bytes([i % 256]) * 1000)
+    ring.put(None)
+
+
+def test_cross_process() -> None:
+    with ShmRingBuffer.create(capacity=4096) as ring:
+        process = mp.Process(target=_produce, args=(ring, 200))
+        process.start()
+        received = bytearray()
+        while (data := ring.get(timeout=10)) is not None:
+            received += data
+        process.join()
+
+        assert received == b"".join(bytes([i % 256]) * 1000 for i in range(200))
+        assert ring.stats()["dropped_chunks"] == 0
+
+
+def test_pickle_attaches_by_name() -> None:
+    with ShmRingBuffer.create(capacity=16) as ring:
+        ring.put(b"data")
+        attached = pickle.loads(pickle.dumps(ring))
+        assert attached.get() == b"data"
+        attached.close()
+
+
+def test_parse_data_thread_with_rings() -> None:
+    with ShmRingBuffer.create(capacity=1024) as raw_ring, PortEventRing.create(capacity=1024) as ports_ring:
+        errors: queue.Queue = queue.Queue()
+        status: queue.Queue = queue.Queue()
+        raw_ring.put(out_port(0xAB, IOPort.LCD_COMMAND) + fetch(0x00, 0x1234))
+        raw_ring.put(None)
+        bus_parser.parse_data_thread(raw_ring, None, errors, ports_ring, status)
+
+        assert ports_ring.get_nowait() == Event(
+            type=Type.OUT_PORT,
+            val=0xAB,
+            addr=IOPort.LCD_COMMAND.value,
+            port=IOPort.LCD_COMMAND,
+        )
+        result = status.get_nowait()
+        assert result["input_ring"]["bytes_written"] == 8
+        assert result["out_ports_ring"]["chunks_written"] == 1